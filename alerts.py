@@ -0,0 +1,347 @@
+import asyncio
+import json
+import random
+import sqlite3
+import ssl
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created REAL NOT NULL,
+    node TEXT NOT NULL,
+    event TEXT NOT NULL,
+    risk TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    dedupe_key TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',   -- pending / sent / failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL,
+    last_error TEXT,
+    sent_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_attempt);
+CREATE INDEX IF NOT EXISTS idx_outbox_dedupe ON outbox (dedupe_key, created);
+"""
+
+COLUMNS = "id, created, node, event, risk, payload, attempts"
+
+
+class AlertOutbox:
+    """보낼 알림을 SQLite(WAL)에 먼저 저장하는 영속 대기열입니다. 앱이 재시작돼도 미전송 알림이 남습니다."""
+    def __init__(self, path="alerts.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def enqueue(self, node, event, risk, payload=None, dedupe_key=None, dedupe_window=0.0, now=None):
+        """알림을 저장하고 id를 반환합니다. dedupe_window초 안에 같은 dedupe_key가 있으면 저장하지 않고 None."""
+        now = time.time() if now is None else now
+        with self._lock:
+            with self.conn:
+                if dedupe_key is not None and dedupe_window > 0:
+                    duplicate = self.conn.execute(
+                        "SELECT 1 FROM outbox WHERE dedupe_key = ? AND created >= ? LIMIT 1",
+                        (dedupe_key, now - dedupe_window)).fetchone()
+                    if duplicate:
+                        return None
+                cur = self.conn.execute(
+                    "INSERT INTO outbox (created, node, event, risk, payload, dedupe_key, next_attempt) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (now, node, event, risk, json.dumps(payload or {}, ensure_ascii=False), dedupe_key, now))
+                return cur.lastrowid
+
+    def due(self, now=None, limit=50):
+        """지금 보낼 차례인 알림 (오래된 순서)."""
+        now = time.time() if now is None else now
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT {COLUMNS} FROM outbox WHERE status = 'pending' AND next_attempt <= ? ORDER BY id LIMIT ?",
+                (now, limit)).fetchall()
+        return [{"id": r[0], "created": r[1], "node": r[2], "event": r[3], "risk": r[4],
+                 "payload": json.loads(r[5]), "attempts": r[6]} for r in rows]
+
+    def next_due(self):
+        """가장 이른 재시도 예정 시각 (대기 중인 알림이 없으면 None)."""
+        with self._lock:
+            row = self.conn.execute("SELECT MIN(next_attempt) FROM outbox WHERE status = 'pending'").fetchone()
+        return row[0]
+
+    def mark_sent(self, ids, now=None):
+        now = time.time() if now is None else now
+        with self._lock, self.conn:
+            self.conn.executemany("UPDATE outbox SET status = 'sent', attempts = attempts + 1, sent_at = ? WHERE id = ?",
+                                  [(now, i) for i in ids])
+
+    def mark_retry(self, retries, error):
+        """retries: [(id, 다음 시도 시각)]"""
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "UPDATE outbox SET attempts = attempts + 1, next_attempt = ?, last_error = ? WHERE id = ?",
+                [(at, error, i) for i, at in retries])
+
+    def mark_failed(self, ids, error):
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "UPDATE outbox SET status = 'failed', attempts = attempts + 1, last_error = ? WHERE id = ?",
+                [(error, i) for i in ids])
+
+    def requeue_failed(self, now=None):
+        """포기했던(failed) 알림을 다시 대기열에 넣고 건수를 반환합니다."""
+        now = time.time() if now is None else now
+        with self._lock, self.conn:
+            return self.conn.execute(
+                "UPDATE outbox SET status = 'pending', next_attempt = ? WHERE status = 'failed'", (now,)).rowcount
+
+    def stats(self):
+        with self._lock:
+            return dict(self.conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status"))
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+class GatewayError(RuntimeError):
+    pass
+
+
+class HttpGateway:
+    """알림 묶음을 JSON 한 건으로 POST 하는 비동기 HTTP 클라이언트입니다 (표준 라이브러리만 사용).
+
+    https:// 주소는 시스템 인증서로 서버를 검증하는 TLS로 연결합니다.
+    """
+    def __init__(self, url, timeout=5.0, ssl_context=None):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"지원하지 않는 게이트웨이 주소: {url} (http:// 또는 https://)")
+        self.url = url
+        self.host = parts.hostname
+        self.ssl = (ssl_context or ssl.create_default_context()) if parts.scheme == "https" else None
+        self.port = parts.port or (443 if self.ssl else 80)
+        self.path = parts.path or "/"
+        self.timeout = timeout
+
+    async def send(self, alerts):
+        body = json.dumps({"alerts": alerts}, ensure_ascii=False).encode("utf-8")
+        request = (
+            f"POST {self.path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+        ).encode("ascii") + body
+
+        async def exchange():
+            reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+            try:
+                writer.write(request)
+                await writer.drain()
+                status_line = await reader.readline()
+            finally:
+                writer.close()
+            return status_line
+
+        try:
+            status_line = await asyncio.wait_for(exchange(), self.timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            raise GatewayError(f"{self.url}: {e!r}") from e
+        parts = status_line.decode("latin-1").split()
+        status = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 0
+        if not 200 <= status < 300:
+            raise GatewayError(f"{self.url}: HTTP {status}")
+
+
+class AlertDispatcher:
+    """아웃박스에 쌓인 알림을 백그라운드 asyncio 루프에서 묶어 보내고, 실패하면 지수 백오프로 재시도합니다.
+
+    감지 루프는 enqueue()로 저장만 하고 바로 돌아갑니다 (게이트웨이 응답을 기다리지 않음).
+    여러 벽에서 동시에 알림이 나면 batch_wait 동안 모아 최대 batch_size건씩 한 번에 보냅니다.
+    max_attempts가 None(기본)이면 게이트웨이가 돌아올 때까지 max_backoff 간격으로 계속 재시도하고,
+    시작할 때 이전 실행에서 포기한 알림도 다시 보냅니다 (119/SMS 알림을 잃지 않음).
+    """
+    def __init__(self, outbox, gateway, batch_size=50, batch_wait=0.5, max_attempts=None,
+                 base_backoff=1.0, max_backoff=60.0, dedupe_window=60.0):
+        self.outbox = outbox
+        self.gateway = gateway
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.dedupe_window = dedupe_window
+
+        self.sent = 0
+        self.batches = 0
+        self.last_error = None
+        self.loop = None
+        self._wake = None
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return self
+        if self.max_attempts is None:
+            self.outbox.requeue_failed()
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(ready,), name="swg-alerts", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        """발송 태스크를 취소하고 이벤트 루프 스레드를 멈춥니다 (보내지 못한 알림은 아웃박스에 남음)."""
+        if not self.running:
+            return
+        asyncio.run_coroutine_threadsafe(self._cancel_tasks(), self.loop).result(timeout=5.0)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5.0)
+
+    async def _cancel_tasks(self):
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _run(self, ready):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._wake = asyncio.Event()
+        ready.set()
+        self.loop.create_task(self._dispatch_loop())
+        self.loop.run_forever()
+        self.loop.close()
+
+    def enqueue(self, node, event, risk, payload=None, dedupe=True):
+        """알림을 아웃박스에 저장하고 디스패처를 깨웁니다. 중복으로 걸러지면 None을 반환합니다.
+
+        같은 노드의 같은 이벤트만 중복으로 봅니다 (충격 직후의 낙상처럼 다른 위험 이벤트는 그대로 발송).
+        """
+        alert_id = self.outbox.enqueue(
+            node, event, risk, payload,
+            dedupe_key=f"{node}|{event}" if dedupe else None, dedupe_window=self.dedupe_window)
+        if alert_id is not None and self.running:
+            self.loop.call_soon_threadsafe(self._wake.set)
+        return alert_id
+
+    def backoff(self, attempts):
+        # 지수 백오프 + 지터 (여러 노드가 동시에 재시도하지 않도록)
+        delay = min(self.max_backoff, self.base_backoff * 2 ** min(attempts, 30))  # 재시도가 길어져도 오버플로 없음
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _dispatch_loop(self):
+        while True:
+            next_due = self.outbox.next_due()
+            timeout = None if next_due is None else max(0.0, next_due - time.time())
+            if timeout is None or timeout > 0:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            self._wake.clear()
+            # 동시에 발생한 알림을 모으기 위해 잠시 대기
+            await asyncio.sleep(self.batch_wait)
+            try:
+                while True:
+                    alerts = self.outbox.due(limit=self.batch_size)
+                    if not alerts:
+                        break
+                    await self._send(alerts)
+                    if len(alerts) < self.batch_size:
+                        break
+            except sqlite3.Error as e:
+                # 아웃박스 오류로 루프가 죽지 않도록 기록만 하고 다음 주기에 다시 시도
+                self.last_error = e
+                await asyncio.sleep(self.base_backoff)
+
+    async def _send(self, alerts):
+        try:
+            await self.gateway.send(alerts)
+        except Exception as e:
+            self.last_error = e
+            now = time.time()
+            give_up = lambda a: self.max_attempts is not None and a["attempts"] + 1 >= self.max_attempts
+            retries = [(a["id"], now + self.backoff(a["attempts"])) for a in alerts if not give_up(a)]
+            failed = [a["id"] for a in alerts if give_up(a)]
+            if retries:
+                self.outbox.mark_retry(retries, str(e))
+            if failed:
+                self.outbox.mark_failed(failed, str(e))
+            return
+        self.outbox.mark_sent([a["id"] for a in alerts])
+        self.sent += len(alerts)
+        self.batches += 1
+
+
+class FakeGatewayServer:
+    """테스트용 가짜 SMS/119 게이트웨이입니다. 받은 알림 묶음을 기록하고, 설정한 만큼 실패 응답을 돌려줍니다."""
+    def __init__(self, host="127.0.0.1", port=0, fail_first=0, fail_rate=0.0, latency=0.0):
+        self.fail_first = fail_first
+        self.fail_rate = fail_rate
+        self.latency = latency
+        self.batches = []
+        self.requests = 0
+        gateway = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                gateway.requests += 1
+                if gateway.latency:
+                    time.sleep(gateway.latency)
+                if gateway.requests <= gateway.fail_first or random.random() < gateway.fail_rate:
+                    self.send_response(503)
+                else:
+                    gateway.batches.append(json.loads(body)["alerts"])
+                    self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://{host}:{self.server.server_port}/alerts"
+
+    @property
+    def received(self):
+        return [alert for batch in self.batches for alert in batch]
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, name="swg-fake-gateway", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    # 처음 2번은 실패하는 가짜 게이트웨이로 재시도/중복 제거/묶음 전송 확인
+    gateway = FakeGatewayServer(fail_first=2).start()
+    outbox = AlertOutbox(os.path.join(tempfile.mkdtemp(), "alerts.db"))
+    dispatcher = AlertDispatcher(outbox, HttpGateway(gateway.url), base_backoff=0.2, batch_wait=0.2).start()
+
+    started = time.perf_counter()
+    queued = 0
+    for node in range(200):
+        for _ in range(3):  # 같은 노드의 반복 DANGER 이벤트
+            queued += dispatcher.enqueue(f"NODE-{node:03d}", "🚨 이상 충격 감지!", "DANGER") is not None
+    enqueue_ms = (time.perf_counter() - started) * 1000
+    print(f"📥 600건 enqueue: {enqueue_ms:.1f} ms (중복 제거 후 {queued}건)")
+
+    while outbox.stats().get("pending"):
+        time.sleep(0.1)
+    print(f"📤 전송 완료: {outbox.stats()} / 게이트웨이 요청 {gateway.requests}회, "
+          f"성공 묶음 {len(gateway.batches)}개, 수신 {len(gateway.received)}건")
@@ -0,0 +1,123 @@
+import time
+import numpy as np
+
+
+class BatchPredictor:
+    """여러 노드의 특징 벡터를 모아 한 번의 model 호출로 추론합니다.
+
+    max_batch_size개가 모이거나 가장 오래된 행이 max_wait초를 넘기면 flush 합니다.
+    """
+    def __init__(self, model, max_batch_size=256, max_wait=0.05, n_features=3):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.features = np.zeros((max_batch_size, n_features))
+        self.node_ids = []
+        self.first_at = None
+        # 노드별 최신 추론 결과: {"label", "confidence", "proba", "updated"}
+        self.states = {}
+        self.batches = 0
+        self.rows = 0
+
+    def __len__(self):
+        return len(self.node_ids)
+
+    def submit(self, node_id, features, now=None):
+        """특징 벡터 한 행을 추가합니다. 배치가 가득 차면 즉시 flush 합니다."""
+        now = time.time() if now is None else now
+        if len(self.node_ids) >= self.max_batch_size:
+            self.flush(now)
+        if not self.node_ids:
+            self.first_at = now
+        self.features[len(self.node_ids)] = features
+        self.node_ids.append(node_id)
+        if len(self.node_ids) >= self.max_batch_size:
+            self.flush(now)
+
+    def submit_many(self, node_ids, features, now=None):
+        """(N, n_features) 배열을 한 번에 추가합니다."""
+        now = time.time() if now is None else now
+        features = np.asarray(features, dtype=float)
+        start = 0
+        while start < len(node_ids):
+            if not self.node_ids:
+                self.first_at = now
+            n = len(self.node_ids)
+            take = min(self.max_batch_size - n, len(node_ids) - start)
+            self.features[n:n + take] = features[start:start + take]
+            self.node_ids.extend(node_ids[start:start + take])
+            start += take
+            if len(self.node_ids) >= self.max_batch_size:
+                self.flush(now)
+
+    def due(self, now=None):
+        if not self.node_ids:
+            return False
+        now = time.time() if now is None else now
+        return len(self.node_ids) >= self.max_batch_size or now - self.first_at >= self.max_wait
+
+    def poll(self, now=None):
+        """대기 시간이 지났으면 flush 하고, 갱신된 노드 목록을 반환합니다."""
+        if self.due(now):
+            return self.flush(now)
+        return []
+
+    def flush(self, now=None):
+        """모인 행 전체를 한 번에 추론하고 결과를 노드별 상태에 나눠 담습니다."""
+        n = len(self.node_ids)
+        if n == 0:
+            return []
+        now = time.time() if now is None else now
+        X = self.features[:n]
+
+        if hasattr(self.model, "predict_proba"):
+            proba = self.model.predict_proba(X)
+            best = proba.argmax(axis=1)
+            labels = np.asarray(self.model.classes_)[best]
+            confidences = proba[np.arange(n), best] * 100
+        else:
+            proba = [None] * n
+            labels = np.asarray(self.model.predict(X))
+            confidences = np.full(n, np.nan)
+
+        node_ids = self.node_ids
+        for node_id, label, conf, row in zip(node_ids, labels.tolist(), confidences.tolist(), proba):
+            # 같은 노드의 여러 프레임이 있으면 마지막 행이 최신 상태
+            self.states[node_id] = {"label": label, "confidence": conf, "proba": row, "updated": now}
+
+        self.node_ids = []
+        self.first_at = None
+        self.batches += 1
+        self.rows += n
+        return node_ids
+
+    def result(self, node_id):
+        return self.states.get(node_id)
+
+
+if __name__ == "__main__":
+    import joblib
+
+    model = joblib.load("model_rf.pkl")
+    rng = np.random.default_rng(0)
+    n_nodes = 200
+    X = np.column_stack([
+        rng.normal(30, 4, n_nodes),
+        rng.normal(18000, 3000, n_nodes),
+        rng.uniform(0, 30, n_nodes),
+    ])
+    node_ids = [f"NODE-{i:04d}" for i in range(n_nodes)]
+
+    started = time.perf_counter()
+    for row in X:
+        model.predict(row.reshape(1, -1))
+    single = time.perf_counter() - started
+
+    batcher = BatchPredictor(model, max_batch_size=n_nodes)
+    started = time.perf_counter()
+    batcher.submit_many(node_ids, X)
+    batcher.flush()
+    batched = time.perf_counter() - started
+
+    print(f"🐢 행 단위 predict {n_nodes}회: {single * 1000:.1f} ms")
+    print(f"⚡ 배치 predict_proba 1회: {batched * 1000:.1f} ms ({single / batched:.0f}x)")
@@ -0,0 +1,204 @@
+"""감지 루프 단계별 벤치마크
+
+실제 코드 경로를 Streamlit 없이 고정 시드 프레임으로 실행해 단계별 지연 시간(p50/p99),
+처리량, 최대 메모리를 노드 수와 격자 해상도별로 측정하고 JSON으로 저장합니다.
+
+    python benchmark.py --nodes 1 50 200 --shapes 8x8 16x16 --output bench.json
+    python benchmark.py --baseline bench.json   # 기준 결과 대비 느려진 단계가 있으면 종료 코드 1
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+import numpy as np
+
+from forest import load_model
+from model_registry import get_registry
+from pipeline import DetectionPipeline, SimulatedSource
+from renderer import FigureRenderer, LutRenderer
+from upsample import CubicUpsampler
+from utils import CoordinateSmoother, MultiNodeBuffer, MultiScaleBuffer, get_heat_center, min_max_normalize
+
+SEED = 42
+UPSCALE = 8
+
+
+def measure(fn, repeats=50, warmup=3, frames=1):
+    """fn을 repeats번 실행해 지연 시간 분위수, 처리량(frames/s), 1회 실행의 최대 메모리를 잽니다."""
+    for _ in range(warmup):
+        fn()
+    samples = np.empty(repeats)
+    for i in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples[i] = time.perf_counter() - started
+
+    # tracemalloc은 실행을 느리게 하므로 시간 측정과 따로 한 번만 실행
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "p50_ms": float(np.percentile(samples, 50) * 1000),
+        "p99_ms": float(np.percentile(samples, 99) * 1000),
+        "mean_ms": float(samples.mean() * 1000),
+        "throughput_fps": float(frames / samples.mean()),
+        "peak_kb": peak / 1024,
+    }
+
+
+def build_stages(n_nodes, shape, model, registry):
+    """(이름, 함수, 한 번에 처리하는 프레임 수) 목록을 만듭니다. 입력은 매번 같은 시드로 생성됩니다."""
+    node_ids = [f"NODE-{i:04d}" for i in range(n_nodes)]
+    source = SimulatedSource(node_ids, shape=shape, seed=SEED)
+    batches = [source.read() for _ in range(16)]
+    pixels = batches[0]["pixels"]
+    impacts = batches[0]["impact"]
+    detected = pixels.max(axis=(1, 2)) > 30
+    normalized = min_max_normalize(pixels)
+    features = np.column_stack([pixels.max(axis=(1, 2)), impacts, np.full(n_nodes, 10.0)])
+
+    legacy_buffers = [MultiScaleBuffer() for _ in range(n_nodes)]
+    node_buffer = MultiNodeBuffer(n_nodes)
+    smoothers = [CoordinateSmoother() for _ in range(n_nodes)]
+    upsampler = CubicUpsampler(shape, scale=UPSCALE)
+    lut = LutRenderer()
+    figure = FigureRenderer(shape=shape)
+    processed = upsampler(normalized[0])
+
+    def buffers_per_node():
+        for i, buf in enumerate(legacy_buffers):
+            buf.update(impacts[i], detected[i])
+            buf.get_features()
+
+    def buffers_vectorized():
+        node_buffer.update(impacts, detected)
+        node_buffer.get_features()
+
+    def heat_centers():
+        for frame in pixels:
+            get_heat_center(frame)
+
+    def smoothing():
+        for i, smoother in enumerate(smoothers):
+            smoother.update(i % shape[0], i % shape[1])
+
+    pipeline = DetectionPipeline(source, registry, capacity=n_nodes)
+    tick = iter(range(1 << 62))
+
+    def full_loop():
+        # 추론 스레드 한 틱 + 화면에 보이는 한 노드의 열화상 렌더링
+        batch = batches[next(tick) % len(batches)]
+        pipeline.process(batch)
+        state = pipeline.snapshot[node_ids[0]]
+        lut.render(upsampler(min_max_normalize(state["pixels"])))
+
+    return [
+        ("min_max_normalize", lambda: min_max_normalize(pixels), n_nodes),
+        ("MultiScaleBuffer (노드별)", buffers_per_node, n_nodes),
+        ("MultiNodeBuffer (벡터화)", buffers_vectorized, n_nodes),
+        ("get_heat_center", heat_centers, n_nodes),
+        ("CoordinateSmoother.update", smoothing, n_nodes),
+        ("model.predict", lambda: model.predict(features), n_nodes),
+        ("CubicUpsampler", lambda: upsampler(normalized), n_nodes),
+        ("LutRenderer.render (1장)", lambda: lut.render(processed), 1),
+        ("FigureRenderer 열화상 (1장)", lambda: (figure.render_heatmap(processed), figure.to_png()), 1),
+        ("FigureRenderer 아이콘 (1장)",
+         lambda: (figure.render_icons([[1, 1]], "P", "#00F2FF", "PERSON"), figure.to_png()), 1),
+        ("전체 루프", full_loop, n_nodes),
+    ]
+
+
+def run(nodes, shapes, repeats, model_path):
+    registry = get_registry(model_path, loader=load_model)
+    model = registry.get()
+    results = []
+    for shape in shapes:
+        for n_nodes in nodes:
+            for name, fn, frames in build_stages(n_nodes, shape, model, registry):
+                # matplotlib 경로는 느리므로 반복 횟수를 줄임
+                n = max(5, repeats // 5) if name.startswith("FigureRenderer") else repeats
+                stats = measure(fn, repeats=n, frames=frames)
+                results.append({"stage": name, "nodes": n_nodes, "shape": list(shape), **stats})
+                print(f"  {shape[0]}x{shape[1]} | {n_nodes:5d}노드 | {name:28s} "
+                      f"p50 {stats['p50_ms']:8.3f} ms  p99 {stats['p99_ms']:8.3f} ms  "
+                      f"{stats['throughput_fps']:12,.0f} frames/s  {stats['peak_kb']:9.1f} KB")
+    return results
+
+
+def compare(results, baseline, tolerance, min_delta_ms=0.05, key=None, label=None, value="p50_ms"):
+    """같은 (단계, 노드 수, 해상도)의 p50을 비교해 tolerance 비율 이상 느려진 항목을 반환합니다.
+
+    수 µs 단위 단계의 측정 잡음을 걸러내기 위해 min_delta_ms 미만의 차이는 무시합니다.
+    key / label / value를 바꾸면 다른 측정 결과 목록도 같은 방식으로 비교합니다 (coldstart.py).
+    """
+    key = key or (lambda r: (r["stage"], r["nodes"], tuple(r["shape"])))
+    label = label or (lambda r: f"{r['shape'][0]}x{r['shape'][1]} | {r['nodes']:5d}노드 | {r['stage']:28s}")
+    base = {key(r): r for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        old = base.get(key(r))
+        if old is None or old[value] is None or r[value] is None:
+            continue
+        ratio = r[value] / old[value] if old[value] > 0 else 1.0
+        slower = ratio > 1 + tolerance and r[value] - old[value] >= min_delta_ms
+        mark = "🔺" if slower else ("🔻" if ratio < 1 - tolerance else "  ")
+        print(f"{mark} {label(r)} {old[value]:8.3f} -> {r[value]:8.3f} ms ({ratio:.2f}x)")
+        if slower:
+            regressions.append({**r, f"baseline_{value}": old[value], "ratio": ratio})
+    return regressions
+
+
+def parse_shape(text):
+    rows, cols = text.lower().split("x")
+    return int(rows), int(cols)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SmartWallGuard 감지 루프 벤치마크")
+    parser.add_argument("--nodes", type=int, nargs="+", default=[1, 50, 200])
+    parser.add_argument("--shapes", type=parse_shape, nargs="+", default=[(8, 8), (16, 16)])
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--model", default="model_rf.pkl", help="joblib 피클 또는 경량 .npz 모델")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="허용하는 p50 증가 비율")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05, help="무시하는 p50 증가폭 (ms)")
+    args = parser.parse_args()
+
+    # 기준 결과는 측정 전에 읽어 둠 (--output과 같은 파일이면 새 결과로 덮어쓴 뒤 자기 자신과 비교하게 됨)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print(f"⏱️ 벤치마크 시작 (seed={SEED}, repeats={args.repeats})")
+    results = run(args.nodes, args.shapes, args.repeats, args.model)
+
+    report = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "seed": SEED,
+            "repeats": args.repeats,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"💾 결과 저장: {args.output}")
+
+    if baseline is not None:
+        print(f"📊 기준 결과 비교: {args.baseline} (허용 {args.tolerance:.0%})")
+        regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+        if regressions:
+            print(f"🚨 느려진 항목 {len(regressions)}개")
+            sys.exit(1)
+        print("✅ 느려진 항목 없음")
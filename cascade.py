@@ -0,0 +1,91 @@
+import numpy as np
+
+# 노드별로 바꿀 수 있는 규칙 임계값 (기본값은 기존 main.py 규칙과 같음)
+DEFAULT_THRESHOLDS = {
+    "impact_min": 24000.0,      # 순간 충격량이 이보다 크면 이상 충격 (2)
+    "fall_min": 17500.0,        # 순간 충격량이 fall_min ~ fall_max 사이면 낙상 (3)
+    "fall_max": 23000.0,
+    "suppress_below": 17000.0,  # 순간 충격량이 이보다 작으면 모델의 충격/낙상 예측을 정상으로 보정
+    "safe_max_temp": 26.0,      # 최고 온도, 시간 창 최대 충격, 체류 시간이 모두 아래면 명백한 정상 (0)
+    "safe_max_impact": 17000.0,
+    "safe_max_stay": 5.0,
+}
+
+
+class RuleCascade:
+    """모델 앞단의 규칙 단계입니다. 명백한 SAFE/DANGER 프레임은 벡터 연산으로 바로 판정하고
+    애매한 프레임만 RandomForest로 보냅니다.
+
+    규칙으로 판정한 프레임 중 audit_rate 비율은 모델도 함께 돌려 최종 결과가 같은지 집계하므로
+    (agreement) 규칙이 결과를 바꾸지 않는지 운영 중에 확인할 수 있습니다.
+    """
+    def __init__(self, capacity, audit_rate=0.05, seed=None, **defaults):
+        unknown = set(defaults) - set(DEFAULT_THRESHOLDS)
+        if unknown:
+            raise ValueError(f"알 수 없는 임계값: {sorted(unknown)}")
+        self.thresholds = {k: np.full(capacity, float(defaults.get(k, v))) for k, v in DEFAULT_THRESHOLDS.items()}
+        self.audit_rate = audit_rate
+        self.rng = np.random.default_rng(seed)
+
+        self.frames = 0
+        self.settled_safe = 0
+        self.settled_danger = 0
+        self.audited = 0
+        self.agreed = 0
+
+    def configure(self, row, **overrides):
+        """노드(row) 하나의 임계값을 바꿉니다."""
+        for key, value in overrides.items():
+            if key not in self.thresholds:
+                raise ValueError(f"알 수 없는 임계값: {key}")
+            self.thresholds[key][row] = value
+
+    def node_thresholds(self, row):
+        return {key: float(values[row]) for key, values in self.thresholds.items()}
+
+    def settle(self, rows, avg_temp, peak_impact, stay_time, impacts):
+        """(labels, audit)를 반환합니다. labels는 규칙으로 정한 클래스, 애매하면 -1입니다."""
+        t = {key: values[rows] for key, values in self.thresholds.items()}
+        impact_hit = impacts > t["impact_min"]
+        fall_hit = (impacts > t["fall_min"]) & (impacts < t["fall_max"]) & ~impact_hit
+        safe = (
+            (avg_temp < t["safe_max_temp"])
+            & (peak_impact < t["safe_max_impact"])
+            & (stay_time < t["safe_max_stay"])
+            & ~impact_hit & ~fall_hit
+        )
+        labels = np.full(len(rows), -1, dtype=np.intp)
+        labels[safe] = 0
+        labels[fall_hit] = 3
+        labels[impact_hit] = 2
+        settled = labels >= 0
+        audit = settled & (self.rng.random(len(rows)) < self.audit_rate)
+
+        self.frames += len(rows)
+        self.settled_safe += int(safe.sum())
+        self.settled_danger += int(impact_hit.sum() + fall_hit.sum())
+        return labels, audit
+
+    def record_audit(self, agreed):
+        self.audited += 1
+        self.agreed += int(agreed)
+
+    @property
+    def skip_rate(self):
+        """모델을 건너뛴 프레임 비율 (감사용 재추론 제외)."""
+        return (self.settled_safe + self.settled_danger) / self.frames if self.frames else 0.0
+
+    @property
+    def agreement(self):
+        """감사한 프레임 중 규칙 판정과 모델 경로의 최종 결과가 같은 비율."""
+        return self.agreed / self.audited if self.audited else 1.0
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "settled_safe": self.settled_safe,
+            "settled_danger": self.settled_danger,
+            "skip_rate": self.skip_rate,
+            "audited": self.audited,
+            "agreement": self.agreement,
+        }
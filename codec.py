@@ -0,0 +1,305 @@
+"""열화상 프레임 압축 형식 (전송/저장 공용)
+
+float64 8x8 프레임을 센서 측정 범위 안의 8/16비트 고정소수점으로 양자화하고, 노드마다 직전 프레임과의
+차이(델타)만 보내며, keyframe_interval 프레임마다 전체 프레임(키프레임)을 넣습니다.
+한 묶음(envelope)에 여러 노드/여러 시점의 프레임을 담고 충격량과 시각도 함께 싣습니다.
+
+오차 한계: 범위 [lo, hi] 안의 값은 복원 오차가 양자화 간격의 절반 이하입니다.
+    error_bound(bits, lo, hi) = (hi - lo) / (2**bits - 1) / 2   (+ float32 반올림)
+    16비트, 0~80 °C: 0.0006 °C / 8비트, 20~40 °C (화면 정규화 범위): 0.039 °C
+범위 밖의 값은 lo/hi로 잘립니다. 델타는 양자화된 정수끼리의 차이라 프레임이 이어져도 오차가 쌓이지 않습니다.
+
+envelope 구조 (리틀 엔디언):
+    헤더 32바이트 (HEADER)
+    본문 (flags & FLAG_ZLIB이면 zlib 압축)
+        프레임 정보 n x 19바이트 (FRAME_DTYPE: 노드 슬롯, 노드별 순번, 시각, 충격량, 종류)
+        전체 폭 값 (KEY: 양자화 값, DELTA: 2**bits 나머지 델타) uint8/uint16 x 픽셀 수
+        좁은 델타 (DELTA8: 모든 픽셀 델타가 -127~127인 16비트 프레임) int8 x 픽셀 수
+"""
+import struct
+import zlib
+import numpy as np
+
+MAGIC = b"SWGQ"
+VERSION = 1
+# magic, 버전, 양자화 비트, 플래그, 행, 열, (예약 3바이트), 프레임 수, 좁은 델타 프레임 수, 하한, 상한, 본문 길이
+HEADER = struct.Struct("<4sBBBBB3xIIffI")
+FLAG_ZLIB = 1
+
+KEY, DELTA, DELTA8 = 0, 1, 2
+FRAME_DTYPE = np.dtype([("node", "<u2"), ("seq", "<u4"), ("timestamp", "<f8"), ("impact", "<f4"), ("kind", "u1")])
+
+DEFAULT_RANGE = (0.0, 80.0)  # 열화상 센서(AMG8833) 측정 범위 (°C)
+
+
+def quantization_step(bits, lo, hi):
+    return (hi - lo) / ((1 << bits) - 1)
+
+
+def error_bound(bits=16, lo=DEFAULT_RANGE[0], hi=DEFAULT_RANGE[1]):
+    """범위 안의 값에 대한 최대 복원 오차 (°C)."""
+    return quantization_step(bits, lo, hi) / 2
+
+
+def quantize(pixels, bits=16, lo=DEFAULT_RANGE[0], hi=DEFAULT_RANGE[1]):
+    q = np.rint((np.clip(pixels, lo, hi) - lo) / quantization_step(bits, lo, hi))
+    return q.astype(np.uint16 if bits == 16 else np.uint8)
+
+
+def dequantize(q, bits=16, lo=DEFAULT_RANGE[0], hi=DEFAULT_RANGE[1]):
+    return (lo + q * quantization_step(bits, lo, hi)).astype(np.float32)
+
+
+def _groups(rows):
+    """같은 노드끼리 모인 순서의 (첫 프레임 여부, 그룹 번호, 그룹 시작 위치, 그룹 마지막 위치)."""
+    first = np.ones(len(rows), dtype=bool)
+    first[1:] = rows[1:] != rows[:-1]
+    starts = np.flatnonzero(first)
+    group = np.cumsum(first) - 1
+    last = np.append(starts[1:] - 1, len(rows) - 1)
+    return first, group, starts, last
+
+
+def _segment_cumsum(values, seg_start):
+    """seg_start에서 다시 시작하는 누적합 (axis=0)."""
+    cs = np.cumsum(values, axis=0)
+    starts = np.flatnonzero(seg_start)
+    base = np.zeros((len(starts),) + values.shape[1:], dtype=cs.dtype)
+    base[1:] = cs[starts[1:] - 1]
+    return cs - base[np.cumsum(seg_start) - 1]
+
+
+class FrameEncoder:
+    """노드별 직전 프레임을 기억하며 프레임 묶음을 envelope 바이트로 인코딩합니다.
+
+    encode()에는 여러 노드의 한 틱은 물론, 같은 노드의 여러 시점 프레임(시간순)도 한 번에 넣을 수 있습니다.
+    rows는 노드 슬롯 번호 (0 ~ capacity-1, 노드 ID와의 대응은 보내는 쪽과 받는 쪽이 공유)입니다.
+    """
+    def __init__(self, capacity=512, shape=(8, 8), bits=16, lo=DEFAULT_RANGE[0], hi=DEFAULT_RANGE[1],
+                 keyframe_interval=30, compress=False, level=1):
+        if bits not in (8, 16):
+            raise ValueError("bits는 8 또는 16이어야 합니다")
+        self.shape = tuple(shape)
+        self.bits = bits
+        self.lo, self.hi = float(lo), float(hi)
+        self.keyframe_interval = keyframe_interval
+        self.compress = compress
+        self.level = level
+        self.modulus = 1 << bits
+        self.dtype = np.uint16 if bits == 16 else np.uint8
+
+        n_pixels = int(np.prod(self.shape))
+        self.prev = np.zeros((capacity, n_pixels), dtype=np.int64)
+        self.seq = np.full(capacity, -1, dtype=np.int64)
+        self.force = np.ones(capacity, dtype=bool)  # 처음이거나 받는 쪽이 요청하면 키프레임
+
+    def request_keyframe(self, rows):
+        """받는 쪽이 기준 프레임을 잃었을 때 (valid=False) 다음 프레임을 키프레임으로 보냅니다."""
+        self.force[rows] = True
+
+    def encode(self, rows, pixels, impact, timestamp):
+        rows = np.asarray(rows, dtype=np.intp)
+        n = len(rows)
+        order = np.argsort(rows, kind="stable")  # 노드별로 모으되 시간 순서는 유지
+        rows = rows[order]
+        q = quantize(np.asarray(pixels).reshape(n, -1)[order], self.bits, self.lo, self.hi).astype(np.int64)
+        first, group, starts, last = _groups(rows)
+
+        seq = self.seq[rows] + 1 + (np.arange(n) - starts[group])
+        prev = np.empty_like(q)
+        prev[1:] = q[:-1]
+        prev[first] = self.prev[rows[first]]
+        key = (seq % self.keyframe_interval == 0) | (first & self.force[rows])
+        diff = q - prev
+        if self.bits > 8:
+            narrow = ~key & (np.abs(diff) <= 127).all(axis=1)
+        else:
+            narrow = np.zeros(n, dtype=bool)  # 8비트는 좁은 델타로 줄어들지 않음
+
+        frames = np.empty(n, dtype=FRAME_DTYPE)
+        frames["node"] = rows
+        frames["seq"] = seq
+        frames["timestamp"] = np.broadcast_to(timestamp, (len(order),))[order]
+        frames["impact"] = np.broadcast_to(impact, (len(order),))[order]
+        frames["kind"] = np.where(key, KEY, np.where(narrow, DELTA8, DELTA))
+        full = np.where(key[:, None], q, diff % self.modulus)[~narrow].astype(self.dtype)
+        body = frames.tobytes() + full.tobytes() + diff[narrow].astype(np.int8).tobytes()
+
+        self.prev[rows[last]] = q[last]
+        self.seq[rows[last]] = seq[last]
+        self.force[rows] = False
+
+        flags = 0
+        if self.compress:
+            body = zlib.compress(body, self.level)
+            flags |= FLAG_ZLIB
+        return HEADER.pack(MAGIC, VERSION, self.bits, flags, *self.shape, n, int(narrow.sum()),
+                           self.lo, self.hi, len(body)) + body
+
+
+def read_envelope(data, offset=0):
+    """offset 위치의 envelope을 (헤더 dict, 프레임 정보, 픽셀 값 int64 (n, 픽셀 수), 다음 offset)로 풉니다."""
+    magic, version, bits, flags, rows, cols, n, n_narrow, lo, hi, length = HEADER.unpack_from(data, offset)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("열화상 프레임 envelope이 아닙니다")
+    start = offset + HEADER.size
+    body = bytes(data[start:start + length])
+    if len(body) != length:
+        raise ValueError("envelope이 잘렸습니다")
+    if flags & FLAG_ZLIB:
+        body = zlib.decompress(body)
+
+    n_pixels = rows * cols
+    width = 2 if bits == 16 else 1
+    frames = np.frombuffer(body, dtype=FRAME_DTYPE, count=n)
+    pos = n * FRAME_DTYPE.itemsize
+    full = np.frombuffer(body, dtype=np.uint16 if bits == 16 else np.uint8, count=(n - n_narrow) * n_pixels,
+                         offset=pos)
+    narrow = np.frombuffer(body, dtype=np.int8, count=n_narrow * n_pixels, offset=pos + full.size * width)
+
+    values = np.empty((n, n_pixels), dtype=np.int64)
+    is_narrow = frames["kind"] == DELTA8
+    values[~is_narrow] = full.reshape(-1, n_pixels)
+    values[is_narrow] = narrow.reshape(-1, n_pixels)
+    header = {"bits": bits, "shape": (rows, cols), "lo": lo, "hi": hi, "frames": n, "bytes": HEADER.size + length}
+    return header, frames, values, start + length
+
+
+class FrameDecoder:
+    """FrameEncoder의 envelope을 프레임 묶음으로 복원합니다 (노드별 기준 프레임을 기억).
+
+    기준 프레임이 없거나 순번이 끊긴 델타 프레임은 다음 키프레임까지 valid=False로 표시합니다.
+    이때 보내는 쪽에 request_keyframe()을 요청하면 됩니다.
+    """
+    def __init__(self, capacity=512):
+        self.capacity = capacity
+        self.prev = None
+        self.seq = np.full(capacity, -1, dtype=np.int64)
+        self.ok = np.zeros(capacity, dtype=bool)
+
+    def decode(self, data, offset=0):
+        header, frames, values, _ = read_envelope(data, offset)
+        bits, lo, hi = header["bits"], header["lo"], header["hi"]
+        if self.prev is None or self.prev.shape[1] != values.shape[1]:
+            self.prev = np.zeros((self.capacity, values.shape[1]), dtype=np.int64)
+
+        order = np.lexsort((frames["seq"], frames["node"]))
+        frames, values = frames[order], values[order]
+        rows = frames["node"].astype(np.intp)
+        seq = frames["seq"].astype(np.int64)
+        first, group, starts, last = _groups(rows)
+        key = frames["kind"] == KEY
+
+        # 델타 프레임은 바로 앞 순번이 있어야 복원 가능 (묶음의 첫 프레임은 이전 묶음의 상태와 비교)
+        chained = np.empty(len(rows), dtype=bool)
+        chained[1:] = seq[1:] == seq[:-1] + 1
+        chained[first] = self.ok[rows[first]] & (self.seq[rows[first]] == seq[first] - 1)
+        broken = ~key & ~chained
+
+        carry = first & ~key
+        values[carry] += self.prev[rows[carry]]
+        seg_start = key | first
+        q = _segment_cumsum(values, seg_start) % (1 << bits)
+        valid = _segment_cumsum(broken.astype(np.int64), seg_start) == 0
+
+        self.prev[rows[last]] = q[last]
+        self.seq[rows[last]] = seq[last]
+        self.ok[rows[last]] = valid[last]
+
+        return {
+            "nodes": rows,
+            "seq": seq,
+            "timestamp": frames["timestamp"],
+            "impact": frames["impact"].astype(float),
+            "pixels": dequantize(q, bits, lo, hi).reshape((len(rows),) + header["shape"]),
+            "valid": valid,
+        }
+
+    def decode_stream(self, data):
+        """envelope을 이어 붙인 바이트(저장 파일)를 차례로 복원합니다."""
+        offset = 0
+        while offset < len(data):
+            header = read_envelope(data, offset)[0]
+            yield self.decode(data, offset)
+            offset += header["bytes"]
+
+
+def simulate_wall(rng, n_nodes, ticks, shape=(8, 8), noise=0.15):
+    """고정된 배경 + 센서 잡음 + 천천히 움직이는 열원 (실제 설치 환경에 가까운 프레임 열)."""
+    rows, cols = shape
+    background = rng.uniform(22, 26, (n_nodes,) + shape)
+    frames = np.repeat(background[None], ticks, axis=0) + rng.normal(0, noise, (ticks, n_nodes) + shape)
+    r = np.clip(np.cumsum(rng.integers(-1, 2, (ticks, n_nodes)), axis=0) + rows // 2, 0, rows - 2)
+    c = np.clip(np.cumsum(rng.integers(-1, 2, (ticks, n_nodes)), axis=0) + cols // 2, 0, cols - 2)
+    present = rng.random(n_nodes) < 0.5
+    t_idx, n_idx = np.nonzero(np.broadcast_to(present, (ticks, n_nodes)))
+    for dr in (0, 1):
+        for dc in (0, 1):
+            frames[t_idx, n_idx, r[t_idx, n_idx] + dr, c[t_idx, n_idx] + dc] += 11.0
+    return frames
+
+
+if __name__ == "__main__":
+    import json
+    import time
+
+    rng = np.random.default_rng(0)
+    n_nodes, ticks = 200, 100
+    scenarios = {
+        "설치 환경 (고정 배경 + 잡음 0.15°C)": simulate_wall(rng, n_nodes, ticks),
+        "시뮬레이터 (매 틱 22~26°C 균일 잡음)": rng.uniform(22, 26, (ticks, n_nodes, 8, 8)) + 0.0,
+    }
+    impact = rng.normal(16384, 600, (ticks, n_nodes))
+    rows = np.arange(n_nodes)
+
+    def json_bytes(frames):
+        # ingestion.FakePublisher와 같은 MQTT-JSON 형식 (열화상 + 충격량 메시지)
+        total = 0
+        for t in range(3):
+            for i in range(n_nodes):
+                total += len(json.dumps({"seq": t, "ts": time.time(), "pixels": np.round(frames[t, i], 2).ravel().tolist()}))
+                total += len(json.dumps({"seq": t, "value": round(float(impact[t, i]), 1)}))
+        return total / (3 * n_nodes)
+
+    configs = [
+        ("16비트 0~80°C", dict(bits=16)),
+        ("16비트 0~80°C + zlib", dict(bits=16, compress=True)),
+        ("8비트 20~40°C", dict(bits=8, lo=20.0, hi=40.0)),
+        ("8비트 20~40°C + zlib", dict(bits=8, lo=20.0, hi=40.0, compress=True)),
+    ]
+    for name, frames in scenarios.items():
+        per_json = json_bytes(frames)
+        print(f"📦 {name}: 노드 {n_nodes}개 x {ticks}틱")
+        print(f"   {'형식':24s} {'바이트/프레임':>12s} {'압축률':>8s} {'인코딩':>14s} {'디코딩':>14s} {'최대 오차':>10s} {'한계':>8s}")
+        print(f"   {'MQTT-JSON (기존)':24s} {per_json:12.1f} {1:8.1f}x")
+        print(f"   {'float64 원시':24s} {64 * 8 + 16:12.1f} {per_json / (64 * 8 + 16):8.1f}x")
+        for label, kwargs in configs:
+            encoder = FrameEncoder(n_nodes, **kwargs)
+            decoder = FrameDecoder(n_nodes)
+            started = time.perf_counter()
+            envelopes = [encoder.encode(rows, frames[t], impact[t], float(t)) for t in range(ticks)]
+            encode_s = time.perf_counter() - started
+            started = time.perf_counter()
+            decoded = [decoder.decode(e) for e in envelopes]
+            decode_s = time.perf_counter() - started
+
+            size = sum(len(e) for e in envelopes) / (n_nodes * ticks)
+            lo, hi = kwargs.get("lo", DEFAULT_RANGE[0]), kwargs.get("hi", DEFAULT_RANGE[1])
+            restored = np.stack([d["pixels"] for d in decoded])
+            assert all(d["valid"].all() for d in decoded)
+            error = np.abs(restored - np.clip(frames, lo, hi)).max()
+            print(f"   {label:24s} {size:12.1f} {per_json / size:8.1f}x "
+                  f"{n_nodes * ticks / encode_s / 1e3:9.0f} k/s {n_nodes * ticks / decode_s / 1e3:9.0f} k/s "
+                  f"{error:10.4f} {error_bound(kwargs['bits'], lo, hi):8.4f}")
+
+    # 한 노드의 녹화 100프레임을 한 번에 인코딩 (저장용), 중간 묶음 유실 시 복구
+    frames = scenarios["설치 환경 (고정 배경 + 잡음 0.15°C)"][:, 0]
+    encoder, decoder = FrameEncoder(1, keyframe_interval=50, compress=True), FrameDecoder(1)
+    stream = encoder.encode(np.zeros(ticks, dtype=np.intp), frames, impact[:, 0], np.arange(ticks, dtype=float))
+    restored = next(decoder.decode_stream(stream))
+    print(f"💾 단일 노드 {ticks}프레임 저장: {len(stream)} 바이트 ({len(stream) / ticks:.1f} 바이트/프레임), "
+          f"최대 오차 {np.abs(restored['pixels'] - frames).max():.4f}°C")
+    encoder, decoder = FrameEncoder(1, keyframe_interval=10), FrameDecoder(1)
+    envelopes = [encoder.encode([0], frames[t:t + 1], impact[t, 0], float(t)) for t in range(30)]
+    valid = [bool(decoder.decode(e)["valid"][0]) for i, e in enumerate(envelopes) if i != 5]  # 5번 유실
+    print(f"🔁 5번 프레임 유실: 복원 불가 {valid.count(False)}프레임 후 다음 키프레임(10번)에서 복구")
@@ -0,0 +1,180 @@
+"""main.py 콜드 스타트 프로파일
+
+새 프로세스에서 main.py 상단의 import를 -X importtime으로 재고, Streamlit AppTest로 main.py를
+실행해 스크립트 시작부터 첫 프레임 전송까지의 시간을 잽니다. main.py는 임시 디렉터리에서 실행하므로
+저장소에 events.db / alerts.db / recordings/가 생기지 않고, 메트릭 엔드포인트는 빈 포트를 씁니다.
+
+    python coldstart.py                                   # 측정 후 coldstart_results.json 저장
+    python coldstart.py --baseline old.json --tolerance 0.2   # 이전 결과보다 느려지면 종료 코드 1
+
+첫 프레임은 세 번 잽니다.
+- 첫 실행: 서버 재시작 뒤 첫 세션 (main.py가 불러오는 모듈 import 포함, streamlit 자체는 제외)
+- 재실행: 같은 세션의 rerun (버튼/설정 변경)
+- 아이콘 모드: 아이콘 모드로 처음 바꿨을 때 (matplotlib 지연 로딩 포함)
+"""
+import argparse
+import ast
+import glob
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MAIN = os.path.join(HERE, "main.py")
+
+
+def main_imports(path=MAIN):
+    """main.py 최상위의 import 모듈 이름을 순서대로 반환합니다."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def import_profile(modules):
+    """modules를 순서대로 import할 때 모듈별 추가 비용(ms)을 반환합니다.
+
+    앞에서 이미 불러온 하위 모듈은 다시 세지 않으므로, 합계가 실제 import 시간과 같습니다.
+    """
+    code = "\n".join(f"import {m}" for m in modules)
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=HERE,
+                            capture_output=True, text=True, check=True).stderr
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, total, name = line.split("|")
+        if name.startswith("  "):
+            continue  # 하위 모듈 (들여쓰기)
+        name = name.strip()
+        if total.strip().isdigit():
+            cumulative[name] = int(total) / 1000
+    profile = []
+    for module in modules:
+        # "import a.b"는 a를 먼저 불러오므로 a와 a.b의 최상위 항목을 합산
+        parts = module.split(".")
+        names = {".".join(parts[:i + 1]) for i in range(len(parts))}
+        profile.append({"module": module, "ms": sum(cumulative.pop(n, 0.0) for n in names)})
+    return profile
+
+
+def _first_frame_child():
+    """(자식 프로세스) AppTest로 main.py를 실행해 첫 프레임까지의 시간을 JSON으로 출력합니다."""
+    import warnings
+    from streamlit.testing.v1 import AppTest
+
+    warnings.filterwarnings("ignore")
+    sys.path.insert(0, HERE)
+    from metrics import METRICS
+    from pipeline import Subscription
+
+    class FirstFrame(Exception):
+        pass
+
+    real_wait = Subscription.wait
+
+    def stop_after_first_frame(self, timeout=None):
+        # 첫 프레임을 보낸 뒤 main.py 루프가 다음 스냅샷을 기다리기 시작하면 종료
+        if METRICS.summary().get("ui_first_frame"):
+            raise FirstFrame()
+        return real_wait(self, timeout)
+
+    Subscription.wait = stop_after_first_frame
+
+    results = {}
+    app = AppTest.from_file(MAIN, default_timeout=120)
+    for name, run in (("cold", app.run), ("rerun", app.run),
+                      ("icon", lambda: app.toggle(key="grid_mode").set_value(True).run())):
+        METRICS.enabled = True
+        METRICS.reset()
+        started = time.perf_counter()
+        run()
+        wall_ms = (time.perf_counter() - started) * 1000
+        summary = METRICS.summary().get("ui_first_frame")
+        results[name] = {"first_frame_ms": summary[3] if summary else None, "wall_ms": wall_ms}
+        time.sleep(1.0)  # 사용자의 다음 조작까지의 간격 (백그라운드 준비 작업이 끝날 시간)
+    print(json.dumps(results))
+
+
+def first_frame_profile():
+    # 임시 디렉터리에 모델만 복사해 두고 실행 (앱이 만드는 DB/녹화 파일은 측정 후 함께 삭제)
+    workdir = tempfile.mkdtemp(prefix="swg-coldstart-")
+    try:
+        for path in glob.glob(os.path.join(HERE, "model_rf.*")):
+            shutil.copy(path, workdir)
+        env = dict(os.environ, SWG_METRICS_PORT="0")
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child"], cwd=workdir, env=env,
+                             capture_output=True, text=True, check=True).stdout
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def flatten(result):
+    """import 합계와 각 첫 프레임 시간을 benchmark.compare()로 비교할 수 있는 항목 목록으로 바꿉니다."""
+    rows = [{"item": "import 합계", "ms": sum(m["ms"] for m in result["imports"])}]
+    rows += [{"item": f"첫 프레임 ({k})", "ms": v["first_frame_ms"]} for k, v in result["first_frame"].items()]
+    return rows
+
+
+def compare(result, baseline, tolerance, min_delta_ms):
+    """이전 결과보다 느려진 항목을 반환합니다."""
+    from benchmark import compare as compare_results  # 자식 프로세스의 콜드 스타트 측정에 섞이지 않도록 여기서만 불러옴
+
+    return compare_results(flatten(result), {"results": flatten(baseline)}, tolerance, min_delta_ms,
+                           key=lambda r: r["item"], label=lambda r: f"{r['item']:24s}", value="ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="main.py 콜드 스타트 프로파일")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--output", default="coldstart_results.json")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="허용하는 증가 비율")
+    parser.add_argument("--min-delta-ms", type=float, default=20.0, help="이보다 작은 차이는 잡음으로 무시")
+    args = parser.parse_args()
+
+    if args.child:
+        _first_frame_child()
+        sys.exit(0)
+
+    # 기준 결과는 측정 전에 읽어 둠 (--output과 같은 파일이면 덮어쓴 뒤 자기 자신과 비교하게 됨)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    modules = main_imports()
+    print(f"📦 main.py import 프로파일 ({len(modules)}개 모듈, 새 프로세스)")
+    imports = import_profile(modules)
+    for m in sorted(imports, key=lambda m: -m["ms"]):
+        print(f"   {m['module']:24s} {m['ms']:8.1f} ms")
+    print(f"   {'합계':24s} {sum(m['ms'] for m in imports):8.1f} ms")
+
+    print("🖼️ 첫 프레임까지 (스크립트 시작 -> 첫 열화상/아이콘 전송)")
+    first_frame = first_frame_profile()
+    labels = {"cold": "첫 실행", "rerun": "재실행", "icon": "아이콘 모드 전환"}
+    for key, r in first_frame.items():
+        shown = f"{r['first_frame_ms']:8.1f} ms" if r["first_frame_ms"] is not None else "     측정 실패"
+        print(f"   {labels[key]:24s} {shown} (AppTest 실행 {r['wall_ms']:.0f} ms)")
+
+    result = {"python": sys.version.split()[0], "imports": imports, "first_frame": first_frame}
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"💾 결과 저장: {args.output}")
+
+    if baseline is not None:
+        regressions = compare(result, baseline, args.tolerance, args.min_delta_ms)
+        if regressions:
+            print(f"🚨 콜드 스타트 회귀 {len(regressions)}건 (허용 {args.tolerance:.0%})")
+            sys.exit(1)
+        print("✅ 회귀 없음")
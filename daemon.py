@@ -0,0 +1,310 @@
+"""헤드리스 감지 데몬 (화면 없는 센서 게이트웨이용)
+
+Streamlit / matplotlib / scipy 없이 main.py와 같은 파이프라인
+(센서 획득 -> 노드별 시간 창 버퍼 -> 모델 -> 충격량 규칙/오버라이드 -> 이벤트 기록)을
+계속 실행하고, 이벤트를 한 줄짜리 JSON으로 stdout 또는 로컬 소켓에 내보냅니다.
+
+    python daemon.py --nodes 50                     # stdout (JSON Lines)
+    python daemon.py --emit udp://127.0.0.1:9999    # UDP 데이터그램
+    python daemon.py --emit unix:///tmp/swg.sock    # 유닉스 도메인 데이터그램 소켓
+    python daemon.py --replay recordings/20260101.swgrec --speed 0
+    python daemon.py --mqtt 192.168.0.10:1883        # 실제 MQTT 브로커의 swg/<노드>/... 토픽 구독
+    python daemon.py --compare                      # Streamlit 앱 대비 시작 시간 / RSS 비교
+    python daemon.py --check-replay                 # 짧은 녹화를 최대 속도로 재생해 스스로 종료하는지 확인
+
+numpy와 모델 런타임(forest.py)만 불러옵니다. 경량 모델(model_rf.npz)을 쓰면 sklearn/joblib도
+불러오지 않습니다.
+"""
+import time
+
+STARTED = time.perf_counter()  # 모듈 실행 시작 (무거운 import 이전)
+
+import argparse
+import json
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+
+from event_store import EventStore
+from codec import FrameEncoder
+from forest import load_model
+from ingestion import IngestionSource
+from model_registry import DEFAULT_MODEL_PATHS, get_registry, newest_path
+from pipeline import DetectionPipeline, SimulatedSource
+
+SENSOR_PERIOD = 0.4
+IDLE_PERIOD = 1.6
+VIBRATION_RATE = 3200
+
+# --compare에서 Streamlit 앱 쪽 비용으로 재는 import 목록 (main.py 상단과 같은 모듈들)
+APP_IMPORTS = ("streamlit", "matplotlib.pyplot", "renderer", "upsample", "tracking", "pipeline",
+               "event_store", "recorder", "metrics", "alerts")
+
+
+def rss_mb():
+    """현재 프로세스의 상주 메모리 (MB). /proc이 없으면 최대 RSS로 대신합니다."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:
+        import resource
+
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage / 1e6 if sys.platform == "darwin" else usage / 1024  # macOS는 바이트, Linux는 KB
+
+
+def default_model_path():
+    """학습 스크립트가 마지막으로 기록한 모델 파일."""
+    return newest_path(DEFAULT_MODEL_PATHS)
+
+
+class EventSink:
+    """이벤트를 JSON 한 줄로 내보냅니다. target: "-" (stdout), "udp://호스트:포트", "unix:///경로"."""
+    def __init__(self, target="-"):
+        self.target = target
+        self.sock = None
+        self.address = None
+        self.dropped = 0
+        if target.startswith("udp://"):
+            host, _, port = target[len("udp://"):].rpartition(":")
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.address = (host or "127.0.0.1", int(port))
+        elif target.startswith("unix://"):
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self.address = target[len("unix://"):]
+        elif target != "-":
+            raise ValueError(f"지원하지 않는 출력 대상: {target}")
+        if self.sock is not None:
+            self.sock.setblocking(False)  # 받는 쪽 버퍼가 차도 감지 루프가 멈추지 않도록 함
+
+    def emit(self, event):
+        line = json.dumps({
+            "seq": event["seq"], "ts": event["ts"], "node": event["노드"], "time": event["시각"],
+            "event": event["이벤트"], "risk": event["위험도"], "detail": event["상세수치"],
+        }, ensure_ascii=False)
+        if self.sock is None:
+            sys.stdout.write(line + "\n")
+            sys.stdout.flush()
+            return
+        try:
+            self.sock.sendto(line.encode("utf-8"), self.address)
+        except OSError:
+            self.dropped += 1  # 받는 쪽이 없거나 밀려 있어도 감지는 계속함
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+
+
+def build_pipeline(args):
+    # --model을 주지 않으면 .npz/.pkl 중 마지막으로 학습한 파일을 서비스하고 핫 리로드
+    registry = get_registry(args.model or DEFAULT_MODEL_PATHS, loader=load_model)
+    registry.get()  # 모델이 없으면 시작 시점에 ModelLoadError로 바로 종료
+    node_ids = None
+    if args.replay:
+        from recorder import ReplaySource
+
+        source = ReplaySource(args.replay, speed=args.speed or None)
+        node_ids = source.node_ids
+    elif args.mqtt:
+        if args.shards:
+            raise SystemExit("--shards는 노드 목록을 미리 아는 시뮬레이션/--replay에서만 쓸 수 있습니다")
+        from ingestion import MqttBroker
+
+        host, _, port = args.mqtt.rpartition(":") if ":" in args.mqtt else (args.mqtt, "", "1883")
+        source = IngestionSource(broker=MqttBroker(host, int(port)), capacity=max(512, args.nodes))
+    else:
+        # 시뮬레이션 센서도 게이트웨이 메시지로 발행해 실제 수신 경로(IngestionEngine)를 거침
+        node_ids = [f"NODE-{i + 1:03d}" for i in range(args.nodes)]
+        simulator = SimulatedSource(node_ids, sample_rate=VIBRATION_RATE, period=args.period)
+        encoder = FrameEncoder(len(node_ids), simulator.shape) if args.wire == "codec" else None
+        source = IngestionSource(simulator, capacity=max(512, args.nodes), period=args.period, encoder=encoder)
+    # 녹화 재생은 --nodes와 상관없이 녹화에 들어 있는 노드 수만큼 버퍼를 잡음
+    capacity = max(512, args.nodes, len(getattr(source, "node_ids", ())))
+
+    recorder = None
+    if args.record:
+        from recorder import FrameRecorder
+
+        recorder = FrameRecorder(args.record)
+    alerts = None
+    if args.alert_url:
+        from alerts import AlertDispatcher, AlertOutbox, HttpGateway
+
+        alerts = AlertDispatcher(AlertOutbox(args.alert_db), HttpGateway(args.alert_url))
+        alerts.start()
+
+    if args.shards:
+        # 노드를 워커 프로세스에 나눠 처리 (같은 스냅샷/구독 인터페이스, 유휴 주기 조절은 하지 않음)
+        from sharding import ShardedDetectionPipeline
+
+        return ShardedDetectionPipeline(node_ids, args.model or DEFAULT_MODEL_PATHS, args.shards, source, registry,
+                                        shape=source.shape,
+                                        pipeline_kwargs={"skip_static": True, "rule_cascade": True},
+                                        store=EventStore(args.events_db), period=args.period,
+                                        idle_timeout=float("inf"), recorder=recorder, alerts=alerts)
+    return DetectionPipeline(source, registry, store=EventStore(args.events_db), period=args.period,
+                             capacity=capacity, idle_timeout=float("inf"), recorder=recorder,
+                             alerts=alerts, skip_static=True, idle_period=IDLE_PERIOD, rule_cascade=True)
+
+
+def run(pipeline, sink, stop, ticks=None):
+    """파이프라인 스냅샷이 발행될 때마다 새 이벤트를 sink로 내보냅니다. 첫 스냅샷까지 걸린 시간(ms)을 반환합니다."""
+    subscription = pipeline.subscribe()
+    last = pipeline.store.recent(limit=1)
+    seq = last[0]["seq"] if last else 0  # 이전 실행의 이벤트는 다시 보내지 않음
+    ready_ms = None
+    published = 0
+    errors = 0
+    pipeline.start()
+    while not stop.is_set():
+        if subscription.wait(timeout=1.0) is not None:
+            published += 1
+            if ready_ms is None:
+                ready_ms = (time.perf_counter() - STARTED) * 1000
+                print(f"🟢 감지 시작: {ready_ms:.0f} ms, RSS {rss_mb():.1f} MB, 노드 {len(pipeline.snapshot)}",
+                      file=sys.stderr)
+        if pipeline.process_errors != errors:
+            errors = pipeline.process_errors
+            print(f"⚠️ 프레임 처리 오류 (누적 {errors}건): {pipeline.process_error!r}", file=sys.stderr)
+        if not pipeline.running:
+            # 녹화 재생이 끝났으면 추론 스레드가 남은 프레임을 처리하고 멈출 때까지 기다림,
+            # 재생 중이 아닌데 한쪽 스레드가 죽었다면 남은 쪽도 멈추고 종료
+            if not getattr(pipeline.source, "finished", False):
+                pipeline.stop()
+            pipeline.join()
+            for event in pipeline.events_since(seq):
+                seq = event["seq"]
+                sink.emit(event)
+            break
+        for event in pipeline.events_since(seq):
+            seq = event["seq"]
+            sink.emit(event)
+        if ticks and published >= ticks:
+            break  # 지정한 틱 수 도달
+    pipeline.stop()
+    return ready_ms
+
+
+def compare(model_path, nodes):
+    """데몬과 Streamlit 앱 의존성을 각각 새 프로세스로 띄워 시작 시간과 RSS를 비교합니다."""
+    app_code = (
+        "import time; started = time.perf_counter()\n"
+        f"import {', '.join(APP_IMPORTS)}\n"
+        "import json, daemon\n"
+        f"daemon.load_model({model_path!r})\n"
+        "print(json.dumps({'ready_ms': (time.perf_counter() - started) * 1000, 'rss_mb': daemon.rss_mb()}))\n"
+    )
+    runs = [
+        ("헤드리스 데몬", [sys.executable, __file__, "--model", model_path, "--nodes", str(nodes), "--ticks", "1",
+                      "--events-db", ":memory:", "--report-json"]),
+        ("Streamlit 앱 (import + 모델, UI 제외)", [sys.executable, "-c", app_code]),
+    ]
+    here = os.path.dirname(os.path.abspath(__file__))
+    print(f"{'대상':40s} {'전체(ms)':>9s} {'준비(ms)':>9s} {'RSS(MB)':>8s}")
+    for name, cmd in runs:
+        started = time.perf_counter()
+        out = subprocess.run(cmd, cwd=here, capture_output=True, text=True, check=True).stdout
+        wall_ms = (time.perf_counter() - started) * 1000
+        report = json.loads(out.strip().splitlines()[-1])
+        print(f"{name:40s} {wall_ms:9.0f} {report['ready_ms']:9.0f} {report['rss_mb']:8.1f}")
+    print("   전체: 인터프리터 시작부터 종료까지 / 준비: 모듈 실행 시작부터 첫 감지(데몬) 또는 import+모델 로드(앱)")
+
+
+def check_replay(model_path, nodes, ticks=50, timeout=30.0):
+    """짧은 녹화를 만들어 --replay --speed 0으로 재생하고, 제시간에 스스로 종료하며 모든 프레임을 처리하는지 확인합니다."""
+    from recorder import FrameRecorder
+
+    workdir = tempfile.mkdtemp()
+    path = os.path.join(workdir, "check.swgrec")
+    recorder = FrameRecorder(path)
+    source = SimulatedSource([f"NODE-{i + 1:03d}" for i in range(nodes)], seed=0)
+    for k in range(ticks):
+        batch = source.read()
+        batch["timestamp"][:] = 1e9 + k * SENSOR_PERIOD  # 녹화 기준 0.4초 간격
+        recorder.append(batch["node_ids"], batch["pixels"], batch["impact"], batch["timestamp"])
+    recorder.close()
+
+    cmd = [sys.executable, os.path.abspath(__file__), "--model", model_path, "--replay", path, "--speed", "0",
+           "--events-db", ":memory:", "--report-json"]
+    started = time.perf_counter()
+    try:
+        done = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        print(f"🚨 재생이 {timeout:.0f}s 안에 끝나지 않았습니다 ({ticks}틱 x 노드 {nodes}개)")
+        return False
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    elapsed = time.perf_counter() - started
+    if done.returncode != 0:
+        print(f"🚨 종료 코드 {done.returncode}\n{done.stderr}")
+        return False
+    report = json.loads(done.stdout.strip().splitlines()[-1])
+    expected = ticks * nodes
+    ok = report["frames"] == expected
+    print(f"{'✅' if ok else '🚨'} 재생 {ticks}틱 x 노드 {nodes}개: {elapsed:.2f}s 만에 종료, "
+          f"처리 {report['frames']}/{expected} 프레임 (녹화 기준 {ticks * SENSOR_PERIOD:.0f}s 분량)")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SmartWallGuard 헤드리스 감지 데몬")
+    parser.add_argument("--model", help="경량 .npz 또는 joblib 피클 모델 (기본: 둘 중 마지막으로 학습한 파일)")
+    parser.add_argument("--nodes", type=int, default=1, help="시뮬레이션 노드 수")
+    parser.add_argument("--period", type=float, default=SENSOR_PERIOD)
+    parser.add_argument("--replay", help="시뮬레이션 대신 재생할 .swgrec 녹화 파일")
+    parser.add_argument("--mqtt", help="시뮬레이션 대신 구독할 MQTT 브로커 (호스트[:포트], paho-mqtt 필요)")
+    parser.add_argument("--shards", type=int, default=0,
+                        help="노드를 이 수만큼의 워커 프로세스에 나눠 처리 (sharding.py, 0: 단일 프로세스)")
+    parser.add_argument("--wire", choices=("codec", "json"), default="codec",
+                        help="시뮬레이션 게이트웨이의 전송 형식 (codec: 16비트 델타 묶음, json: 노드별 MQTT-JSON)")
+    parser.add_argument("--speed", type=float, default=1.0, help="재생 배속 (0: 대기 없이 최대 속도)")
+    parser.add_argument("--record", help="센서 원본 프레임을 녹화할 .swgrec 경로")
+    parser.add_argument("--events-db", default="events.db", help="이벤트 저장소 (':memory:'이면 파일에 남기지 않음)")
+    parser.add_argument("--emit", default="-", help="이벤트 출력: - (stdout), udp://호스트:포트, unix:///경로")
+    parser.add_argument("--alert-url", help="DANGER 알림을 보낼 게이트웨이 주소 (지정하면 alerts 모듈 사용)")
+    parser.add_argument("--alert-db", default="alerts.db")
+    parser.add_argument("--ticks", type=int, help="스냅샷을 이만큼 발행하면 종료 (측정/점검용)")
+    parser.add_argument("--report-json", action="store_true", help="종료 시 시작 시간/RSS를 JSON 한 줄로 출력")
+    parser.add_argument("--compare", action="store_true", help="Streamlit 앱과 시작 시간/RSS 비교")
+    parser.add_argument("--check-replay", action="store_true", help="녹화 재생이 최대 속도로 끝나고 종료되는지 확인")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(args.model or default_model_path(), args.nodes)
+        sys.exit(0)
+    if args.check_replay:
+        sys.exit(0 if check_replay(args.model or default_model_path(), max(args.nodes, 5)) else 1)
+
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+
+    pipeline = build_pipeline(args)
+    sink = EventSink(args.emit)
+    try:
+        ready_ms = run(pipeline, sink, stop, args.ticks)
+    except BrokenPipeError:
+        # stdout을 읽던 프로세스가 끝남 (예: | head): 조용히 종료
+        sys.stdout = open(os.devnull, "w")
+        ready_ms = None
+    finally:
+        sink.close()
+        if pipeline.alerts is not None:
+            pipeline.alerts.stop()
+        if pipeline.recorder is not None:
+            pipeline.recorder.close()
+        if hasattr(pipeline.source, "close"):
+            pipeline.source.close()
+
+    heavy = sorted(m for m in ("streamlit", "matplotlib", "scipy", "sklearn", "pandas", "joblib") if m in sys.modules)
+    print(f"🛑 종료: 처리 프레임 {pipeline.frame_seq}, 이벤트 {pipeline.store.count()}건, RSS {rss_mb():.1f} MB, "
+          f"무거운 모듈 {heavy or '없음'}", file=sys.stderr)
+    if args.report_json:
+        print(json.dumps({"ready_ms": ready_ms, "rss_mb": rss_mb(), "heavy_modules": heavy,
+                          "frames": pipeline.frame_seq + pipeline.skipped_frames}))
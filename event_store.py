@@ -0,0 +1,145 @@
+import sqlite3
+import threading
+import time
+from collections import deque
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    node TEXT NOT NULL,
+    time_text TEXT NOT NULL,
+    event TEXT NOT NULL,
+    risk TEXT NOT NULL,
+    detail TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_node ON events (node, id);
+CREATE INDEX IF NOT EXISTS idx_events_ts ON events (ts);
+CREATE INDEX IF NOT EXISTS idx_events_risk ON events (risk, id);
+
+-- 위험도별 건수를 INSERT 시점에 갱신해 두어 시작할 때 전체를 세지 않음
+CREATE TABLE IF NOT EXISTS event_counts (
+    risk TEXT PRIMARY KEY,
+    n INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS trg_events_count AFTER INSERT ON events
+BEGIN
+    INSERT OR IGNORE INTO event_counts (risk, n) VALUES (NEW.risk, 0);
+    UPDATE event_counts SET n = n + 1 WHERE risk = NEW.risk;
+END;
+"""
+
+COLUMNS = "id, ts, node, time_text, event, risk, detail"
+
+
+def _to_event(row):
+    # UI가 쓰는 기존 로그 형식(한글 키)으로 변환
+    return {
+        "seq": row[0],
+        "ts": row[1],
+        "노드": row[2],
+        "시각": row[3],
+        "이벤트": row[4],
+        "위험도": row[5],
+        "상세수치": row[6],
+    }
+
+
+class EventStore:
+    """SQLite(WAL) 기반 추가 전용 이벤트 저장소입니다.
+
+    위험도별 건수와 최근 이벤트 몇 건은 메모리에 유지해 O(1)로 읽고,
+    전체 내역은 인덱스를 이용한 커서 방식 페이지 조회로 읽습니다.
+    """
+    def __init__(self, path="events.db", recent_size=5):
+        self.path = path
+        self.recent_size = recent_size
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._load_counters()
+
+    def _load_counters(self):
+        self.counts = dict(self.conn.execute("SELECT risk, n FROM event_counts"))
+        self.latest = {}
+        self.latest[None] = deque(
+            (_to_event(r) for r in self.conn.execute(
+                f"SELECT {COLUMNS} FROM events ORDER BY id DESC LIMIT ?", (self.recent_size,))),
+            maxlen=self.recent_size)
+        for risk in self.counts:
+            self.latest[risk] = deque(
+                (_to_event(r) for r in self.conn.execute(
+                    f"SELECT {COLUMNS} FROM events WHERE risk = ? ORDER BY id DESC LIMIT ?", (risk, self.recent_size))),
+                maxlen=self.recent_size)
+
+    def append(self, node, time_text, event, risk, detail, ts=None):
+        """이벤트 한 건을 저장하고 기록된 이벤트(dict)를 반환합니다."""
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            with self.conn:
+                cur = self.conn.execute(
+                    "INSERT INTO events (ts, node, time_text, event, risk, detail) VALUES (?, ?, ?, ?, ?, ?)",
+                    (ts, node, time_text, event, risk, detail))
+            record = _to_event((cur.lastrowid, ts, node, time_text, event, risk, detail))
+            self.counts[risk] = self.counts.get(risk, 0) + 1
+            self.latest[None].appendleft(record)
+            self.latest.setdefault(risk, deque(maxlen=self.recent_size)).appendleft(record)
+        return record
+
+    def count(self, risk=None, after=None):
+        """전체 또는 위험도별 누적 건수 (O(1)).
+
+        after를 주면 그 seq 이후의 건수만 셉니다 (인덱스 범위 조회, 화면에서 지운 내역 숨기기).
+        """
+        if after is not None:
+            sql, args = "SELECT COUNT(*) FROM events WHERE id > ?", [after]
+            if risk is not None:
+                sql += " AND risk = ?"; args.append(risk)
+            with self._lock:
+                return self.conn.execute(sql, args).fetchone()[0]
+        if risk is None:
+            return sum(self.counts.values())
+        return self.counts.get(risk, 0)
+
+    def recent(self, risk=None, limit=None, after=None):
+        """가장 최근 이벤트부터 최대 recent_size건 (O(1)). after를 주면 그 seq 이후의 이벤트만."""
+        events = [e for e in self.latest.get(risk, ()) if after is None or e["seq"] > after]
+        return events[:limit] if limit else events
+
+    def page(self, before=None, limit=20, node=None, risk=None, since=None, until=None, after=None):
+        """id 내림차순으로 한 페이지를 조회합니다. 다음 페이지는 마지막 이벤트의 seq를 before로 넘깁니다.
+
+        after를 주면 그 seq 이후의 이벤트만 조회합니다 (화면에서 지운 내역 숨기기).
+        """
+        where, args = [], []
+        if before is not None:
+            where.append("id < ?"); args.append(before)
+        if after is not None:
+            where.append("id > ?"); args.append(after)
+        if node is not None:
+            where.append("node = ?"); args.append(node)
+        if risk is not None:
+            where.append("risk = ?"); args.append(risk)
+        if since is not None:
+            where.append("ts >= ?"); args.append(since)
+        if until is not None:
+            where.append("ts < ?"); args.append(until)
+        sql = f"SELECT {COLUMNS} FROM events"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id DESC LIMIT ?"
+        args.append(limit)
+        with self._lock:
+            return [_to_event(r) for r in self.conn.execute(sql, args)]
+
+    def since(self, seq):
+        """seq 이후에 기록된 이벤트를 오래된 순서로 반환합니다."""
+        with self._lock:
+            return [_to_event(r) for r in self.conn.execute(
+                f"SELECT {COLUMNS} FROM events WHERE id > ? ORDER BY id", (seq,))]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,210 @@
+"""현장 녹화 데이터로 상황 분류 모델 학습 (메모리 사용량 고정)
+
+recorder.py로 녹화하고 label을 채운 .swgrec 파일들을 입력으로 받습니다.
+
+    python field_trainer.py recordings/*.swgrec --output model_rf.pkl --compact-output model_rf.npz
+
+1) 특징 추출: 녹화 파일을 memmap으로 조금씩 읽어 파이프라인과 같은 MultiNodeBuffer로
+   avg_temp / max_impact / stay_time을 계산하고, 라벨이 있는 행만 특징 파일에 이어 씁니다.
+2) 분할 학습: 특징 파일을 shard_rows씩 읽어 warm_start 숲에 트리를 추가합니다. 각 샤드에는
+   클래스별 저수지 표본을 섞어 드문 클래스(낙상 등)도 모든 트리가 학습하도록 합니다.
+메모리는 chunk_records, shard_rows, 저수지 크기로만 정해지고 전체 데이터 크기와 무관합니다.
+"""
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import f1_score, classification_report
+import joblib
+
+from forest import FlatForest
+from model_trainer import TARGET_NAMES, model_size_mb, peak_rss_mb
+from pipeline import DETECT_TEMP
+from recorder import open_recording
+from utils import MultiNodeBuffer
+
+FEATURE_DTYPE = np.dtype([("avg_temp", "<f4"), ("max_impact", "<f4"), ("stay_time", "<f4"), ("label", "i1")])
+N_CLASSES = len(TARGET_NAMES)
+
+
+class Reservoir:
+    """전체 입력에서 최대 size행을 균등 확률로 유지하는 저수지 표본입니다 (Algorithm R)."""
+    def __init__(self, size, rng):
+        self.size = size
+        self.rng = rng
+        self.rows = np.empty(0, dtype=FEATURE_DTYPE)
+        self.seen = 0
+
+    def add(self, rows):
+        # 비어 있는 칸 먼저 채움
+        fill = min(self.size - len(self.rows), len(rows))
+        if fill > 0:
+            self.rows = np.concatenate([self.rows, rows[:fill]])
+        rest = rows[fill:]
+        if len(rest):
+            # t번째 항목은 size/t 확률로 임의의 칸을 대체 (같은 칸이면 나중 항목이 남음)
+            t = self.seen + fill + np.arange(1, len(rest) + 1)
+            slot = (self.rng.random(len(rest)) * t).astype(np.int64)
+            hit = slot < self.size
+            self.rows[slot[hit]] = rest[hit]
+        self.seen += len(rows)
+
+
+class ClassReservoir:
+    """클래스마다 따로 저수지 표본을 유지해 드문 클래스도 일정 수 이상 남깁니다."""
+    def __init__(self, size, seed=None):
+        rng = np.random.default_rng(seed)
+        self.reservoirs = [Reservoir(size, rng) for _ in range(N_CLASSES)]
+
+    def add(self, rows):
+        for label in np.unique(rows["label"]):
+            self.reservoirs[label].add(rows[rows["label"] == label])
+
+    @property
+    def seen(self):
+        return [r.seen for r in self.reservoirs]
+
+    def sample(self):
+        return np.concatenate([r.rows for r in self.reservoirs])
+
+
+def to_xy(rows):
+    return np.column_stack([rows["avg_temp"], rows["max_impact"], rows["stay_time"]]), rows["label"]
+
+
+def iter_ticks(records, chunk_records):
+    """녹화를 chunk_records 근처 크기로 읽되, 같은 시각(틱)이 두 묶음으로 갈라지지 않게 자릅니다."""
+    n, start = len(records), 0
+    while start < n:
+        end = min(start + chunk_records, n)
+        ts = np.asarray(records["timestamp"][start:end])
+        if end < n:
+            earlier = np.flatnonzero(ts != ts[-1])
+            if len(earlier):  # 마지막 틱은 다음 묶음으로 넘김
+                end = start + earlier[-1] + 1
+                ts = ts[:end - start]
+        chunk = records[start:end]
+        bounds = np.concatenate([[0], np.flatnonzero(np.diff(ts) != 0) + 1, [len(ts)]])
+        yield chunk, bounds
+        start = end
+
+
+def extract_features(paths, features_path, chunk_records=65536, max_nodes=4096,
+                     val_fraction=0.05, val_size=50000, reservoir_size=2000, seed=42):
+    """녹화 파일들에서 특징을 계산해 features_path에 씁니다. (학습 행 수, 저수지, 검증 표본)를 반환합니다."""
+    rng = np.random.default_rng(seed)
+    reservoir = ClassReservoir(reservoir_size, seed=seed)
+    validation = Reservoir(val_size, rng)  # 클래스 구분 없이 전체 분포를 유지하는 검증 표본
+    n_rows = 0
+
+    with open(features_path, "wb") as out:
+        for path in paths:
+            records = open_recording(path)
+            # 녹화 파일마다 노드 버퍼를 새로 시작 (파일 사이의 시간 간격을 이어 붙이지 않음)
+            node_index = {}
+            buffers = MultiNodeBuffer(max_nodes, short_term_size=10, long_term_size=60)
+            for chunk, bounds in iter_ticks(records, chunk_records):
+                pixels = np.asarray(chunk["pixels"])
+                impacts = np.asarray(chunk["impact"], dtype=float)
+                nodes = np.array([node_index.setdefault(n, len(node_index)) for n in chunk["node"].tolist()],
+                                 dtype=np.intp)
+                avg_temp = pixels.max(axis=(1, 2))
+                is_detected = avg_temp > DETECT_TEMP
+                peak = np.empty(len(chunk))
+                loitering = np.empty(len(chunk))
+                for a, b in zip(bounds[:-1], bounds[1:]):
+                    buffers.update(impacts[a:b], is_detected[a:b], nodes[a:b])
+                    peak[a:b], loitering[a:b] = buffers.get_features(nodes[a:b])
+
+                labels = np.asarray(chunk["label"])
+                labelled = labels >= 0
+                rows = np.empty(int(labelled.sum()), dtype=FEATURE_DTYPE)
+                rows["avg_temp"] = avg_temp[labelled]
+                rows["max_impact"] = peak[labelled]
+                rows["stay_time"] = loitering[labelled] * 30
+                rows["label"] = labels[labelled]
+
+                held_out = rng.random(len(rows)) < val_fraction
+                validation.add(rows[held_out])
+                train = rows[~held_out]
+                reservoir.add(train)
+                out.write(train.tobytes())
+                n_rows += len(train)
+
+    return n_rows, reservoir, to_xy(validation.rows)
+
+
+def train_sharded(features_path, reservoir, shard_rows=500000, trees_per_shard=10, n_jobs=-1, seed=42):
+    """특징 파일을 shard_rows씩 읽어 샤드마다 트리를 trees_per_shard개씩 추가합니다."""
+    features = np.memmap(features_path, dtype=FEATURE_DTYPE, mode="r")
+    model = RandomForestClassifier(n_estimators=0, warm_start=True, n_jobs=n_jobs, random_state=seed)
+    extra = reservoir.sample()
+    for start in range(0, len(features), shard_rows):
+        shard = features[start:start + shard_rows]
+        X, y = to_xy(np.concatenate([shard, extra]))
+        model.n_estimators += trees_per_shard
+        model.fit(X, y)
+        print(f"   샤드 {start // shard_rows + 1}: {len(shard):,}행 -> 트리 {model.n_estimators}개, "
+              f"RSS {peak_rss_mb():.0f} MB")
+    del features
+    model.warm_start = False
+    model.n_jobs = None  # 추론 시 스레드 풀을 띄우지 않음
+    return model
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="현장 녹화 데이터로 모델 학습 (out-of-core)")
+    parser.add_argument("recordings", nargs="+", help="라벨이 채워진 .swgrec 녹화 파일")
+    parser.add_argument("--output", default="model_rf.pkl")
+    parser.add_argument("--compact-output", default="model_rf.npz",
+                        help="같은 숲을 pickle 없는 .npz로도 저장 (앱/데몬이 기본으로 불러옴)")
+    parser.add_argument("--features", help="특징 파일 경로 (지정하면 학습 후에도 남겨 둠)")
+    parser.add_argument("--chunk-records", type=int, default=65536)
+    parser.add_argument("--shard-rows", type=int, default=500000)
+    parser.add_argument("--trees-per-shard", type=int, default=10)
+    parser.add_argument("--reservoir-size", type=int, default=2000, help="샤드마다 섞는 클래스별 표본 수")
+    parser.add_argument("--jobs", type=int, default=-1)
+    args = parser.parse_args()
+
+    features_path = args.features or os.path.join(tempfile.mkdtemp(), "features.bin")
+
+    print(f"🚀 특징 추출 중... ({len(args.recordings)}개 파일)")
+    started = time.perf_counter()
+    n_rows, reservoir, (X_val, y_val) = extract_features(args.recordings, features_path, args.chunk_records,
+                                                         reservoir_size=args.reservoir_size)
+    print(f"   학습 {n_rows:,}행 / 검증 {len(y_val):,}행, {time.perf_counter() - started:.1f}s, "
+          f"클래스별 {dict(enumerate(reservoir.seen))}")
+    if n_rows == 0:
+        raise SystemExit("🚫 라벨이 있는 프레임이 없습니다 (label >= 0)")
+    missing = [TARGET_NAMES[i] for i, n in enumerate(reservoir.seen) if n == 0]
+    if missing:
+        print(f"⚠️ 학습 데이터에 없는 클래스: {missing} (이 클래스는 예측되지 않습니다)")
+
+    print("🧠 분할 학습 시작 (warm_start Random Forest)...")
+    started = time.perf_counter()
+    rf_model = train_sharded(features_path, reservoir, args.shard_rows, args.trees_per_shard, args.jobs)
+    train_s = time.perf_counter() - started
+    if not args.features:
+        os.remove(features_path)
+
+    print("-" * 30)
+    print(f"✅ 모델 학습 완료! (트리 {rf_model.n_estimators}개, 클래스 {rf_model.classes_.tolist()})")
+    if len(y_val):
+        y_pred = rf_model.predict(X_val)
+        print(f"📊 F1-Score: {f1_score(y_val, y_pred, average='weighted'):.4f}")
+        labels = rf_model.classes_.tolist()
+        print(classification_report(y_val, y_pred, labels=labels,
+                                    target_names=[TARGET_NAMES[i] for i in labels], zero_division=0))
+    print(f"⏱️ 학습 시간: {train_s:.2f}s / 모델 크기: {model_size_mb(rf_model):.2f} MB / 최대 RSS: {peak_rss_mb():.0f} MB")
+    print("-" * 30)
+
+    # 실행 중인 앱(ModelRegistry)이 반쯤 쓰인 파일을 읽지 않도록 임시 파일에 쓴 뒤 원자적으로 교체
+    joblib.dump(rf_model, args.output + '.tmp')
+    os.replace(args.output + '.tmp', args.output)
+    print(f"💾 모델 파일 저장 완료: {args.output}")
+    with open(args.compact_output + '.tmp', 'wb') as f:
+        FlatForest.from_sklearn(rf_model).save(f)
+    os.replace(args.compact_output + '.tmp', args.compact_output)
+    print(f"💾 경량 모델 저장 완료: {args.compact_output}")
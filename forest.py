@@ -0,0 +1,180 @@
+import numpy as np
+
+COMPACT_FORMAT = 1  # save()/load() 배열 구성 버전
+
+
+class FlatForest:
+    """학습된 RandomForestClassifier를 연속된 numpy 배열로 펼쳐 배치 단위로 추론합니다.
+
+    모든 트리의 노드를 하나의 배열에 이어 붙이고, 아직 리프에 도달하지 않은
+    (트리, 샘플) 쌍만 깊이 단위로 한 번에 전진시킵니다. sklearn과 동일하게 입력을
+    float32로 변환해 비교하므로 predict / predict_proba 결과가 sklearn과 정확히 일치합니다.
+    """
+    def __init__(self, feature, threshold, children, value, roots, classes):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children  # (n_nodes, 2): [왼쪽, 오른쪽]
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.is_leaf = children[:, 0] == np.arange(len(children))
+        self.n_features_in_ = int(feature.max()) + 1 if len(feature) else 0
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """RandomForestClassifier 또는 DecisionTreeClassifier 하나 (트리 1개짜리 숲)를 변환합니다."""
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset = 0
+        for est in getattr(model, "estimators_", [model]):
+            tree = est.tree_
+            n = tree.node_count
+            leaf = tree.children_left == -1
+
+            # 리프는 자기 자신을 가리키게 해서 -1 없이 인덱싱 가능하도록 함
+            own = np.arange(n) + offset
+            children.append(np.column_stack([
+                np.where(leaf, own, tree.children_left + offset),
+                np.where(leaf, own, tree.children_right + offset),
+            ]))
+            features.append(np.where(leaf, 0, tree.feature))
+            thresholds.append(np.where(leaf, np.inf, tree.threshold))
+
+            # sklearn DecisionTreeClassifier.predict_proba와 같은 방식으로 정규화
+            value = tree.value[:, 0, :].astype(np.float64)
+            normalizer = value.sum(axis=1)[:, None]
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(value / normalizer)
+
+            roots.append(offset)
+            offset += n
+
+        return cls(
+            feature=np.ascontiguousarray(np.concatenate(features), dtype=np.intp),
+            threshold=np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64),
+            children=np.ascontiguousarray(np.concatenate(children), dtype=np.intp),
+            value=np.ascontiguousarray(np.concatenate(values)),
+            roots=np.asarray(roots, dtype=np.intp),
+            classes=np.asarray(model.classes_),
+        )
+
+    @classmethod
+    def from_pickle(cls, path):
+        """model_trainer.py가 저장한 joblib 파일을 불러와 변환합니다."""
+        import joblib
+
+        return cls.from_sklearn(joblib.load(path))
+
+    def save(self, file):
+        """pickle 없이 numpy 배열만 담은 .npz로 저장합니다.
+
+        노드 인덱스와 feature 번호는 필요한 만큼 작은 정수형으로 줄이고, 추론에 쓰이지 않는
+        내부 노드의 클래스 확률은 빼고 리프 값만 저장합니다. 임계값과 확률은 float64 그대로라
+        불러온 뒤의 결과는 원본과 정확히 같습니다.
+        """
+        index_dtype = np.int32 if len(self.children) < 2 ** 31 else np.int64
+        np.savez(
+            file,
+            format=np.array(COMPACT_FORMAT),
+            feature=self.feature.astype(np.uint8 if self.n_features_in_ <= 256 else np.int32),
+            threshold=self.threshold,
+            children=self.children.astype(index_dtype),
+            leaf_value=self.value[self.is_leaf],
+            roots=self.roots.astype(index_dtype),
+            classes=self.classes_,
+        )
+
+    @classmethod
+    def load(cls, path):
+        """save()로 저장한 .npz 파일을 불러옵니다 (allow_pickle=False)."""
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["format"]) != COMPACT_FORMAT:
+                raise ValueError(f"지원하지 않는 모델 형식: {int(data['format'])}")
+            children = data["children"].astype(np.intp)
+            is_leaf = children[:, 0] == np.arange(len(children))
+            leaf_value = data["leaf_value"]
+            value = np.zeros((len(children), leaf_value.shape[1]))
+            value[is_leaf] = leaf_value
+            return cls(
+                feature=data["feature"].astype(np.intp),
+                threshold=data["threshold"],
+                children=children,
+                value=value,
+                roots=data["roots"].astype(np.intp),
+                classes=data["classes"],
+            )
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    def apply(self, X):
+        """각 (트리, 샘플)이 도달한 리프 노드 인덱스를 반환합니다. shape: (n_trees, n_samples)"""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        n_samples = X.shape[0]
+        n_trees = len(self.roots)
+        columns = np.ascontiguousarray(X.T).ravel()  # feature 단위로 연속 배치
+
+        node = np.repeat(self.roots, n_samples)
+        sample = np.tile(np.arange(n_samples), n_trees)
+        children = self.children.ravel()
+        active = np.flatnonzero(~self.is_leaf[node])
+        while active.size:
+            current = node[active]
+            go_right = columns[self.feature[current] * n_samples + sample[active]] > self.threshold[current]
+            current = children[2 * current + go_right]
+            node[active] = current
+            active = active[~self.is_leaf[current]]
+        return node.reshape(n_trees, n_samples)
+
+    def predict_proba(self, X):
+        leaves = self.apply(X)
+        # sklearn처럼 트리 순서대로 누적해야 부동소수점 결과가 동일
+        proba = np.zeros((leaves.shape[1], self.value.shape[1]))
+        for tree_leaves in leaves:
+            proba += self.value[tree_leaves]
+        proba /= len(self.roots)
+        return proba
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def load_model(path):
+    """확장자로 형식을 골라 FlatForest를 불러옵니다 (.npz: 압축 형식, 그 외: joblib 피클)."""
+    if str(path).endswith(".npz"):
+        return FlatForest.load(path)
+    return FlatForest.from_pickle(path)
+
+
+if __name__ == "__main__":
+    import time
+    import warnings
+    import joblib
+
+    warnings.filterwarnings("ignore")  # feature name 경고 무시
+    model = joblib.load("model_rf.pkl")
+    flat = FlatForest.from_sklearn(model)
+
+    rng = np.random.default_rng(0)
+    X = np.column_stack([
+        rng.normal(30, 5, 10000),
+        rng.normal(20000, 5000, 10000),
+        rng.uniform(0, 120, 10000),
+    ])
+    same_label = np.array_equal(flat.predict(X), model.predict(X))
+    same_proba = np.array_equal(flat.predict_proba(X), model.predict_proba(X))
+    print(f"🔍 sklearn 일치: predict={same_label}, predict_proba={same_proba} ({len(X)}행)")
+
+    def bench(fn, rows, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            fn(rows)
+        return (time.perf_counter() - started) / repeat * 1000
+
+    for n in (1, 200, len(X)):
+        rows = X[:n]
+        repeat = 50 if n < 1000 else 5
+        print(f"🐢 sklearn predict {n}행: {bench(model.predict, rows, repeat):.2f} ms")
+        print(f"⚡ FlatForest predict {n}행: {bench(flat.predict, rows, repeat):.2f} ms")
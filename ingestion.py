@@ -0,0 +1,450 @@
+import asyncio
+import json
+import struct
+import threading
+import time
+import zlib
+import numpy as np
+
+from codec import FrameDecoder, FrameEncoder
+
+GRID_SHAPE = (8, 8)
+TOPIC_PREFIX = "swg"
+
+# 처리량 목표: 노드 200개 x 10Hz
+TARGET_NODES = 200
+TARGET_FPS = 2000
+
+
+def topic_matches(pattern, topic):
+    """MQTT 와일드카드(+, #)를 고려해 토픽이 구독 패턴과 일치하는지 확인합니다."""
+    p_parts = pattern.split("/")
+    t_parts = topic.split("/")
+    for i, p in enumerate(p_parts):
+        if p == "#":
+            return True
+        if i >= len(t_parts):
+            return False
+        if p != "+" and p != t_parts[i]:
+            return False
+    return len(p_parts) == len(t_parts)
+
+
+class LocalBroker:
+    """오프라인 테스트용 인메모리 MQTT 대체 브로커입니다."""
+    def __init__(self, queue_size=20000):
+        self.queue_size = queue_size
+        self.subscriptions = []
+        self.dropped = 0
+        self.bytes = 0
+
+    def subscribe(self, pattern):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscriptions.append((pattern, queue))
+        return queue
+
+    def publish(self, topic, payload):
+        self.bytes += len(payload)
+        for pattern, queue in self.subscriptions:
+            if not topic_matches(pattern, topic):
+                continue
+            # 구독자가 밀리면 가장 오래된 메시지를 버림 (발행자는 절대 대기하지 않음)
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait((topic, payload))
+
+
+class MqttBroker:
+    """paho-mqtt 클라이언트를 LocalBroker와 같은 인터페이스로 감쌉니다."""
+    def __init__(self, host="localhost", port=1883, queue_size=20000):
+        import paho.mqtt.client as mqtt  # 실제 브로커 연결 시에만 필요
+
+        self.queue_size = queue_size
+        self.subscriptions = []
+        self.dropped = 0
+        self.bytes = 0
+        self.loop = None
+        self.client = mqtt.Client()
+        self.client.on_message = self._on_message
+        self.client.connect(host, port)
+
+    def subscribe(self, pattern):
+        self.loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscriptions.append((pattern, queue))
+        self.client.subscribe(pattern)
+        self.client.loop_start()
+        return queue
+
+    def publish(self, topic, payload):
+        self.client.publish(topic, payload)
+
+    def _on_message(self, client, userdata, msg):
+        # paho 네트워크 스레드 -> asyncio 루프로 안전하게 전달
+        self.loop.call_soon_threadsafe(self._deliver, msg.topic, msg.payload)
+
+    def _deliver(self, topic, payload):
+        LocalBroker.publish(self, topic, payload)  # 수신 바이트 집계 포함
+
+
+class FrameStore:
+    """노드별 열화상/충격 데이터를 미리 할당된 numpy 버퍼에 보관합니다."""
+    def __init__(self, capacity=512, shape=GRID_SHAPE):
+        self.capacity = capacity
+        self.shape = shape
+        self.slots = {}
+        self.node_ids = [None] * capacity
+
+        # 수신 중인 프레임 (열화상과 충격이 모두 도착해야 완성)
+        self.pixels = np.zeros((capacity,) + shape, dtype=np.float32)
+        self.impact = np.zeros(capacity)
+        self.timestamp = np.zeros(capacity)
+        self.thermal_seq = np.full(capacity, -1, dtype=np.int64)
+        self.impact_seq = np.full(capacity, -1, dtype=np.int64)
+
+        # 완성되어 검출 단계로 넘길 프레임
+        self.ready_pixels = np.zeros((capacity,) + shape, dtype=np.float32)
+        self.ready_impact = np.zeros(capacity)
+        self.ready_timestamp = np.zeros(capacity)
+        self.ready = np.zeros(capacity, dtype=bool)
+
+    def slot_for(self, node_id):
+        slot = self.slots.get(node_id)
+        if slot is None:
+            if len(self.slots) >= self.capacity:
+                return None
+            slot = len(self.slots)
+            self.slots[node_id] = slot
+            self.node_ids[slot] = node_id
+        return slot
+
+    def complete(self, slot):
+        """두 채널의 seq가 맞으면 프레임을 완성 버퍼로 옮깁니다. 덮어쓴 경우 True를 반환합니다.
+
+        소비자가 아직 가져가지 않은 프레임을 덮어쓰면 충격량은 둘 중 큰 값을 유지합니다
+        (열화상은 최신값, 순간 충격은 놓치지 않음).
+        """
+        overwritten = bool(self.ready[slot])
+        self.ready_pixels[slot] = self.pixels[slot]
+        self.ready_impact[slot] = max(self.ready_impact[slot], self.impact[slot]) if overwritten else self.impact[slot]
+        self.ready_timestamp[slot] = self.timestamp[slot]
+        self.ready[slot] = True
+        return overwritten
+
+    def complete_many(self, slots, pixels, impact, timestamp):
+        """열화상과 충격량이 함께 온 프레임 묶음을 바로 완성 버퍼에 넣습니다. 덮어쓴 개수를 반환합니다."""
+        held = np.where(self.ready[slots], self.ready_impact[slots], -np.inf)
+        overwritten = int(self.ready[slots].sum())
+        self.ready_pixels[slots] = pixels
+        self.ready_impact[slots] = impact
+        np.maximum.at(self.ready_impact, slots, impact)  # 같은 묶음의 여러 시점도 충격량은 최대값
+        self.ready_impact[slots] = np.maximum(self.ready_impact[slots], held)
+        self.ready_timestamp[slots] = timestamp
+        self.ready[slots] = True
+        return overwritten
+
+    def take_ready(self):
+        """완성된 모든 노드의 프레임을 한 번에 꺼냅니다 (복사본)."""
+        slots = np.flatnonzero(self.ready)
+        self.ready[slots] = False
+        return {
+            "node_ids": [self.node_ids[s] for s in slots],
+            "slots": slots,
+            "pixels": self.ready_pixels[slots],
+            "impact": self.ready_impact[slots],
+            "timestamp": self.ready_timestamp[slots],
+        }
+
+
+class IngestionEngine:
+    """여러 센서 노드의 MQTT-JSON 메시지를 비동기로 수신해 프레임으로 조립합니다.
+
+    토픽 형식: ``swg/<node_id>/thermal`` 또는 ``swg/<node_id>/impact``
+    게이트웨이가 여러 노드를 codec.py 형식으로 묶어 보내면 ``swg/<gateway>/frames`` 한 토픽으로 받고,
+    묶음 안의 노드 슬롯 k는 gateways[gateway][k] (게이트웨이가 알려 준 노드 ID 목록), 목록이 없으면
+    ``<gateway>-<k:04d>`` 노드로 등록합니다.
+    """
+    def __init__(self, broker, capacity=512, shape=GRID_SHAPE, prefix=TOPIC_PREFIX, gateways=None):
+        self.broker = broker
+        self.prefix = prefix
+        self.gateways = dict(gateways or {})  # gateway -> 슬롯 순서의 노드 ID 목록
+        self.store = FrameStore(capacity, shape)
+        self.frame_ready = asyncio.Event()
+        self.frames = 0
+        self.overwritten = 0
+        self.decode_errors = 0
+        self.rejected = 0
+        self.missing_reference = 0  # 기준 프레임을 잃어 버린 델타 프레임 (게이트웨이에 키프레임 요청 필요)
+        self.decoders = {}  # gateway -> codec.FrameDecoder
+
+    async def run(self):
+        queue = self.broker.subscribe(f"{self.prefix}/+/+")
+        while True:
+            topic, payload = await queue.get()
+            self.handle(topic, payload)
+
+    def handle(self, topic, payload):
+        try:
+            _, node_id, kind = topic.split("/")
+            if kind == "frames":
+                self.handle_frames(node_id, payload)
+                return
+            msg = json.loads(payload)
+            seq = int(msg["seq"])
+        except (ValueError, KeyError, TypeError):
+            self.decode_errors += 1
+            return
+
+        store = self.store
+        slot = store.slot_for(node_id)
+        if slot is None:
+            self.rejected += 1
+            return
+
+        try:
+            if kind == "thermal":
+                store.pixels[slot] = np.asarray(msg["pixels"], dtype=np.float32).reshape(store.shape)
+                store.timestamp[slot] = msg["ts"]
+                store.thermal_seq[slot] = seq
+            elif kind == "impact":
+                store.impact[slot] = msg["value"]
+                store.impact_seq[slot] = seq
+            else:
+                self.decode_errors += 1
+                return
+        except (ValueError, KeyError, TypeError):
+            self.decode_errors += 1
+            return
+
+        if store.thermal_seq[slot] == store.impact_seq[slot]:
+            if store.complete(slot):
+                self.overwritten += 1  # 소비자가 느리면 최신 프레임만 유지
+            self.frames += 1
+            self.frame_ready.set()
+
+    def handle_frames(self, gateway, payload):
+        decoder = self.decoders.get(gateway)
+        if decoder is None:
+            decoder = self.decoders[gateway] = FrameDecoder(self.store.capacity)
+        try:
+            frames = decoder.decode(payload)
+        except (ValueError, IndexError, struct.error, zlib.error):
+            self.decode_errors += 1
+            return
+
+        valid = frames["valid"]
+        self.missing_reference += int((~valid).sum())
+        known = self.gateways.get(gateway)
+        names = [known[k] if known is not None and k < len(known) else f"{gateway}-{k:04d}"
+                 for k in frames["nodes"][valid].tolist()]
+        slots = [self.store.slot_for(name) for name in names]
+        keep = np.array([s is not None for s in slots], dtype=bool)
+        self.rejected += int((~keep).sum())
+        if not keep.any():
+            return
+        slots = np.array([s for s in slots if s is not None], dtype=np.intp)
+        # 같은 묶음에 한 노드의 여러 시점이 있으면 마지막(가장 최신) 프레임이 남음
+        self.overwritten += self.store.complete_many(
+            slots, frames["pixels"][valid][keep], frames["impact"][valid][keep], frames["timestamp"][valid][keep])
+        self.frames += len(slots)
+        self.frame_ready.set()
+
+    async def wait_ready(self, timeout=None):
+        """완성 프레임이 생길 때까지 기다린 뒤 모두 꺼냅니다."""
+        try:
+            await asyncio.wait_for(self.frame_ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self.frame_ready.clear()
+        return self.store.take_ready()
+
+    def take_ready(self):
+        self.frame_ready.clear()
+        return self.store.take_ready()
+
+
+class FakePublisher:
+    """get_simulated_data()와 같은 분포로 여러 노드의 센서 메시지를 발행합니다.
+
+    encoder(codec.FrameEncoder)를 주면 노드별 JSON 대신 게이트웨이 하나가 모든 노드를 묶어 보냅니다.
+    source(pipeline.SimulatedSource)를 주면 그 노드들의 프레임 (시연 트리거, 진동 요약 충격량 포함)을 발행합니다.
+    """
+    def __init__(self, broker, n_nodes=TARGET_NODES, shape=GRID_SHAPE, prefix=TOPIC_PREFIX, seed=None,
+                 encoder=None, gateway="NODE", source=None):
+        self.broker = broker
+        self.shape = tuple(source.shape) if source is not None else shape
+        self.prefix = prefix
+        self.encoder = encoder
+        self.gateway = gateway
+        self.source = source
+        if source is not None:
+            self.node_ids = list(source.node_ids)
+        else:
+            self.node_ids = [f"{gateway}-{i:04d}" for i in range(n_nodes)]
+        self.rng = np.random.default_rng(seed)
+        self.seq = 0
+        self.published = 0
+
+    def make_frames(self):
+        if self.source is not None:
+            batch = self.source.read()
+            return batch["pixels"], batch["impact"]
+        n = len(self.node_ids)
+        rows, cols = self.shape
+        pixels = self.rng.uniform(22, 26, (n,) + self.shape)
+        detected = self.rng.random(n) < 0.7
+        r = self.rng.integers(1, rows - 2, n)
+        c = self.rng.integers(1, cols - 2, n)
+        heat = self.rng.uniform(10, 15, n) * detected
+        for dr in (0, 1):
+            for dc in (0, 1):
+                pixels[np.arange(n), r + dr, c + dc] += heat
+        impact = self.rng.normal(16384, 600, n)
+        return pixels, impact
+
+    def publish_tick(self):
+        pixels, impact = self.make_frames()
+        ts = time.time()
+        seq = self.seq
+        if self.encoder is not None:
+            payload = self.encoder.encode(np.arange(len(self.node_ids)), pixels, impact, ts)
+            self.broker.publish(f"{self.prefix}/{self.gateway}/frames", payload)
+            self.seq += 1
+            self.published += len(self.node_ids)
+            return
+        for i, node_id in enumerate(self.node_ids):
+            base = f"{self.prefix}/{node_id}"
+            self.broker.publish(f"{base}/thermal", json.dumps({
+                "seq": seq, "ts": ts, "pixels": np.round(pixels[i], 2).ravel().tolist()
+            }))
+            self.broker.publish(f"{base}/impact", json.dumps({"seq": seq, "value": round(float(impact[i]), 1)}))
+        self.seq += 1
+        self.published += len(self.node_ids)
+
+    async def run(self, hz=None, ticks=None):
+        """hz가 None이면 가능한 한 빠르게 발행합니다."""
+        period = 1.0 / hz if hz else 0
+        count = 0
+        while ticks is None or count < ticks:
+            started = time.perf_counter()
+            self.publish_tick()
+            count += 1
+            # 소비자에게 제어권을 넘겨줌
+            await asyncio.sleep(max(0.0, period - (time.perf_counter() - started)))
+
+
+class IngestionSource:
+    """IngestionEngine을 DetectionPipeline의 센서 소스로 쓰는 어댑터입니다 (SimulatedSource와 같은 read()).
+
+    수신 이벤트 루프는 전용 스레드에서 돌고, read()는 그 루프 안에서 완성 프레임을 꺼내 옵니다.
+    broker를 주지 않으면 LocalBroker에 simulator(pipeline.SimulatedSource)의 프레임을 period마다
+    발행하므로, 시뮬레이션 프레임도 실제 센서와 같은 토픽/페이로드 파싱을 거칩니다.
+    encoder(codec.FrameEncoder)를 주면 시뮬레이션 게이트웨이가 노드별 JSON 대신 codec 묶음으로 보냅니다.
+    """
+    def __init__(self, simulator=None, broker=None, capacity=512, shape=GRID_SHAPE, period=0.4, prefix=TOPIC_PREFIX,
+                 encoder=None, gateway="GW"):
+        if simulator is None and broker is None:
+            raise ValueError("simulator와 broker 중 하나는 있어야 합니다")
+        self.simulator = simulator
+        self.shape = tuple(simulator.shape) if simulator is not None else tuple(shape)
+        self.protocol = f"MQTT + codec {encoder.bits}비트 델타" if encoder is not None else "MQTT-JSON"
+        self.broker = broker if broker is not None else LocalBroker()
+        gateways = {gateway: list(simulator.node_ids)} if simulator is not None else None
+        self.engine = IngestionEngine(self.broker, capacity, self.shape, prefix, gateways=gateways)
+        self.publisher = None
+        if simulator is not None:
+            self.publisher = FakePublisher(self.broker, prefix=prefix, encoder=encoder, gateway=gateway, source=simulator)
+        self.missing_reference = 0
+        self.period = period
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name="swg-ingest", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.create_task(self.engine.run())  # 먼저 구독한 뒤 발행 시작
+        if self.publisher is not None:
+            self.loop.create_task(self.publisher.run(hz=1.0 / self.period))
+        self.loop.run_forever()
+        self.loop.close()
+
+    async def _take(self):
+        encoder = self.publisher.encoder if self.publisher is not None else None
+        if encoder is not None and self.engine.missing_reference > self.missing_reference:
+            # 기준 프레임을 잃은 델타가 있었음: 다음 발행을 키프레임으로 (같은 루프 안이라 경합 없음)
+            self.missing_reference = self.engine.missing_reference
+            encoder.request_keyframe(np.arange(len(self.publisher.node_ids)))
+        return self.engine.take_ready()
+
+    def read(self):
+        """지난 read() 이후 완성된 모든 노드의 프레임을 반환합니다 (없으면 빈 묶음)."""
+        return asyncio.run_coroutine_threadsafe(self._take(), self.loop).result(timeout=5.0)
+
+    def trigger(self, node_id, mode):
+        if self.simulator is not None:
+            self.simulator.trigger(node_id, mode)
+
+    async def _shutdown(self):
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def close(self):
+        """수신/발행 태스크를 취소하고 이벤트 루프 스레드를 멈춥니다."""
+        if self.loop.is_closed():
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result(timeout=5.0)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5.0)
+
+
+async def measure_throughput(n_nodes=TARGET_NODES, ticks=50, encoder=None):
+    """n_nodes개 노드를 최대 속도로 발행했을 때 소비자에게 전달된 초당 프레임 수를 측정합니다.
+
+    fps는 전달된 프레임 기준이고, 소비자가 가져가기 전에 최신값으로 덮어쓴 프레임까지 센 수집 속도는
+    ingested_fps로 따로 반환합니다.
+    """
+    broker = LocalBroker()
+    engine = IngestionEngine(broker, capacity=n_nodes)
+    publisher = FakePublisher(broker, n_nodes=n_nodes, seed=0, encoder=encoder)
+
+    consumer = asyncio.create_task(engine.run())
+    await asyncio.sleep(0)
+    delivered = 0
+    started = time.perf_counter()
+
+    producer = asyncio.create_task(publisher.run(ticks=ticks))
+    while True:
+        batch = await engine.wait_ready(timeout=0.05)
+        delivered += len(batch["node_ids"])
+        if producer.done() and all(q.empty() for _, q in broker.subscriptions):
+            delivered += len(engine.take_ready()["node_ids"])
+            break
+    elapsed = time.perf_counter() - started
+    consumer.cancel()
+
+    return {
+        "nodes": n_nodes,
+        "frames": engine.frames,
+        "delivered": delivered,
+        "overwritten": engine.overwritten,
+        "seconds": elapsed,
+        "fps": delivered / elapsed,
+        "ingested_fps": engine.frames / elapsed,
+        "dropped_messages": broker.dropped,
+        "decode_errors": engine.decode_errors,
+        "bytes_per_frame": broker.bytes / max(publisher.published, 1),
+    }
+
+
+if __name__ == "__main__":
+    for name, encoder in (("MQTT-JSON", None), ("codec 16비트 델타", FrameEncoder(TARGET_NODES, GRID_SHAPE))):
+        result = asyncio.run(measure_throughput(encoder=encoder))
+        print(f"📡 [{name}] 노드 {result['nodes']}개 / 프레임 {result['frames']}개 / {result['seconds']:.2f}s "
+              f"/ 프레임당 {result['bytes_per_frame']:.0f} 바이트")
+        print(f"⚡ 처리량: 전달 {result['fps']:.0f} frames/s (목표 {TARGET_FPS} frames/s), "
+              f"수집 {result['ingested_fps']:.0f} frames/s")
+        print(f"   전달 {result['delivered']} / 최신값 덮어씀 {result['overwritten']} / 유실 메시지 {result['dropped_messages']} / 디코딩 오류 {result['decode_errors']}")
+        print("✅ 목표 달성" if result["fps"] >= TARGET_FPS else "⚠️ 목표 미달")
@@ -1,31 +1,29 @@
+import time
+SCRIPT_STARTED = time.perf_counter() # 콜드 스타트 계측: 스크립트 시작 시각 (rerun마다 새로 기록)
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.ndimage import zoom
-import time
-import joblib
-import gc
+from renderer import FigureRenderer, LutRenderer
+from upsample import CubicUpsampler
 from datetime import datetime
-from utils import CoordinateSmoother, get_heat_center, MultiScaleBuffer
+from tracking import detect_blobs, MultiTargetTracker
+from forest import load_model
+from model_registry import get_registry, ModelLoadError, DEFAULT_MODEL_PATHS
+from pipeline import DetectionPipeline, SimulatedSource
+from ingestion import IngestionSource
+from codec import FrameEncoder
+from event_store import EventStore
+from recorder import FrameRecorder
+from utils import min_max_normalize
+from metrics import METRICS, MetricsServer, StageClock, measure_overhead
+from alerts import AlertDispatcher, AlertOutbox, FakeGatewayServer, HttpGateway
 import platform
-
-# 시스템 환경 설정
-if platform.system() == 'Windows':
-    plt.rcParams['font.family'] = 'Malgun Gothic'
-elif platform.system() == 'Darwin':
-    plt.rcParams['font.family'] = 'AppleGothic'
-plt.rcParams['axes.unicode_minus'] = False
+import os
+import threading
 
 # 페이지 설정
 st.set_page_config(page_title="SMART WALL GUARD", layout="wide")
 
 # 세션 상태 초기화
-if "demo_mode" not in st.session_state:
-    st.session_state.demo_mode = None
-
-if "log_history" not in st.session_state:
-    st.session_state.log_history = []
-
 if "emergency_triggered" not in st.session_state:
     st.session_state.emergency_triggered = False
 
@@ -35,12 +33,117 @@ if "show_emergency_dialog" not in st.session_state:
 if "page" not in st.session_state:
     st.session_state.page = "main"
 
-# 상태 락
-if "locked_event" not in st.session_state:
-    st.session_state.locked_event = None  # None / "fall" / "impact"
-
-if "event_lock_until" not in st.session_state:
-    st.session_state.event_lock_until = 0
+# 알림 내역 페이지 커서 (이전 페이지로 돌아가기 위한 스택)
+if "history_cursors" not in st.session_state:
+    st.session_state.history_cursors = [None]
+
+# 이 세션에서 "전체 삭제"한 시점의 마지막 이벤트 seq (공유 기록은 지우지 않고 화면에서만 숨김)
+if "history_hidden_seq" not in st.session_state:
+    st.session_state.history_hidden_seq = None
+
+HISTORY_PAGE_SIZE = 20
+
+NODE_ID = "MAPO-A1"
+SENSOR_PERIOD = 0.4 # 센서 획득 주기 (백그라운드)
+VIBRATION_RATE = 3200 # 가속도 원시 샘플링 주기 (Hz), 블록 단위로 요약해 충격량으로 사용
+UI_FRAME_INTERVAL = 0.2 # 화면 갱신 주기 (새 프레임이 없으면 건너뜀)
+IDLE_PERIOD = 1.6 # 장면 변화가 없으면 획득 주기를 여기까지 늘림 (감지/주의/위험 시 즉시 복귀)
+METRICS_PORT = int(os.environ.get('SWG_METRICS_PORT', 9108)) # Prometheus 텍스트 엔드포인트 (http://127.0.0.1:9108/metrics), 0이면 빈 포트
+HEALTH_PANEL_EVERY = 5 # 시스템 상태 패널은 5프레임마다 갱신
+ALERT_GATEWAY_URL = os.environ.get('SWG_ALERT_GATEWAY_URL') # SMS/119 게이트웨이 주소, 없으면 로컬 가짜 게이트웨이 사용 (시연/테스트용)
+FAKE_GATEWAY_WARNING = "SWG_ALERT_GATEWAY_URL이 설정되지 않아 로컬 가짜 게이트웨이를 사용합니다 (실제 신고/알림은 발송되지 않음)"
+ALERT_DEDUPE_SECONDS = 60 # 같은 노드의 같은 DANGER 이벤트 알림은 60초에 한 번만 발송
+
+# 모델 불러오기
+# 레지스트리는 프로세스 전체에서 공유되므로 재실행/새 세션마다 다시 unpickle 하지 않음
+# 경량 모델(.npz)과 피클(.pkl) 중 마지막으로 학습한 파일을 서비스 (.npz는 pickle 없이 바로 불러옴)
+registry = get_registry(DEFAULT_MODEL_PATHS, loader=load_model) # numpy 배열 기반 추론기
+try:
+    registry.get()
+except ModelLoadError as e:
+    st.error(f"🚫 AI 모델을 불러오지 못했습니다: {e}")
+
+# 알림 발송은 아웃박스(SQLite)에 저장만 하고 백그라운드에서 묶음 전송/재시도 (화면 루프를 막지 않음)
+@st.cache_resource
+def get_alert_dispatcher():
+    url = ALERT_GATEWAY_URL
+    if not url:
+        print(f"⚠️ {FAKE_GATEWAY_WARNING}")
+        url = FakeGatewayServer().start().url
+    return AlertDispatcher(AlertOutbox("alerts.db"), HttpGateway(url), dedupe_window=ALERT_DEDUPE_SECONDS).start()
+
+alerts = get_alert_dispatcher()
+
+# 획득/추론 파이프라인은 서버 프로세스에 하나만 두고 모든 세션이 구독
+# (시청자가 늘어도 CPU 사용량은 그대로, 모든 세션이 같은 이벤트 로그를 봄)
+@st.cache_resource
+def get_pipeline():
+    store = EventStore("events.db") # 재시작해도 유지되는 이벤트 저장소 (SQLite WAL)
+    # 시뮬레이션 게이트웨이가 센서 프레임을 codec(16비트 델타) 묶음으로 발행하고 IngestionEngine으로 수신해 조립
+    simulator = SimulatedSource([NODE_ID], sample_rate=VIBRATION_RATE, period=SENSOR_PERIOD)
+    source = IngestionSource(simulator, period=SENSOR_PERIOD, encoder=FrameEncoder(1, simulator.shape))
+    # 센서 원본 프레임을 시작 날짜별 파일로 녹화 (recorder.ReplaySource로 재생)
+    recorder = FrameRecorder(f"recordings/{datetime.now():%Y%m%d}.swgrec", shape=source.shape)
+    return DetectionPipeline(source, registry, store=store, period=SENSOR_PERIOD,
+                             recorder=recorder, metrics=METRICS, alerts=alerts,
+                             skip_static=True, idle_period=IDLE_PERIOD, rule_cascade=True)
+
+# 단계별 계측값을 로컬 HTTP 엔드포인트로 노출 (프로세스당 하나)
+@st.cache_resource
+def get_metrics_server():
+    try:
+        return MetricsServer(METRICS, port=METRICS_PORT).start()
+    except OSError as e:
+        print(f"⚠️ 메트릭 엔드포인트를 열지 못했습니다: {e}")
+        return None
+
+# 렌더러: matplotlib/scipy는 해당 모드가 처음 필요할 때만 불러오고, 준비 결과는 rerun 사이에 재사용
+@st.cache_resource
+def setup_matplotlib():
+    import matplotlib
+
+    # 시스템 환경 설정
+    if platform.system() == 'Windows':
+        matplotlib.rcParams['font.family'] = 'Malgun Gothic'
+    elif platform.system() == 'Darwin':
+        matplotlib.rcParams['font.family'] = 'AppleGothic'
+    matplotlib.rcParams['axes.unicode_minus'] = False
+
+@st.cache_resource
+def get_lut_renderer():
+    return LutRenderer('magma') # 열화상 모드: matplotlib 없이 컬러맵 룩업 + PNG
+
+@st.cache_resource
+def get_upsampler(shape):
+    return CubicUpsampler(shape, out_shape=(52, 64)) # 센서 해상도별 3차 보간 행렬 미리 계산, 화면 비율(6.5:8)에 맞춤
+
+@st.cache_resource
+def prewarm_icon_mode():
+    # 첫 화면을 보낸 뒤 아이콘 모드용 모듈을 백그라운드에서 미리 불러둠 (모드 전환 지연 감소)
+    def load():
+        import matplotlib.figure, matplotlib.backends.backend_agg, scipy.optimize # noqa: F401
+    threading.Thread(target=load, name="swg-prewarm", daemon=True).start()
+
+def get_figure_renderer(shape):
+    # 아이콘 모드: Figure를 세션마다 한 번만 만들고 재사용 (matplotlib Figure는 세션 간 공유하지 않음)
+    renderer = st.session_state.get("figure_renderer")
+    if renderer is None or renderer.shape != shape:
+        setup_matplotlib()
+        st.session_state.figure_renderer = FigureRenderer(shape=shape)
+    return st.session_state.figure_renderer
+
+@st.cache_resource
+def get_probe_overhead():
+    return measure_overhead(20000)
+
+pipeline = get_pipeline()
+get_metrics_server()
+event_store = pipeline.store
+GRID_SHAPE = tuple(pipeline.source.shape) # 센서 해상도 (렌더러/보간 행렬 크기)
+pipeline.start()
+
+if "subscription" not in st.session_state:
+    st.session_state.subscription = pipeline.subscribe()
 
 def open_modal():
     st.session_state.show_emergency_dialog = True
@@ -62,6 +165,36 @@ def get_alert_overlay(status, detail):
     """
     return alert_html
 
+# 시스템 상태 패널
+HEALTH_STAGES = [
+    ("acquire", "센서 획득"), ("infer", "추론 (전체)"), ("predict", "모델 예측"),
+    ("frame_age", "획득→화면 지연"), ("ui_render", "[3] 렌더링"), ("ui_send", "[3] 화면 전송"),
+    ("ui_frame", "화면 루프 전체"), ("ui_first_frame", "첫 화면 (스크립트 시작부터)"),
+]
+
+def get_health_panel():
+    summary = METRICS.summary()
+    gauges = METRICS.gauge_values()
+    overhead = get_probe_overhead()
+    rows = "".join(
+        f"<tr><td>{label}</td><td>{summary[stage][1]:.2f}</td><td>{summary[stage][2]:.2f}</td></tr>"
+        for stage, label in HEALTH_STAGES if stage in summary
+    )
+    if not METRICS.enabled:
+        rows = "<tr><td colspan='3'>성능 계측이 꺼져 있습니다</td></tr>" + rows
+    return f"""
+    <div style="font-size: 0.8rem; color: #555;">
+        <b>🩺 시스템 상태</b>
+        <table style="width: 100%; font-size: 0.8rem;">
+            <tr><th>단계</th><th>p50 (ms)</th><th>p99 (ms)</th></tr>
+            {rows}
+        </table>
+        큐 {int(gauges.get('queue_depth', 0))} · 버린 프레임 {int(gauges.get('dropped_frames', 0))}
+        · 구독 세션 {int(gauges.get('subscribers', 0))} · 프로브 비용 {overhead['enabled']:.1f} µs
+        <br>규칙 판정 {gauges.get('cascade_skip_rate', 0):.0%} · 감사 일치율 {gauges.get('cascade_agreement', 1):.1%}
+    </div>
+    """
+
 # 신고 확인 팝업
 @st.dialog("🚑 긴급 신고 및 위치 공유")
 def confirm_emergency_report():
@@ -69,7 +202,8 @@ def confirm_emergency_report():
     
     # 전송될 내용 미리보기
     current_time = datetime.now().strftime("%H:%M:%S")
-    latest_event = st.session_state.log_history[0]['이벤트'] if st.session_state.log_history else "정상 상황 감지"
+    recent = event_store.recent(limit=1)
+    latest_event = recent[0]['이벤트'] if recent else "정상 상황 감지"
     
     report_content = f"""[SMART WALL GUARD 긴급신고]
 - 주소: 서울시 마포구 새창로4가길 123
@@ -80,16 +214,17 @@ def confirm_emergency_report():
     st.markdown("**전송 내용 미리보기:**")
     st.code(report_content, language=None)
     
+    if not ALERT_GATEWAY_URL:
+        st.error(f"🧪 {FAKE_GATEWAY_WARNING}")
     st.write("정말 전송하시겠습니까?")
     
     # 확인/취소 버튼
     c1, c2 = st.columns(2)
     with c1:
         if st.button("신고하기", use_container_width=True, type="primary"):
-            # 실제 SMS API 연동 시 이 부분에 코드가 들어갑니다.
-            st.success("신고 메시지가 전송되었습니다.")
-            st.toast("🚑 119/112 긴급 신고 완료")
-            time.sleep(1)
+            # 아웃박스에 넣기만 하고 바로 돌아옴 (전송/재시도는 AlertDispatcher가 담당)
+            alerts.enqueue(NODE_ID, "긴급 신고", "DANGER", {"report": report_content}, dedupe=False)
+            st.toast("🚑 119/112 긴급 신고 접수 (전송 중)")
             close_modal()
             st.rerun()
     with c2:
@@ -99,36 +234,6 @@ def confirm_emergency_report():
             st.rerun()
 
 # 데이터 엔진 및 기능 함수
-def get_simulated_data():
-    # 시연 모드일 경우 강제로 위험 데이터 생성
-    if st.session_state.demo_mode == "impact":
-        raw_pixels = np.random.uniform(35, 38, (8, 8)) # 아주 뜨거운 열원
-        impact = np.random.uniform(26000, 30000)
-        st.session_state.demo_mode = None # 일회성 실행 후 해제
-    elif st.session_state.demo_mode == "fall":
-        raw_pixels = np.random.uniform(32, 34, (8, 8))
-        impact = np.random.uniform(18000, 21000) 
-        st.session_state.demo_mode = None
-    else:
-        # 기존 일반 데이터 생성 로직
-        raw_pixels = np.random.uniform(22, 26, (8, 8))
-        is_detected = np.random.random() < 0.7 
-        pos = (np.random.randint(1, 6), np.random.randint(1, 6))
-        if is_detected:
-            raw_pixels[pos[0]:pos[0]+2, pos[1]:pos[1]+2] += np.random.uniform(10, 15)
-        impact = np.random.normal(16384, 600)
-
-    return {
-        "pixels": raw_pixels,
-        "is_detected": True if raw_pixels.max() > 30 else False,
-        "impact": impact,
-        "time": datetime.now().strftime("%H:%M:%S")
-    }
-
-def min_max_normalize(matrix, min_temp=20.0, max_temp=40.0):
-    normalized = (matrix - min_temp) / (max_temp - min_temp)
-    return np.clip(normalized, 0, 1) # 0.0 ~ 1.0 사이로 값 고정
-
 def emergency_button(label, phone_number, color="#007BFF"):
     button_html = f"""
         <a href="tel:{phone_number}" style="text-decoration: none;">
@@ -315,6 +420,13 @@ with header_cols[2]:
         st.checkbox("실시간 로그 자동 저장", value=True, key="autosave_check")
         st.checkbox("위험 감지 시 경고음", value=False, key="sound_check")
         st.selectbox("열화상 컬러맵", ["magma", "inferno", "viridis", "hot"], key="colormap_select")
+        st.divider()
+        # 계측은 프로세스 전체 설정이므로 모든 세션에 적용됨
+        st.toggle("성능 계측", value=METRICS.enabled, key="metrics_enabled",
+                  on_change=lambda: setattr(METRICS, "enabled", st.session_state.metrics_enabled))
+        st.checkbox("시스템 상태 패널 표시", value=False, key="health_panel")
+        if not ALERT_GATEWAY_URL:
+            st.warning(f"🧪 {FAKE_GATEWAY_WARNING}")
 
 st.divider()
 
@@ -336,36 +448,64 @@ if st.session_state.page == "history":
         st.markdown('<h2 class="header-title">전체 알림 내역</h2>', unsafe_allow_html=True)
 
     with h_col3:
-        if st.button("🗑️ 전체 삭제", use_container_width=True, key="history_clear_all"):
-            st.session_state.log_history = []
+        # 이벤트 기록은 모든 세션이 공유하는 추가 전용 로그이므로 이 화면의 목록만 비움 (확인 후)
+        if st.session_state.get("history_confirm_clear"):
+            if st.button("✔️ 삭제 확인", use_container_width=True, type="primary", key="history_clear_confirm"):
+                latest = event_store.recent(limit=1)
+                st.session_state.history_hidden_seq = latest[0]["seq"] if latest else 0
+                st.session_state.history_cursors = [None]
+                st.session_state.history_confirm_clear = False
+                st.rerun()
+            if st.button("취소", use_container_width=True, key="history_clear_cancel"):
+                st.session_state.history_confirm_clear = False
+                st.rerun()
+        elif st.button("🗑️ 전체 삭제", use_container_width=True, key="history_clear_all",
+                       help="이 화면의 목록만 비웁니다 (저장된 기록과 다른 세션은 그대로)"):
+            st.session_state.history_confirm_clear = True
             st.rerun()
     
     st.divider()
     
-    if not st.session_state.log_history:
+    # 인덱스를 이용해 한 페이지씩만 조회 (전체 내역을 읽지 않음)
+    cursors = st.session_state.history_cursors
+    log_history = event_store.page(before=cursors[-1], limit=HISTORY_PAGE_SIZE, risk="DANGER",
+                                   after=st.session_state.history_hidden_seq)
+    if not log_history:
         st.info("기록된 로그가 없습니다.")
     else:
-        # 카드 형태로 내역 출력
-        for log in st.session_state.log_history:
-            
-            if log['위험도'] != 'DANGER':
-                continue
+        # 카드 형태로 내역 출력 (한 페이지를 한 번에 전송)
+        cards = []
+        for log in log_history:
             
             # 위험도에 따른 카드 클래스 설정
             card_status = "danger"
             if log['위험도'] == "DANGER": card_status = "danger"
             
-            st.markdown(f"""
+            cards.append(f"""
                 <div class="log-card {card_status}">
                     <div style="display: flex; justify-content: space-between; align-items: center;">
                         <span style="font-size: 1.2rem; font-weight: 800;">{log['이벤트']}</span>
-                        <span style="color: #888; font-size: 0.85rem;">{log['시각']}</span>
+                        <span style="color: #888; font-size: 0.85rem;">{log['노드']} · {log['시각']}</span>
                     </div>
                     <div style="margin-top: 10px; font-size: 0.95rem; color: #444;">
                         <strong>상세 정보:</strong> {log['상세수치']} | <strong>위험수준:</strong> {log['위험도']}
                     </div>
                 </div>
-            """, unsafe_allow_html=True)
+            """)
+        st.markdown("".join(cards), unsafe_allow_html=True)
+
+    # 페이지 이동
+    p_col1, p_col2, p_col3 = st.columns([1, 6, 1])
+    with p_col1:
+        if len(cursors) > 1 and st.button("◀ 이전", key="history_prev"):
+            cursors.pop()
+            st.rerun()
+    with p_col2:
+        st.caption(f"{len(cursors)} 페이지 · 위험 이벤트 총 {event_store.count('DANGER', after=st.session_state.history_hidden_seq)}건")
+    with p_col3:
+        if len(log_history) == HISTORY_PAGE_SIZE and st.button("다음 ▶", key="history_next"):
+            cursors.append(log_history[-1]["seq"])
+            st.rerun()
     
     st.stop() # 상세보기 페이지일 때는 아래 실시간 루프를 멈춤
 
@@ -388,6 +528,7 @@ with col_left:
 with col_right:
     st.markdown("<span class='section-title'>📊 현재 상태</span>", unsafe_allow_html=True)
     m1_spot, m2_spot, m3_spot = st.empty(), st.empty(), st.empty()
+    health_spot = st.empty() # 시스템 상태 패널 (설정에서 켬)
 
     st.divider()
     
@@ -411,189 +552,175 @@ st.markdown("<p style='font-size:0.8rem; color:#EEE;'>Scenario Test</p>", unsafe
 c1, c2 = st.columns(2)
 with c1:
     if st.button("🚨 Test: Impact", key="test_in"):
-        st.session_state.demo_mode = "impact"
-        st.session_state.locked_event = "impact"
-        st.session_state.event_lock_until = time.time() + 3
+        pipeline.trigger_demo(NODE_ID, "impact")
 with c2:
     if st.button("🆘 Test: Fall", key="test_fall"):
-        st.session_state.demo_mode = "fall"
-        st.session_state.locked_event = "fall"
-        st.session_state.event_lock_until = time.time() + 3
-
-# 모델 불러오기 및 변수 초기화
-try:
-    model = joblib.load('model_rf.pkl')
-    status_labels = ['✅ 정상', '👤 배회 감지', '🚨 이상 충격 감지!', '🆘 낙상 사고 발생!', '🐈 동물 감지']
-except:
-    model = None
-
-FALL_IMPACT_MIN = 17000
-FALL_IMPACT_MAX = 22000
-IMPACT_MIN = 24000
-
-# 에러 방지를 위한 변수 초기화
-smoother = CoordinateSmoother(window_size=5) # 좌표 평활화
-ms_buffer = MultiScaleBuffer(short_term_size=10, long_term_size=60) # 멀티 스케일
-last_logged_status = "✅ 정상"
+        pipeline.trigger_demo(NODE_ID, "fall")
+
+# 현재 모드에 필요한 렌더러만 준비 (모드를 바꾸면 rerun되므로 루프 안에서는 고정)
+if is_icon_mode:
+    tracker = MultiTargetTracker(window_size=5) # 다중 대상 추적 + 좌표 평활화
+    figure_renderer = get_figure_renderer(GRID_SHAPE)
+else:
+    lut_renderer = get_lut_renderer()
+    upsampler = get_upsampler(GRID_SHAPE)
+last_model_error = None
+last_process_error = None
+hidden_seq = st.session_state.history_hidden_seq # 이 세션에서 지운 내역은 알림창/이벤트 건수에서도 숨김
+subscription = st.session_state.subscription
+subscription.version = 0 # rerun 직후에는 다음 틱을 기다리지 않고 현재 스냅샷을 바로 그림
 loop_counter = 0
+clock = StageClock(METRICS) # 단계별 소요 시간 계측 ([0]~[5])
+last_state = None
+first_frame_sent = False
+shown = {} # 위젯별로 마지막에 보낸 내용 (같으면 다시 보내지 않음)
+
+def changed(key, value):
+    if shown.get(key) == value:
+        return False
+    shown[key] = value
+    return True
+
+# 고정된 값은 루프 밖에서 한 번만 전송
+m1_spot.metric(label="활성 센서", value="02 / 02 Units", delta="Thermal & Vibration Sync")
 
-# 실시간 업데이트 루프
+# 실시간 업데이트 루프 (화면 갱신 전용)
 while True:
     loop_counter += 1
     now = time.time()
+
+    # 유휴 상태로 멈췄던 파이프라인은 다시 시작하고, 새 스냅샷이 발행될 때까지 대기
+    # (여러 프레임이 지나갔다면 가장 최신 것만 받음)
+    pipeline.start()
+    with METRICS.timer("ui_wait"):
+        snapshot = subscription.wait(timeout=UI_FRAME_INTERVAL)
+    clock.start()
+    # 백그라운드 추론 중 예외가 나면 (스레드는 계속 동작) 스냅샷이 멈출 수 있으므로 여기서 바로 알림
+    if pipeline.process_error and str(pipeline.process_error) != last_process_error:
+        last_process_error = str(pipeline.process_error)
+        st.toast(f"⚠️ 프레임 처리 오류: {last_process_error}")
+    state = snapshot.get(NODE_ID) if snapshot else None
+    if state is None:
+        continue
+
+    # 장면이 그대로라 파이프라인이 같은 상태를 다시 보낸 경우(heartbeat): 동기화 시각만 갱신
+    sync_text = datetime.fromtimestamp(pipeline.published_at).strftime("%H:%M:%S")
+    if changed("footer", sync_text):
+        footer_spot.markdown(f"<p style='color:#AAA; font-size:0.8rem; text-align:center;'>System Node: {NODE_ID} | Protocol: {pipeline.source.protocol} | Last Sync: {sync_text}</p>", unsafe_allow_html=True)
+    if state is last_state:
+        continue
+    last_state = state
     
     # ---------------------------------------------------------
     # [0] 상단 실시간 알림창 (가장 먼저 렌더링)
     # ---------------------------------------------------------
-    live_log_container.empty()
-
-    with live_log_container.container():
-        danger_logs = [log for log in st.session_state.log_history if log['위험도'] == "DANGER"]
-        if danger_logs:
-            st.caption(f"총 {len(danger_logs)}건의 위험 감지")
-            for log in danger_logs[:5]: 
-                st.error(f"{log['시각']} - {log['이벤트']}")
-        else:
-            st.write("새로운 알림이 없습니다.")
+    # 건수와 최근 5건은 저장소가 메모리에 유지 (O(1), 내역을 지운 세션은 인덱스 범위 조회), 건수가 바뀔 때만 다시 그림
+    danger_count = event_store.count("DANGER", after=hidden_seq)
+    if changed("notify", danger_count):
+        live_log_container.empty()
+
+        with live_log_container.container():
+            if danger_count:
+                st.caption(f"총 {danger_count}건의 위험 감지")
+                for log in event_store.recent("DANGER", 5, after=hidden_seq):
+                    st.error(f"{log['시각']} - {log['이벤트']}")
+            else:
+                st.write("새로운 알림이 없습니다.")
+    clock.lap("ui_notify")
     
     # ---------------------------------------------------------
-    # [1] 데이터 획득
+    # [1] 데이터 획득 (백그라운드 파이프라인이 수신한 최신 프레임)
     # ---------------------------------------------------------
-    data = get_simulated_data()
-    raw_data = data["pixels"]
-    impact = data["impact"]
-    avg_temp = raw_data.max()
+    raw_data = state["pixels"]
+    impact = state["impact"]
+    avg_temp = state["avg_temp"]
     normalized_data = min_max_normalize(raw_data)
+    if METRICS.enabled:
+        METRICS.observe("frame_age", time.time() - state["acquired_at"]) # 센서 획득부터 화면까지 지연
+    clock.lap("ui_acquire")
 
     # ---------------------------------------------------------
-    # [2] AI 추론 & 상황 판단 (Logic Layer) - 여기서 모든 변수 확정
+    # [2] AI 추론 & 상황 판단 결과 (Logic Layer는 pipeline.py에서 실행)
     # ---------------------------------------------------------
-    prediction = 0
-    confidence = 99.1
-    
-    # 2-1. 모델 예측
-    if model:
-        ms_buffer.update(impact, data["is_detected"])
-        peak_impact, loitering_score = ms_buffer.get_features()
-        stay_time_calc = loitering_score * 30 
-        
-        features = [[avg_temp, peak_impact, stay_time_calc]]
-        prediction = model.predict(features)[0]
-
-        # 잔상 제거 필터 (충격량이 낮으면 과거 버퍼 무시)
-        if prediction in [2, 3] and impact < 17000:
-            prediction = 0
-    
-    # 2-2. 시연용 강제 오버라이드 (Demo Override)
-    if time.time() < st.session_state.event_lock_until:
-        if st.session_state.locked_event == "impact":
-            prediction = 2  # 이상 충격
-            impact = 28000  # 화면 표시용 수치도 높게 고정
-            confidence = 98.5
-        elif st.session_state.locked_event == "fall":
-            prediction = 3  # 낙상
-            impact = 20000  # 화면 표시용 수치 고정
-            confidence = 96.2
-            
-    # 타이머가 없더라도, 순간적인 충격량이 높으면 감지 (기존 로직 유지)
-    elif impact > 24000:
-        prediction = 2 
-        confidence = 98.5
-    elif 17500 < impact < 23000:
-        prediction = 3 
-        confidence = 96.2
-
-    # 2-3. 최종 상태 라벨 및 위험도(Color) 결정
-    status = status_labels[prediction]
-    if prediction != 0 and confidence == 99.1: # 데모 모드가 아닐 때 랜덤 confidence
-        confidence = 92.4 + np.random.uniform(-1, 5)
-
-    # 위험 수준(status_delta) 및 UI 색상(d_color) 결정
-    if prediction in [2, 3]:   # 🚨 DANGER (충격, 낙상)
-        status_delta = "DANGER"
-        d_color = "inverse"
-    elif prediction in [1, 4]: # ⚠️ CAUTION (배회, 동물)
-        status_delta = "CAUTION"
-        d_color = "normal"
-    else:                      # ✅ SAFE
-        status_delta = "SAFE"
-        d_color = "normal"
+    prediction = state["prediction"]
+    confidence = state["confidence"]
+    status = state["status"]
+    status_delta = state["status_delta"] # DANGER / CAUTION / SAFE
+    d_color = "inverse" if status_delta == "DANGER" else "normal"
+
+    # model_trainer.py가 저장한 새 모델 적용에 실패했다면 알림
+    if pipeline.model_error and str(pipeline.model_error) != last_model_error:
+        last_model_error = str(pipeline.model_error)
+        st.toast(f"⚠️ AI 모델 오류: {last_model_error}")
+    clock.lap("ui_decide")
 
     # ---------------------------------------------------------
     # [3] 시각화 및 알림 (View Layer)
     # ---------------------------------------------------------
     
     # 3-1. 좌측 열화상 모니터링 플롯
-    fig, ax = plt.subplots(figsize=(8, 6.5)) 
-    fig.patch.set_facecolor('#000000') 
-    
     if not is_icon_mode:
-        processed = zoom(normalized_data, 8, order=3)
-        ax.imshow(processed, cmap='magma', aspect='auto', vmin=0, vmax=1)
-        ax.axis('off')
+        processed = upsampler(normalized_data)
+        png = lut_renderer.render(processed)
     else:
-        ax.set_facecolor('#111111') 
-        for x in range(9):
-            ax.axhline(x-0.5, color='white', lw=0.5, alpha=0.1)
-            ax.axvline(x-0.5, color='white', lw=0.5, alpha=0.1)
-        
-        if data["is_detected"]:
-            display_char, main_color, label_text = "?", "#FFFFFF", "감지 중"
+        smoothed = np.empty((0, 2))
+        display_char, main_color, label_text = "?", "#FFFFFF", "감지 중"
+        if state["is_detected"]:
             if prediction in [1, 2, 3]: 
                 display_char, main_color, label_text = "P", "#00F2FF", "PERSON"
             elif prediction == 4: 
                 display_char, main_color, label_text = "A", "#FFAB40", "ANIMAL"
 
-            raw_r, raw_c = get_heat_center(raw_data) 
-            smooth_r, smooth_c = smoother.update(raw_r, raw_c) 
-            
-            ax.scatter(smooth_c, smooth_r, s=8000, c=main_color, alpha=0.1, marker='o')
-            ax.scatter(smooth_c, smooth_r, s=4000, c=main_color, alpha=0.3, marker='o')
-            ax.scatter(smooth_c, smooth_r, s=1200, c=main_color, marker='o', edgecolors='white', linewidth=3)
-            ax.text(smooth_c, smooth_r, display_char, color='white', fontsize=28, ha='center', va='center', fontweight='black')
-            ax.text(smooth_c, smooth_r + 1.2, f"[{label_text}]", color=main_color, fontsize=10, ha='center', fontweight='bold',
-                    bbox=dict(facecolor='black', alpha=0.7, edgecolor=main_color, boxstyle='round,pad=0.3'))
-        ax.set_xlim(-0.5, 7.5); ax.set_ylim(7.5, -0.5); ax.axis('off')
-
-    plt.subplots_adjust(0, 0, 1, 1)
-    plot_spot.pyplot(fig)
-    plt.close(fig)
+            # 임계 온도 이상 영역을 모두 찾아 대상별로 추적 (해상도 무관)
+            blobs = detect_blobs(raw_data)
+            track_ids, smoothed = tracker.update(np.column_stack([blobs["row"], blobs["col"]]))
+        else:
+            tracker.update(np.empty((0, 2))) # 보이지 않는 프레임도 miss로 집계
+
+        # 기존 아티스트의 좌표/텍스트만 바꿔서 다시 그림
+        figure_renderer.render_icons(smoothed, display_char, main_color, label_text)
+        png = figure_renderer.to_png()
+    clock.lap("ui_render")
+    plot_spot.image(png, width="stretch")
+    if not first_frame_sent:
+        METRICS.observe("ui_first_frame", time.perf_counter() - SCRIPT_STARTED) # 스크립트 시작 -> 첫 프레임
+        first_frame_sent = True
+        prewarm_icon_mode()
 
     # 3-2. 긴급 상황 팝업 (Overlay)
     if status_delta == "DANGER":
         alert_msg = f"T: {avg_temp:.1f}°C / Impact: {int(impact)}"
-        alert_spot.markdown(get_alert_overlay(status, alert_msg), unsafe_allow_html=True)
+        if changed("alert", (status, alert_msg)):
+            alert_spot.markdown(get_alert_overlay(status, alert_msg), unsafe_allow_html=True)
         st.session_state.emergency_triggered = True
     else:
-        alert_spot.empty()
+        if changed("alert", None):
+            alert_spot.empty()
         st.session_state.emergency_triggered = False
+    clock.lap("ui_send")
 
     # ---------------------------------------------------------
     # [4] 데이터 저장 (Data Layer)
     # ---------------------------------------------------------
     
-    # 상태가 변했고, 정상이 아니라면 로그 저장
-    if status != "✅ 정상" and status != last_logged_status:
-        # 이미 [2] 단계에서 확정된 status_delta를 사용하므로 로직이 깔끔함
-        risk_level = status_delta # DANGER or CAUTION
-        
-        st.session_state.log_history.insert(0, {
-            "시각": datetime.now().strftime("%H:%M:%S"),
-            "이벤트": status,
-            "위험도": risk_level,
-            "상세수치": f"T: {avg_temp:.1f}°C / I: {int(impact)}"
-        })
-        if len(st.session_state.log_history) > 50: 
-            st.session_state.log_history.pop()
-    
-    last_logged_status = status
+    # 이벤트 기록은 공유 파이프라인이 담당 (모든 세션이 같은 로그를 봄)
 
     # ---------------------------------------------------------
     # [5] 우측 메트릭 업데이트
     # ---------------------------------------------------------
-    m1_spot.metric(label="활성 센서", value="02 / 02 Units", delta="Thermal & Vibration Sync")
-    m2_spot.metric(label="감지된 이벤트", value=f"{len(st.session_state.log_history)} 건", delta=f"최근: {data['time']}")
-    m3_spot.metric(label="현재 상황 (AI 분석)", value=status, delta=f"신뢰도 {confidence:.1f}%", delta_color=d_color)
-
-    footer_spot.markdown(f"<p style='color:#AAA; font-size:0.8rem; text-align:center;'>System Node: MAPO-A1 | Protocol: MQTT-JSON | Last Sync: {data['time']}</p>", unsafe_allow_html=True)
-    time.sleep(0.4)
\ No newline at end of file
+    # 표시되는 문자열이 바뀐 위젯만 다시 전송
+    m2 = (f"{event_store.count(after=hidden_seq)} 건", f"최근: {state['time']}")
+    if changed("m2", m2):
+        m2_spot.metric(label="감지된 이벤트", value=m2[0], delta=m2[1])
+    m3 = (status, f"신뢰도 {confidence:.1f}%", d_color)
+    if changed("m3", m3):
+        m3_spot.metric(label="현재 상황 (AI 분석)", value=m3[0], delta=m3[1], delta_color=m3[2])
+    clock.lap("ui_metrics")
+    clock.total("ui_frame")
+
+    # 시스템 상태 패널: 단계별 p50/p99와 큐 상태 (계측 비용도 함께 표시)
+    if loop_counter % HEALTH_PANEL_EVERY == 0:
+        if st.session_state.health_panel:
+            health_spot.markdown(get_health_panel(), unsafe_allow_html=True)
+        else:
+            health_spot.empty()
\ No newline at end of file
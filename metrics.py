@@ -0,0 +1,249 @@
+import bisect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 50µs ~ 2.5s 로그 간격 버킷 (초)
+DEFAULT_BUCKETS = tuple(round(5e-5 * 2 ** i, 7) for i in range(16))
+
+
+class Histogram:
+    """고정 버킷 지연 시간 히스토그램입니다.
+
+    락 없이 카운터만 증가시키므로 기록 비용이 작습니다. 한 단계는 보통 한 스레드만 기록하며,
+    여러 세션이 동시에 기록하면 드물게 1건이 누락될 수 있는 근사치입니다.
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def quantile(self, q):
+        """버킷 안에서 선형 보간한 근사 분위수 (초)."""
+        counts = list(self.counts)
+        total = sum(counts)
+        if total == 0:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for i, n in enumerate(counts):
+            if seen + n >= rank and n:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+
+class _Timer:
+    __slots__ = ("histogram", "started")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_TIMER = _NullTimer()
+
+
+class StageClock:
+    """연속된 단계를 경계마다 lap()으로 잘라 재는 스톱워치입니다 (코드 블록을 감싸지 않아도 됨)."""
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self.started = self.last = 0.0
+
+    def start(self):
+        self.started = self.last = time.perf_counter()
+
+    def lap(self, stage):
+        """직전 lap() 이후 경과 시간을 stage에 기록합니다."""
+        if not self.metrics.enabled:
+            return
+        now = time.perf_counter()
+        self.metrics.observe(stage, now - self.last)
+        self.last = now
+
+    def total(self, stage):
+        """start() 이후 전체 경과 시간을 stage에 기록합니다."""
+        if self.metrics.enabled:
+            self.metrics.observe(stage, time.perf_counter() - self.started)
+
+
+class Metrics:
+    """단계별 지연 시간 히스토그램, 카운터, 게이지를 모아 두는 저장소입니다.
+
+    enabled를 False로 바꾸면 timer()가 아무것도 하지 않는 객체를 돌려주므로 실행 중에도 계측을 끌 수 있습니다.
+    """
+    def __init__(self, namespace="swg", enabled=True):
+        self.namespace = namespace
+        self.enabled = enabled
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}  # 이름 -> (설명, 호출 시 값을 돌려주는 함수)
+
+    def timer(self, stage):
+        """with metrics.timer("render"): ... 로 구간 시간을 기록합니다."""
+        if not self.enabled:
+            return NULL_TIMER
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms.setdefault(stage, Histogram())
+        # 같은 단계를 여러 스레드가 동시에 잴 수 있으므로 시작 시각은 매번 새 객체에 둠
+        return _Timer(histogram)
+
+    def observe(self, stage, seconds):
+        if self.enabled:
+            self.timer(stage).histogram.observe(seconds)
+
+    def inc(self, name, n=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def gauge(self, name, fn, help_text=""):
+        """스크레이프할 때마다 fn()을 호출해 현재 값을 읽는 게이지를 등록합니다."""
+        self.gauges[name] = (help_text, fn)
+
+    def reset(self):
+        self.histograms.clear()
+        self.counters.clear()
+
+    def summary(self):
+        """대시보드 패널용 단계별 요약: {stage: (count, p50_ms, p99_ms, mean_ms)}"""
+        result = {}
+        for stage, h in list(self.histograms.items()):
+            if h.count:
+                result[stage] = (h.count, h.quantile(0.5) * 1000, h.quantile(0.99) * 1000, h.sum / h.count * 1000)
+        return result
+
+    def gauge_values(self):
+        values = {}
+        for name, (_, fn) in list(self.gauges.items()):
+            try:
+                values[name] = float(fn())
+            except Exception:
+                continue
+        return values
+
+    def to_prometheus(self):
+        """Prometheus 텍스트 노출 형식으로 직렬화합니다."""
+        ns = self.namespace
+        lines = [
+            f"# HELP {ns}_stage_seconds 감지 루프 단계별 소요 시간",
+            f"# TYPE {ns}_stage_seconds histogram",
+        ]
+        for stage, h in sorted(self.histograms.items()):
+            cumulative = 0
+            for bound, n in zip(h.buckets + (float("inf"),), list(h.counts)):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{ns}_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            lines.append(f'{ns}_stage_seconds_sum{{stage="{stage}"}} {h.sum:.9f}')
+            lines.append(f'{ns}_stage_seconds_count{{stage="{stage}"}} {h.count}')
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"# TYPE {ns}_{name}_total counter")
+            lines.append(f"{ns}_{name}_total {value}")
+        values = self.gauge_values()
+        for name, (help_text, _) in sorted(self.gauges.items()):
+            value = values.get(name)
+            if value is None:
+                continue
+            if help_text:
+                lines.append(f"# HELP {ns}_{name} {help_text}")
+            lines.append(f"# TYPE {ns}_{name} gauge")
+            lines.append(f"{ns}_{name} {value:g}")
+        lines.append(f"# TYPE {ns}_metrics_enabled gauge")
+        lines.append(f"{ns}_metrics_enabled {int(self.enabled)}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """로컬 /metrics HTTP 엔드포인트를 데몬 스레드에서 제공합니다."""
+    def __init__(self, metrics, host="127.0.0.1", port=9108):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self.server = None
+
+    def start(self):
+        if self.server is not None:
+            return self
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.to_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass  # 스크레이프마다 콘솔에 찍히지 않도록
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name="swg-metrics", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+# 파이프라인과 화면 루프가 함께 쓰는 기본 저장소
+METRICS = Metrics()
+
+
+def measure_overhead(n=100000):
+    """계측을 켰을 때와 껐을 때 timer() 한 번의 비용 (µs)을 측정합니다."""
+    metrics = Metrics()
+    result = {}
+    for enabled in (True, False):
+        metrics.enabled = enabled
+        started = time.perf_counter()
+        for _ in range(n):
+            with metrics.timer("probe"):
+                pass
+        result["enabled" if enabled else "disabled"] = (time.perf_counter() - started) / n * 1e6
+    return result
+
+
+if __name__ == "__main__":
+    overhead = measure_overhead()
+    print(f"⏱️ 프로브 1회 비용: 켜짐 {overhead['enabled']:.2f} µs / 꺼짐 {overhead['disabled']:.2f} µs")
+
+    server = MetricsServer(METRICS).start()
+    for _ in range(100):
+        with METRICS.timer("demo"):
+            time.sleep(0.001)
+    print(f"📡 http://{server.host}:{server.port}/metrics")
+    print(METRICS.to_prometheus())
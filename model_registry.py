@@ -0,0 +1,135 @@
+import hashlib
+import os
+import threading
+import time
+
+
+# 학습 스크립트가 만드는 모델 파일들 (model_trainer.py / field_trainer.py 모두 .pkl 다음에 .npz를 기록)
+DEFAULT_MODEL_PATHS = ("model_rf.npz", "model_rf.pkl")
+MTIME_TIE_SECONDS = 2.0  # 이 안에 기록된 후보는 같은 학습 결과로 보고 앞쪽 후보(.npz)를 고름
+
+
+class ModelLoadError(RuntimeError):
+    """모델 파일을 읽거나 역직렬화하지 못했을 때 발생합니다."""
+
+
+def newest_path(paths):
+    """존재하는 후보 중 가장 최근에 기록된 파일 경로 (하나도 없으면 첫 후보).
+
+    mtime 차이가 MTIME_TIE_SECONDS 이내면 (git checkout, 학습 스크립트가 연달아 기록) 앞쪽 후보를 고릅니다.
+    """
+    if isinstance(paths, str):
+        return paths
+    mtimes = {p: os.stat(p).st_mtime for p in paths if os.path.exists(p)}
+    if not mtimes:
+        return paths[0]
+    newest = max(mtimes.values())
+    return next(p for p in paths if p in mtimes and newest - mtimes[p] <= MTIME_TIE_SECONDS)
+
+
+def joblib_load(path):
+    # joblib/sklearn은 피클 모델을 실제로 읽을 때만 불러옴 (헤드리스 데몬의 시작 시간/메모리 절약)
+    import joblib
+
+    return joblib.load(path)
+
+
+class ModelVersion:
+    def __init__(self, version, path, mtime, model):
+        self.version = version
+        self.path = path
+        self.mtime = mtime
+        self.model = model
+        self.loaded_at = time.time()
+
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()[:12]
+
+
+class ModelRegistry:
+    """프로세스 전체에서 공유하는 모델 저장소입니다.
+
+    같은 내용(sha256)의 모델은 한 번만 불러오고, 파일의 mtime/size가 바뀌면
+    해시를 다시 계산해 새 버전을 불러온 뒤 참조를 원자적으로 교체합니다.
+    path에 후보 경로 목록을 주면 그중 가장 최근에 기록된 파일을 서비스합니다 (학습 스크립트마다
+    쓰는 형식이 달라도 마지막으로 학습한 모델로 핫 리로드됨).
+    """
+    def __init__(self, path, loader=joblib_load, check_interval=2.0, keep_versions=3):
+        self.paths = (path,) if isinstance(path, str) else tuple(path)
+        self.path = newest_path(self.paths)
+        self.loader = loader
+        self.check_interval = check_interval
+        self.keep_versions = keep_versions
+        self.versions = {}
+        self.current = None
+        self.last_error = None
+        self._stat = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        """현재 모델을 반환합니다. 주기적으로 파일 변경을 확인해 핫 리로드합니다."""
+        now = time.monotonic()
+        if self.current is None or now - self._checked_at >= self.check_interval:
+            self.refresh()
+        return self.current.model
+
+    @property
+    def version(self):
+        return self.current.version if self.current else None
+
+    def refresh(self):
+        """파일이 바뀌었으면 새 버전을 불러옵니다. 첫 로드 실패는 ModelLoadError로 올립니다."""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                self.path = newest_path(self.paths)
+                st = os.stat(self.path)
+                stat = (self.path, st.st_mtime_ns, st.st_size)
+                if stat == self._stat and self.current is not None:
+                    return False
+
+                version = file_digest(self.path)
+                entry = self.versions.get(version)
+                if entry is None:
+                    entry = ModelVersion(version, self.path, st.st_mtime, self.loader(self.path))
+                    self.versions[version] = entry
+                    self._evict()
+            except Exception as e:
+                self.last_error = ModelLoadError(f"{self.path}: {e}")
+                if self.current is None:
+                    raise self.last_error from e
+                return False  # 기존 모델로 계속 서비스
+
+            self._stat = stat
+            self.last_error = None
+            changed = self.current is None or self.current.version != entry.version
+            self.current = entry  # 참조 교체는 원자적
+            return changed
+
+    def _evict(self):
+        while len(self.versions) > self.keep_versions:
+            # 현재 서비스 중인 버전은 남겨둠
+            candidates = [v for v in self.versions.values() if v is not self.current]
+            oldest = min(candidates, key=lambda v: v.loaded_at)
+            del self.versions[oldest.version]
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_registry(path, loader=joblib_load, **kwargs):
+    """경로(또는 후보 경로 목록)별로 하나의 ModelRegistry를 돌려줍니다 (Streamlit 세션 간 공유)."""
+    key = os.path.abspath(path) if isinstance(path, str) else tuple(os.path.abspath(p) for p in path)
+    with _registries_lock:
+        registry = _registries.get(key)
+        if registry is None:
+            registry = ModelRegistry(path, loader=loader, **kwargs)
+            _registries[key] = registry
+        return registry
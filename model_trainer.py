@@ -1,59 +1,259 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
 import pandas as pd
 import numpy as np
+from sklearn.base import clone
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
+from sklearn.tree import DecisionTreeClassifier
+from sklearn.model_selection import GridSearchCV, train_test_split
 from sklearn.metrics import f1_score, classification_report
 import joblib
 
+from forest import FlatForest
+
+FEATURES = ['avg_temp', 'max_impact', 'stay_time']
+TARGET_NAMES = ['Normal', 'Loitering', 'Impact', 'Fall', 'Animal']
+
+# 시나리오별 분포: (온도 평균, 표준편차), (충격 평균, 표준편차), (체류 시간 최소, 최대)
+CLASS_SPECS = [
+    # [정상 상황] 낮은 온도, 낮은 충격, 짧은 체류
+    ((24, 1), (16384, 200), (0, 5)),
+    # [배회 상황] 사람 체온, 낮은 충격, 긴 체류 시간 (30초 이상)
+    ((33, 1.5), (16384, 300), (30, 120)),
+    # [이상 충격 상황] 사람 체온, 높은 충격(담 넘기), 짧은 체류(빠른 이동)
+    ((34, 1), (24000, 1500), (1, 10)),
+    # [낙상 상황] 사람 체온, 매우 높은 충격(바닥 충돌), 중간 체류(쓰러진 채 정지)
+    ((32, 2), (30000, 2500), (10, 20)),
+    # [동물 감지] 낮은 체온(털에 의한 단열효과), 중간 충격(빠른 움직임), 매우 짧은 체류
+    ((28, 1), (18000, 1000), (0, 3)),
+]
+
+# 하이퍼파라미터 탐색 후보 (--search)
+PARAM_GRID = {
+    'n_estimators': [50, 100],
+    'max_depth': [None, 12],
+    'min_samples_leaf': [1, 5],
+}
+
+# 경량화 후보: (이름, 기본 숲에 덮어쓸 파라미터)
+COMPACT_VARIANTS = [
+    ('depth<=12', {'max_depth': 12}),
+    ('depth<=8', {'max_depth': 8}),
+    ('depth<=6', {'max_depth': 6}),
+    ('trees=30', {'n_estimators': 30}),
+    ('trees=10', {'n_estimators': 10}),
+    ('trees=10, depth<=8', {'n_estimators': 10, 'max_depth': 8}),
+    ('pruned ccp=1e-3', {'ccp_alpha': 1e-3}),
+    ('pruned ccp=5e-3', {'ccp_alpha': 5e-3}),
+]
+DISTILL_DEPTHS = [6, 8, 10]  # 숲의 예측을 흉내 내는 단일 트리 깊이
+
+
 # 1. 시나리오별 합성 데이터 생성 함수
-def generate_synthetic_data(samples_per_class=500):
-    data = []
-    
-    for _ in range(samples_per_class):
-        # [정상 상황] 낮은 온도, 낮은 충격, 짧은 체류
-        data.append([np.random.normal(24, 1), np.random.normal(16384, 200), np.random.uniform(0, 5), 0])
-        
-        # [배회 상황] 사람 체온, 낮은 충격, 긴 체류 시간 (30초 이상)
-        data.append([np.random.normal(33, 1.5), np.random.normal(16384, 300), np.random.uniform(30, 120), 1])
-        
-        # [이상 충격 상황] 사람 체온, 높은 충격(담 넘기), 짧은 체류(빠른 이동)
-        data.append([np.random.normal(34, 1), np.random.normal(24000, 1500), np.random.uniform(1, 10), 2])
-        
-        # [낙상 상황] 사람 체온, 매우 높은 충격(바닥 충돌), 중간 체류(쓰러진 채 정지)
-        data.append([np.random.normal(32, 2), np.random.normal(30000, 2500), np.random.uniform(10, 20), 3])
-        
-        # [동물 감지] 낮은 체온(털에 의한 단열효과), 중간 충격(빠른 움직임), 매우 짧은 체류
-        data.append([np.random.normal(28, 1), np.random.normal(18000, 1000), np.random.uniform(0, 3), 4])
-
-    columns = ['avg_temp', 'max_impact', 'stay_time', 'label']
-    return pd.DataFrame(data, columns=columns)
-
-# 2. 데이터 생성 및 전처리
-print("🚀 합성 데이터 생성 중...")
-df = generate_synthetic_data()
-
-X = df[['avg_temp', 'max_impact', 'stay_time']]
-y = df['label']
-
-# 학습용/테스트용 분리 (8:2)
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-# 3. Random Forest 모델 학습
-print("🧠 AI 모델 학습 시작 (Random Forest)...")
-rf_model = RandomForestClassifier(n_estimators=100, random_state=42)
-rf_model.fit(X_train, y_train)
-
-# 4. 성능 검증 (F1-score 확인)
-y_pred = rf_model.predict(X_test)
-f1 = f1_score(y_test, y_pred, average='weighted')
-
-print("-" * 30)
-print(f"✅ 모델 학습 완료!")
-print(f"📊 F1-Score: {f1:.4f}") # 80% 이상인지 확인
-print("-" * 30)
-print(classification_report(y_test, y_pred, target_names=['Normal', 'Loitering', 'Impact', 'Fall', 'Animal']))
-
-# 5. 모델 저장
-model_filename = 'model_rf.pkl'
-joblib.dump(rf_model, model_filename)
-print(f"💾 모델 파일 저장 완료: {model_filename}")
\ No newline at end of file
+def generate_synthetic_arrays(samples_per_class=500, seed=None):
+    """클래스마다 특징 열 전체를 numpy 호출 한 번씩으로 만듭니다. (X float32 (N, 3), y int8 (N,))"""
+    rng = np.random.default_rng(seed)
+    n = samples_per_class
+    X = np.empty((n * len(CLASS_SPECS), 3), dtype=np.float32)
+    y = np.repeat(np.arange(len(CLASS_SPECS), dtype=np.int8), n)
+    for label, (temp, impact, stay) in enumerate(CLASS_SPECS):
+        block = X[label * n:(label + 1) * n]
+        block[:, 0] = rng.normal(*temp, n)
+        block[:, 1] = rng.normal(*impact, n)
+        block[:, 2] = rng.uniform(*stay, n)
+    return X, y
+
+
+def generate_synthetic_data(samples_per_class=500, seed=None):
+    X, y = generate_synthetic_arrays(samples_per_class, seed)
+    df = pd.DataFrame(X, columns=FEATURES)
+    df['label'] = y
+    return df
+
+
+def model_size_mb(estimator, X=None, y=None):
+    """학습된 숲의 노드/리프 배열 크기 (MB). GridSearchCV scoring으로도 사용합니다."""
+    total = 0
+    for tree in estimator.estimators_:
+        state = tree.tree_.__getstate__()
+        total += state['nodes'].nbytes + state['values'].nbytes
+    return total / 1e6
+
+
+def peak_rss_mb():
+    """현재 프로세스와 종료된 자식 프로세스 중 가장 큰 최대 RSS (MB). resource 모듈이 없으면 (Windows) nan."""
+    try:
+        import resource
+    except ImportError:
+        return float('nan')
+    usage = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return usage / 1e6 if sys.platform == 'darwin' else usage / 1024  # macOS는 바이트, Linux는 KB
+
+
+def search(X_train, y_train, param_grid=PARAM_GRID, cv=3, n_jobs=-1):
+    """교차 검증 하이퍼파라미터 탐색. 후보 x fold 작업을 모든 코어에 나눠 실행합니다."""
+    grid = GridSearchCV(
+        # 바깥 탐색이 코어를 모두 쓰므로 숲 자체는 단일 스레드 (과다 구독 방지)
+        RandomForestClassifier(random_state=42, n_jobs=1),
+        param_grid,
+        cv=cv,
+        scoring={'f1': 'f1_weighted', 'model_mb': model_size_mb},
+        refit='f1',
+        n_jobs=n_jobs,
+    )
+    grid.fit(X_train, y_train)
+
+    results = grid.cv_results_
+    # 설정별 메모리는 학습된 모델의 크기 (병렬 작업별 학습 중 RSS는 따로 잴 수 없어 전체 최대 RSS만 마지막에 출력)
+    print(f"{'설정':52s} {'학습(s)':>8s} {'모델 크기(MB)':>13s} {'F1':>15s}")
+    for i in np.argsort(results['rank_test_f1']):
+        params = ", ".join(f"{k}={v}" for k, v in results['params'][i].items())
+        print(f"{params:52s} {results['mean_fit_time'][i]:8.2f} {results['mean_test_model_mb'][i]:13.2f} "
+              f"{results['mean_test_f1'][i]:.4f} ± {results['std_test_f1'][i]:.4f}")
+    print(f"🏆 최적 설정: {grid.best_params_}")
+    return grid.best_estimator_
+
+
+def distill(teacher, X_train, copies=4, noise=0.1, max_depth=8, seed=42):
+    """숲(teacher)의 예측을 정답으로 삼아 얕은 단일 트리를 학습합니다.
+
+    학습 데이터 주변에 특징별 표준편차 x noise만큼 흔든 표본을 copies배 더 만들어
+    teacher가 라벨을 붙이므로, 원본 라벨만 쓸 때보다 숲의 결정 경계를 촘촘하게 따라갑니다.
+    """
+    rng = np.random.default_rng(seed)
+    jitter = rng.normal(0, 1, (copies, *X_train.shape)) * (X_train.std(axis=0) * noise)
+    X_aug = np.concatenate([X_train, (X_train + jitter).reshape(-1, X_train.shape[1])]).astype(np.float32)
+    student = DecisionTreeClassifier(max_depth=max_depth, random_state=seed)
+    return student.fit(X_aug, teacher.predict(X_aug))
+
+
+def compaction_candidates(base, X_train, y_train):
+    """기본 숲과 깊이 제한 / 트리 수 축소 / 가지치기 / 증류 후보를 (이름, 학습된 모델)로 반환합니다."""
+    candidates = [('full', base)]
+    for name, params in COMPACT_VARIANTS:
+        model = clone(base).set_params(**params)
+        candidates.append((name, model.fit(X_train, y_train)))
+    for depth in DISTILL_DEPTHS:
+        candidates.append((f'distilled tree depth<={depth}', distill(base, X_train, max_depth=depth)))
+    return candidates
+
+
+def _median_ms(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return float(np.median(times)) * 1000
+
+
+def compaction_report(candidates, X_test, y_test, workdir):
+    """후보마다 F1, 압축 파일 크기, 불러오기 시간, 1행/배치 예측 지연을 재서 표로 출력합니다."""
+    rows = []
+    for name, model in candidates:
+        flat = FlatForest.from_sklearn(model)
+        path = os.path.join(workdir, f"candidate{len(rows)}.npz")
+        flat.save(path)
+        loaded = FlatForest.load(path)
+        rows.append({
+            'name': name,
+            'model': model,
+            'flat': flat,
+            'f1': f1_score(y_test, loaded.predict(X_test), average='weighted'),
+            'size_kb': os.path.getsize(path) / 1024,
+            'load_ms': _median_ms(lambda: FlatForest.load(path), 5),
+            'row_ms': _median_ms(lambda: loaded.predict(X_test[:1]), 50),
+            'batch_ms': _median_ms(lambda: loaded.predict(X_test), 5),
+        })
+
+    print(f"{'후보':28s} {'F1':>7s} {'크기(KB)':>9s} {'로드(ms)':>9s} {'1행(ms)':>8s} {f'{len(X_test)}행(ms)':>10s}")
+    for r in rows:
+        print(f"{r['name']:28s} {r['f1']:7.4f} {r['size_kb']:9.1f} {r['load_ms']:9.2f} "
+              f"{r['row_ms']:8.3f} {r['batch_ms']:10.2f}")
+    return rows
+
+
+def pick_compact(rows, f1_floor):
+    """F1 하한을 넘는 후보 중 파일이 가장 작은 것 (없으면 None)."""
+    passing = [r for r in rows if r['f1'] >= f1_floor]
+    return min(passing, key=lambda r: r['size_kb']) if passing else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SmartWallGuard 상황 분류 모델 학습")
+    parser.add_argument("--samples-per-class", type=int, default=500)
+    parser.add_argument("--search", action="store_true", help="교차 검증 하이퍼파라미터 탐색 후 최적 모델 저장")
+    parser.add_argument("--jobs", type=int, default=-1, help="사용할 코어 수 (-1: 전체)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", default="model_rf.pkl")
+    parser.add_argument("--compact-output", default="model_rf.npz",
+                        help="경량 모델 저장 경로 (pickle 없는 .npz, 앱/데몬이 기본으로 불러옴)")
+    parser.add_argument("--f1-floor", type=float, default=0.95, help="경량 모델이 넘어야 하는 F1 하한")
+    parser.add_argument("--no-compact", action="store_true", help="경량화 후보 비교를 건너뜀 (원본 숲을 .npz로 변환)")
+    args = parser.parse_args()
+
+    # 2. 데이터 생성 및 전처리
+    print("🚀 합성 데이터 생성 중...")
+    started = time.perf_counter()
+    X, y = generate_synthetic_arrays(args.samples_per_class, args.seed)
+    print(f"   {len(y):,}건, {time.perf_counter() - started:.2f}s, {(X.nbytes + y.nbytes) / 1e6:.1f} MB")
+
+    # 학습용/테스트용 분리 (8:2)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    # 3. Random Forest 모델 학습
+    started = time.perf_counter()
+    if args.search:
+        print(f"🔎 하이퍼파라미터 탐색 시작 (GridSearchCV, n_jobs={args.jobs})...")
+        rf_model = search(X_train, y_train, n_jobs=args.jobs)
+    else:
+        print("🧠 AI 모델 학습 시작 (Random Forest)...")
+        rf_model = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=args.jobs)
+        rf_model.fit(X_train, y_train)
+    train_s = time.perf_counter() - started
+
+    # 4. 성능 검증 (F1-score 확인)
+    y_pred = rf_model.predict(X_test)
+    f1 = f1_score(y_test, y_pred, average='weighted')
+
+    print("-" * 30)
+    print(f"✅ 모델 학습 완료!")
+    print(f"📊 F1-Score: {f1:.4f}") # 80% 이상인지 확인
+    print(f"⏱️ 학습 시간: {train_s:.2f}s / 모델 크기: {model_size_mb(rf_model):.2f} MB / 최대 RSS: {peak_rss_mb():.0f} MB")
+    print("-" * 30)
+    print(classification_report(y_test, y_pred, target_names=TARGET_NAMES))
+
+    # 추론 시 스레드 풀을 띄우지 않도록 저장 전에 되돌림
+    rf_model.n_jobs = None
+
+    # 5. 모델 저장
+    model_filename = args.output
+    # 실행 중인 앱(ModelRegistry)이 반쯤 쓰인 파일을 읽지 않도록 임시 파일에 쓴 뒤 원자적으로 교체
+    joblib.dump(rf_model, model_filename + '.tmp')
+    os.replace(model_filename + '.tmp', model_filename)
+    print(f"💾 모델 파일 저장 완료: {model_filename}")
+
+    # 6. 경량화 후보 비교 및 .npz 저장 (앱/데몬은 pickle/sklearn 없이 이 파일을 불러옴)
+    # 후보 비교를 건너뛰거나 하한을 넘는 후보가 없으면 원본 숲을 그대로 변환해 저장
+    flat, detail = FlatForest.from_sklearn(rf_model), "원본 숲"
+    if not args.no_compact:
+        print(f"🪶 경량화 후보 비교 (F1 하한 {args.f1_floor})...")
+        with tempfile.TemporaryDirectory() as workdir:
+            rows = compaction_report(compaction_candidates(rf_model, X_train, y_train), X_test, y_test, workdir)
+        best = pick_compact(rows, args.f1_floor)
+        if best is None:
+            print(f"⚠️ F1 {args.f1_floor} 이상인 후보가 없어 원본 숲을 그대로 저장합니다")
+        else:
+            full = rows[0]
+            flat = best['flat']
+            detail = (f"{best['name']}, F1 {best['f1']:.4f}, {best['size_kb']:.1f} KB / 원본 {full['size_kb']:.1f} KB, "
+                      f"1행 {best['row_ms']:.3f} ms / 원본 {full['row_ms']:.3f} ms")
+    # .pkl보다 나중에 기록하므로 ModelRegistry(newest_path)가 이 파일을 서비스함
+    with open(args.compact_output + '.tmp', 'wb') as f:
+        flat.save(f)
+    os.replace(args.compact_output + '.tmp', args.compact_output)
+    print(f"💾 경량 모델 저장 완료: {args.compact_output} ({detail})")
@@ -0,0 +1,502 @@
+import queue
+import threading
+import time
+import weakref
+from datetime import datetime
+import numpy as np
+
+from batching import BatchPredictor
+from cascade import DEFAULT_THRESHOLDS, RuleCascade
+from event_store import EventStore
+from metrics import Metrics
+from scheduler import AdaptiveRate, ChangeDetector
+from model_registry import ModelLoadError
+from utils import MultiNodeBuffer
+from vibration import VibrationProcessor, inject_burst, simulate_samples
+
+STATUS_LABELS = ['✅ 정상', '👤 배회 감지', '🚨 이상 충격 감지!', '🆘 낙상 사고 발생!', '🐈 동물 감지']
+DETECT_TEMP = 30
+DEFAULT_CONFIDENCE = 99.1
+DEMO_LOCK_SECONDS = 3
+
+
+def risk_level(prediction):
+    """예측 클래스를 위험 수준(DANGER / CAUTION / SAFE)으로 변환합니다."""
+    if prediction in [2, 3]:   # 충격, 낙상
+        return "DANGER"
+    if prediction in [1, 4]:   # 배회, 동물
+        return "CAUTION"
+    return "SAFE"
+
+
+def apply_rules(prediction, confidence, impact, locked_event=None, thresholds=None):
+    """모델 예측 뒤에 적용하는 충격량 기준 보정과 시연용 강제 오버라이드입니다.
+
+    thresholds는 노드별 임계값 (cascade.DEFAULT_THRESHOLDS와 같은 키)이며,
+    (prediction, confidence, 표시용 impact)를 반환합니다.
+    """
+    t = thresholds or DEFAULT_THRESHOLDS
+    # 잔상 제거 필터 (충격량이 낮으면 과거 버퍼 무시)
+    if prediction in [2, 3] and impact < t["suppress_below"]:
+        prediction = 0
+
+    # 시연용 강제 오버라이드 (Demo Override)
+    if locked_event == "impact":
+        return 2, 98.5, 28000  # 화면 표시용 수치도 높게 고정
+    if locked_event == "fall":
+        return 3, 96.2, 20000
+
+    # 타이머가 없더라도, 순간적인 충격량이 높으면 감지 (기존 로직 유지)
+    if impact > t["impact_min"]:
+        return 2, 98.5, impact
+    if t["fall_min"] < impact < t["fall_max"]:
+        return 3, 96.2, impact
+    return prediction, confidence, impact
+
+
+class SimulatedSource:
+    """기존 get_simulated_data()와 같은 분포로 여러 노드의 프레임을 한 번에 만듭니다.
+
+    sample_rate를 주면 충격량을 프레임당 값 하나 대신 kHz 가속도 원시 샘플로 만들고
+    VibrationProcessor로 요약한 블록 최대값을 impact로 씁니다 (RMS/대역 에너지도 함께 반환).
+    샘플 수는 직전 read() 이후 실제로 지난 시간으로 정하므로 (최대 max_span초), 유휴 주기로
+    획득 간격이 늘어나도 그 사이의 진동을 빠짐없이 요약합니다.
+    """
+    def __init__(self, node_ids, shape=(8, 8), seed=None, sample_rate=None, period=0.4, max_span=4.0):
+        self.node_ids = list(node_ids)
+        self.shape = shape
+        self.rng = np.random.default_rng(seed)
+        self.demo = {}  # node_id -> "impact" / "fall" (다음 프레임 한 번만 적용)
+        self.sample_rate = sample_rate
+        self.period = period
+        self.max_span = max_span  # 파이프라인이 멈췄다 다시 시작하면 긴 공백은 이만큼만 채움
+        self.last_read = None
+        self.vibration = VibrationProcessor(len(self.node_ids), sample_rate=sample_rate) if sample_rate else None
+
+    def trigger(self, node_id, mode):
+        self.demo[node_id] = mode
+
+    def read(self):
+        n = len(self.node_ids)
+        rows, cols = self.shape
+        pixels = self.rng.uniform(22, 26, (n,) + self.shape)
+        detected = self.rng.random(n) < 0.7
+        r = self.rng.integers(1, rows - 2, n)
+        c = self.rng.integers(1, cols - 2, n)
+        heat = self.rng.uniform(10, 15, n) * detected
+        for dr in (0, 1):
+            for dc in (0, 1):
+                pixels[np.arange(n), r + dr, c + dc] += heat
+        impact = self.rng.normal(16384, 600, n)
+        samples = simulate_samples(self.rng, n, self._samples_since_last_read()) if self.vibration else None
+
+        # 시연 모드일 경우 강제로 위험 데이터 생성
+        for node_id, mode in list(self.demo.items()):
+            i = self.node_ids.index(node_id)
+            if mode == "impact":
+                pixels[i] = self.rng.uniform(35, 38, self.shape)  # 아주 뜨거운 열원
+                impact[i] = self.rng.uniform(26000, 30000)
+            elif mode == "fall":
+                pixels[i] = self.rng.uniform(32, 34, self.shape)
+                impact[i] = self.rng.uniform(18000, 21000)
+            if samples is not None:
+                inject_burst(self.rng, samples, i, impact[i] - 16384, self.sample_rate)
+        self.demo.clear()
+
+        batch = {"node_ids": self.node_ids, "pixels": pixels, "impact": impact, "timestamp": np.full(n, time.time())}
+        if samples is not None:
+            self.vibration.process(samples)
+            features = self.vibration.tick()
+            batch.update(impact=features["peak"], rms=features["rms"], band_energy=features["band_energy"])
+        return batch
+
+    def _samples_since_last_read(self):
+        now = time.monotonic()
+        span = self.period if self.last_read is None else min(now - self.last_read, self.max_span)
+        self.last_read = now
+        return max(1, int(round(self.sample_rate * span)))
+
+
+class Subscription:
+    """세션 하나가 공유 파이프라인의 스냅샷을 받아 가는 구독입니다."""
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+        self.version = 0
+
+    def wait(self, timeout=None):
+        """새 스냅샷이 발행될 때까지 기다렸다가 반환합니다. timeout까지 없으면 None."""
+        pipeline = self.pipeline
+        pipeline.last_poll = time.time()
+        with pipeline.changed:
+            if pipeline.version == self.version:
+                pipeline.changed.wait(timeout)
+            if pipeline.version == self.version:
+                return None
+            # 여러 버전이 지나갔어도 최신 것만 전달 (중간 프레임은 버림)
+            self.version = pipeline.version
+            return pipeline.snapshot
+
+
+class DetectionPipeline:
+    """획득과 추론을 Streamlit 렌더 루프와 분리해 백그라운드 스레드에서 실행합니다.
+
+    [획득 스레드] --(크기 제한 큐, 가득 차면 오래된 프레임 버림)--> [추론 스레드] --> 최신 상태 스냅샷
+    서버 프로세스에 하나만 두고 모든 세션이 subscribe()로 같은 스냅샷과 이벤트를 받으므로
+    시청자가 늘어도 CPU 사용량이 늘지 않고, 렌더링이 느려도 감지 주기가 늦어지지 않습니다.
+    """
+    def __init__(self, source, registry, store=None, period=0.4, capacity=512, queue_size=4, idle_timeout=60.0,
+                 recorder=None, metrics=None, alerts=None, skip_static=False, idle_period=None, heartbeat=2.0,
+                 rule_cascade=False, audit_rate=0.05):
+        self.source = source
+        self.registry = registry
+        self.store = store if store is not None else EventStore(":memory:")
+        self.recorder = recorder  # recorder.FrameRecorder: 들어온 원본 프레임을 그대로 녹화
+        self.metrics = metrics if metrics is not None else Metrics(enabled=False)
+        self.alerts = alerts  # alerts.AlertDispatcher: DANGER 이벤트를 아웃박스에 넣기만 함 (전송은 백그라운드)
+        self.period = period
+        self.capacity = capacity  # 노드별 버퍼 행 수 (넘는 새 노드는 처리하지 않고 process_error로 알림)
+        self.rejected_nodes = set()
+        # 조용한 장면: 거의 같은 프레임은 추론/상태 갱신을 건너뛰고, 획득 주기를 idle_period까지 늘림
+        self.detector = ChangeDetector(capacity) if skip_static else None
+        self.rate = AdaptiveRate(period, idle_period) if idle_period else None
+        self.heartbeat = heartbeat  # 변화가 없어도 이 간격마다 스냅샷을 발행 (화면의 동기화 시각 갱신용)
+        # 명백한 SAFE/DANGER 프레임은 규칙으로 판정하고 애매한 프레임만 모델로 보냄
+        self.cascade = RuleCascade(capacity, audit_rate=audit_rate) if rule_cascade else None
+        self.skipped_frames = 0
+        self.published_at = 0.0
+        self.idle_timeout = idle_timeout
+
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.node_index = {}
+        self.buffers = MultiNodeBuffer(capacity, short_term_size=10, long_term_size=60)
+        self.batcher = BatchPredictor(None, max_batch_size=capacity, max_wait=0)
+        self.last_status = {}
+        self.locks = {}  # node_id -> (locked_event, 만료 시각)
+
+        self.snapshot = {}  # node_id -> 상태 dict, 매 틱마다 통째로 교체
+        self.version = 0
+        self.changed = threading.Condition()
+        self.subscribers = weakref.WeakSet()
+        self.frame_seq = 0
+        self.dropped_frames = 0
+        self.model_error = None
+        self.process_error = None  # 마지막 처리 오류 (예외 또는 capacity 초과 노드, 추론 스레드는 계속 동작)
+        self.process_errors = 0
+
+        self.last_poll = time.time()
+        self._stop = threading.Event()
+        self._wake = threading.Event()  # 긴 유휴 주기 대기를 중간에 깨움
+        self._threads = []
+        self._start_lock = threading.Lock()  # 여러 세션이 동시에 start()해도 스레드 쌍은 하나만
+
+        self.metrics.gauge("queue_depth", self.frames.qsize, "추론 대기 중인 프레임 묶음 수")
+        self.metrics.gauge("dropped_frames", lambda: self.dropped_frames, "추론 지연으로 버린 프레임 묶음 수")
+        self.metrics.gauge("frames_processed", lambda: self.frame_seq, "처리한 노드 프레임 수")
+        self.metrics.gauge("subscribers", lambda: len(self.subscribers), "구독 중인 세션 수")
+        self.metrics.gauge("pipeline_running", lambda: self.running, "백그라운드 스레드 동작 여부")
+        self.metrics.gauge("skipped_frames", lambda: self.skipped_frames, "변화가 없어 추론을 건너뛴 노드 프레임 수")
+        self.metrics.gauge("process_errors", lambda: self.process_errors, "처리 중 예외로 건너뛴 프레임 묶음 + capacity 초과로 거부한 노드 수")
+        self.metrics.gauge("acquire_period_seconds", lambda: self.period, "현재 획득 주기")
+        if self.cascade is not None:
+            self.metrics.gauge("cascade_skip_rate", lambda: self.cascade.skip_rate, "규칙으로 판정해 모델을 건너뛴 비율")
+            self.metrics.gauge("cascade_agreement", lambda: self.cascade.agreement, "감사 프레임의 규칙/모델 결과 일치율")
+
+    # ---------------------------------------------------------
+    # 스레드 관리
+    # ---------------------------------------------------------
+    @property
+    def running(self):
+        """획득과 추론 스레드가 모두 살아 있는지 (한쪽만 살아 있으면 프레임이 흐르지 않음)."""
+        return bool(self._threads) and all(t.is_alive() for t in self._threads)
+
+    def start(self):
+        if self.running:
+            return
+        with self._start_lock:
+            if self.running:
+                return  # 다른 세션이 먼저 시작함
+            # 한쪽 스레드만 죽었다면 남은 쪽도 멈춘 뒤 한 쌍을 새로 시작
+            self._stop.set()
+            self._wake.set()
+            for t in self._threads:
+                t.join(timeout=1.0)
+            self._wake.clear()
+            self._stop.clear()
+            self.last_poll = time.time()
+            self._threads = [
+                threading.Thread(target=self._acquire_loop, name="swg-acquire", daemon=True),
+                threading.Thread(target=self._infer_loop, name="swg-infer", daemon=True),
+            ]
+            for t in self._threads:
+                t.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def join(self, timeout=None):
+        """두 스레드가 모두 끝날 때까지 기다립니다 (녹화 재생 종료 시 남은 프레임 처리 대기)."""
+        for t in self._threads:
+            t.join(timeout)
+
+    def _acquire_loop(self):
+        while not self._stop.is_set():
+            started = time.time()
+            # 아무도 화면을 보지 않으면 스스로 멈춤 (다음 poll 때 다시 시작)
+            if started - self.last_poll > self.idle_timeout:
+                self._stop.set()
+                break
+            with self.metrics.timer("acquire"):
+                batch = self.source.read()
+            if getattr(self.source, "finished", False):
+                # 녹화 재생이 끝남: 큐에 남은 프레임까지 추론한 뒤 추론 스레드도 멈추도록 종료 표시를 넣음
+                self._put_waiting(None)
+                break
+            if len(batch["node_ids"]) and self.recorder is not None:
+                # 획득 시점에 녹화 (추론이 밀려 큐에서 버려지는 프레임도 녹화에 남음)
+                self.recorder.append(batch["node_ids"], batch["pixels"], batch["impact"], batch["timestamp"])
+                self.recorder.flush()
+            if len(batch["node_ids"]) and not getattr(self.source, "drop_frames", True):
+                # 녹화 재생은 프레임을 버리지 않고 추론이 따라올 때까지 기다림
+                self._put_waiting(batch)
+            elif len(batch["node_ids"]):
+                try:
+                    self.frames.put_nowait(batch)
+                except queue.Full:
+                    # 추론이 밀리면 가장 오래된 프레임을 버리고 최신 프레임을 넣음
+                    try:
+                        self.frames.get_nowait()
+                        self.dropped_frames += 1
+                    except queue.Empty:
+                        pass
+                    self.frames.put_nowait(batch)
+            if getattr(self.source, "paced", False):
+                continue  # 소스가 스스로 속도를 맞춤 (녹화 재생: 배속 또는 대기 없이 최대 속도)
+            self._wake.wait(max(0.0, self.period - (time.time() - started)))
+            self._wake.clear()
+
+    def _put_waiting(self, batch):
+        while not self._stop.is_set():
+            try:
+                self.frames.put(batch, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def _infer_loop(self):
+        while not self._stop.is_set():
+            try:
+                batch = self.frames.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if batch is None:
+                self._stop.set()  # 소스가 끝남
+                break
+            with self.metrics.timer("infer"):
+                try:
+                    self.process(batch)
+                except Exception as e:
+                    # 한 묶음의 처리 실패로 추론 스레드가 죽지 않도록 오류만 남기고 다음 묶음을 처리
+                    self.process_error = e
+                    self.process_errors += 1
+
+    # ---------------------------------------------------------
+    # 추론 및 상황 판단
+    # ---------------------------------------------------------
+    def _rows(self, node_ids):
+        """노드별 버퍼 행 번호. capacity가 다 찬 뒤 처음 보는 노드는 -1입니다."""
+        rows = []
+        for node_id in node_ids:
+            row = self.node_index.get(node_id)
+            if row is None:
+                if len(self.node_index) >= self.capacity:
+                    if node_id not in self.rejected_nodes:
+                        self.rejected_nodes.add(node_id)
+                        self.process_error = ValueError(
+                            f"노드 수가 capacity({self.capacity})를 넘어 {node_id} 노드의 프레임을 처리하지 않습니다 "
+                            f"(거부된 노드 {len(self.rejected_nodes)}개, capacity를 늘려 다시 시작하세요)")
+                        self.process_errors += 1
+                    rows.append(-1)
+                    continue
+                row = self.node_index[node_id] = len(self.node_index)
+            rows.append(row)
+        return np.asarray(rows, dtype=np.intp)
+
+    @staticmethod
+    def _select(batch, keep):
+        """프레임 묶음에서 keep 위치의 노드만 남깁니다."""
+        selected = {key: np.asarray(value)[keep] for key, value in batch.items() if key != "node_ids"}
+        selected["node_ids"] = [batch["node_ids"][i] for i in keep]
+        return selected
+
+    def _model(self):
+        try:
+            model = self.registry.get()
+            self.model_error = self.registry.last_error  # 핫 리로드 실패 (기존 모델 유지 중)
+            return model
+        except ModelLoadError as e:
+            self.model_error = e
+            return None
+
+    def process(self, batch):
+        """한 틱에 들어온 모든 노드의 프레임을 한 번에 추론하고 상태 스냅샷을 갱신합니다."""
+        now = time.time()
+        rows = self._rows(batch["node_ids"])
+        if (rows < 0).any():
+            batch = self._select(batch, np.flatnonzero(rows >= 0))
+            rows = rows[rows >= 0]
+        node_ids = list(batch["node_ids"])
+        pixels = np.asarray(batch["pixels"])
+        impacts = np.asarray(batch["impact"], dtype=float)
+
+        avg_temp = pixels.max(axis=(1, 2))
+        is_detected = avg_temp > DETECT_TEMP
+        # 시간 창 특징은 건너뛰는 프레임까지 모두 반영해야 하므로 항상 갱신 (벡터 연산 한 번)
+        self.buffers.update(impacts, is_detected, rows)
+        peak_impact, loitering_score = self.buffers.get_features(rows)
+        stay_time_calc = loitering_score * 30
+
+        todo = np.ones(len(node_ids), dtype=bool)
+        if self.detector is not None:
+            changed = self.detector.update(rows, avg_temp, pixels.mean(axis=(1, 2)), impacts, is_detected)
+            # 직전 상태가 SAFE가 아니거나 시연 고정 중인 노드는 변화가 없어도 매번 처리
+            active = np.array([self._is_active(self.snapshot, node_id, now) for node_id in node_ids], dtype=bool)
+            todo = changed | active
+        idx = np.flatnonzero(todo)
+        self.skipped_frames += len(node_ids) - len(idx)
+
+        settled = np.full(len(node_ids), -1, dtype=np.intp)
+        audit = np.zeros(len(node_ids), dtype=bool)
+        if self.cascade is not None and len(idx):
+            settled[idx], audit[idx] = self.cascade.settle(
+                rows[idx], avg_temp[idx], peak_impact[idx], stay_time_calc[idx], impacts[idx])
+        use_model = np.zeros(len(node_ids), dtype=bool)
+        use_model[idx] = (settled[idx] < 0) | audit[idx]
+        predict_idx = np.flatnonzero(use_model)
+
+        model = self._model()
+        if model is not None and len(predict_idx):
+            with self.metrics.timer("predict"):
+                self.batcher.model = model
+                features = np.column_stack([avg_temp, peak_impact, stay_time_calc])[predict_idx]
+                self.batcher.submit_many([node_ids[i] for i in predict_idx], features, now)
+                self.batcher.flush(now)
+
+        snapshot = dict(self.snapshot)
+        time_text = datetime.now().strftime("%H:%M:%S")
+        for i in idx:
+            node_id = node_ids[i]
+            thresholds = self.cascade.node_thresholds(rows[i]) if self.cascade is not None else None
+            locked_event, lock_until = self.locks.get(node_id, (None, 0))
+            if now >= lock_until:
+                locked_event = None
+
+            prediction, confidence = 0, DEFAULT_CONFIDENCE
+            result = self.batcher.result(node_id) if model is not None and use_model[i] else None
+            if result is not None:
+                # 모델이 계산한 실제 확률 (classes_ 순서로 매핑된 예측 클래스의 확률, 배치 예측기가 계산)
+                prediction, confidence = int(result["label"]), result["confidence"]
+                if np.isnan(confidence):
+                    confidence = DEFAULT_CONFIDENCE  # predict_proba가 없는 모델
+                if prediction in [2, 3] and impacts[i] < (thresholds or DEFAULT_THRESHOLDS)["suppress_below"]:
+                    prediction, confidence = 0, DEFAULT_CONFIDENCE  # 약한 충격: 정상으로 보정
+
+            if settled[i] >= 0:
+                if result is not None:
+                    # 감사: 모델 경로를 거쳤을 때의 최종 결과와 규칙 판정 비교
+                    model_final = apply_rules(prediction, confidence, impacts[i], locked_event, thresholds)[0]
+                    rule_final = apply_rules(settled[i], DEFAULT_CONFIDENCE, impacts[i], locked_event, thresholds)[0]
+                    self.cascade.record_audit(model_final == rule_final)
+                prediction, confidence = int(settled[i]), DEFAULT_CONFIDENCE
+            prediction, confidence, impact = apply_rules(prediction, confidence, impacts[i], locked_event, thresholds)
+
+            self.frame_seq += 1
+            status = STATUS_LABELS[prediction]
+            state = {
+                "seq": self.frame_seq,
+                "node": node_id,
+                "pixels": pixels[i],
+                "impact": impact,
+                "avg_temp": avg_temp[i],
+                "vibration_rms": float(batch["rms"][i]) if "rms" in batch else None,
+                "is_detected": bool(is_detected[i]),
+                "prediction": prediction,
+                "confidence": confidence,
+                "status": status,
+                "status_delta": risk_level(prediction),
+                "time": time_text,
+                "acquired_at": float(batch["timestamp"][i]),
+                "processed_at": now,
+            }
+            snapshot[node_id] = state
+            self._log_event(state)
+
+        if self.rate is not None:
+            self.period = self.rate.update(any(self._is_active(snapshot, node_id, now) for node_id in node_ids))
+
+        # 바뀐 노드가 없으면 heartbeat 간격으로만 발행 (세션은 같은 상태 객체를 받고 다시 그리지 않음)
+        if not len(idx) and now - self.published_at < self.heartbeat:
+            return
+        self.published_at = now
+        # 스냅샷 교체 후 대기 중인 모든 세션을 깨움
+        with self.changed:
+            self.snapshot = snapshot
+            self.version += 1
+            self.changed.notify_all()
+
+    def _is_active(self, snapshot, node_id, now):
+        state = snapshot.get(node_id)
+        if state is not None and (state["is_detected"] or state["status_delta"] != "SAFE"):
+            return True
+        return now < self.locks.get(node_id, (None, 0))[1]
+
+    def _log_event(self, state):
+        # 상태가 변했고, 정상이 아니라면 이벤트 기록
+        node_id, status = state["node"], state["status"]
+        if status != STATUS_LABELS[0] and status != self.last_status.get(node_id):
+            self.store.append(
+                node_id, state["time"], status, state["status_delta"],
+                f"T: {state['avg_temp']:.1f}°C / I: {int(state['impact'])}",
+                ts=state["processed_at"],
+            )
+            if self.alerts is not None and state["status_delta"] == "DANGER":
+                self.alerts.enqueue(node_id, status, "DANGER", {
+                    "time": state["time"], "avg_temp": round(float(state["avg_temp"]), 1),
+                    "impact": int(state["impact"]), "confidence": round(float(state["confidence"]), 1),
+                })
+        self.last_status[node_id] = status
+
+    # ---------------------------------------------------------
+    # UI에서 호출하는 API
+    # ---------------------------------------------------------
+    def subscribe(self):
+        """세션별 구독을 만듭니다. 모든 세션이 같은 스냅샷과 이벤트를 봅니다."""
+        subscription = Subscription(self)
+        self.subscribers.add(subscription)
+        return subscription
+
+    def latest(self, node_id):
+        """가장 최근에 처리된 노드 상태를 반환합니다 (없으면 None)."""
+        self.last_poll = time.time()
+        return self.snapshot.get(node_id)
+
+    def events_since(self, seq):
+        return self.store.since(seq)
+
+    def set_thresholds(self, node_id, **overrides):
+        """노드별 규칙 임계값을 바꿉니다 (cascade.DEFAULT_THRESHOLDS의 키)."""
+        if self.cascade is None:
+            raise RuntimeError("rule_cascade=True로 만든 파이프라인에서만 노드별 임계값을 쓸 수 있습니다")
+        row = self._rows([node_id])[0]
+        if row < 0:
+            raise ValueError(f"노드 수가 capacity({self.capacity})를 넘어 {node_id} 노드를 등록할 수 없습니다")
+        self.cascade.configure(row, **overrides)
+
+    def trigger_demo(self, node_id, mode):
+        """시나리오 테스트: 다음 프레임을 위험 데이터로 만들고 3초간 상태를 고정합니다."""
+        if hasattr(self.source, "trigger"):
+            self.source.trigger(node_id, mode)
+        self.locks[node_id] = (mode, time.time() + DEMO_LOCK_SECONDS)
+        if self.rate is not None:
+            self.period = self.rate.update(True)
+        self._wake.set()  # 유휴 주기로 대기 중이면 바로 다음 프레임을 읽음
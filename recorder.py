@@ -0,0 +1,199 @@
+import os
+import struct
+import time
+from datetime import datetime
+import numpy as np
+
+MAGIC = b"SWGREC01"
+HEADER = struct.Struct("<8sHH52x")  # magic, rows, cols, 예약 -> 64바이트
+NODE_ID_BYTES = 16
+UNLABELED = -1
+
+
+def record_dtype(shape=(8, 8)):
+    """고정 길이 레코드 형식: 시각, 노드 ID, 충격량, 라벨, 열화상 픽셀"""
+    return np.dtype([
+        ("timestamp", "<f8"),
+        ("node", f"S{NODE_ID_BYTES}"),
+        ("impact", "<f4"),
+        ("label", "i1"),
+        ("pixels", "<f4", shape),
+    ])
+
+
+def read_header(path):
+    with open(path, "rb") as f:
+        magic, rows, cols = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"{path}: 센서 녹화 파일이 아닙니다")
+    return rows, cols
+
+
+class FrameRecorder:
+    """프레임 묶음을 고정 길이 바이너리 레코드로 파일 끝에 이어 씁니다 (memmap으로 바로 읽기 가능)."""
+    def __init__(self, path, shape=(8, 8)):
+        self.path = path
+        self.shape = tuple(shape)
+        self.dtype = record_dtype(self.shape)
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            if read_header(path) != self.shape:
+                raise ValueError(f"{path}: 격자 크기가 다른 녹화 파일입니다")
+        else:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(HEADER.pack(MAGIC, *self.shape))
+        self.file = open(path, "ab")
+        self.records = 0
+
+    def append(self, node_ids, pixels, impact, timestamp, labels=None):
+        n = len(node_ids)
+        rec = np.empty(n, dtype=self.dtype)
+        rec["timestamp"] = timestamp
+        rec["node"] = [str(node_id).encode()[:NODE_ID_BYTES] for node_id in node_ids]
+        rec["impact"] = impact
+        rec["label"] = UNLABELED if labels is None else labels
+        rec["pixels"] = pixels
+        self.file.write(rec.tobytes())
+        self.records += n
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def open_recording(path):
+    """녹화 파일 전체를 읽기 전용 memmap 레코드 배열로 엽니다 (복사 없음)."""
+    shape = read_header(path)
+    dtype = record_dtype(shape)
+    n = (os.path.getsize(path) - HEADER.size) // dtype.itemsize
+    if n == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=HEADER.size, shape=(n,))
+
+
+def set_labels(path, label, since=None, until=None, node_id=None):
+    """녹화 파일에서 시각 구간 [since, until)과 노드가 맞는 레코드의 라벨을 바로 고쳐 씁니다. 바꾼 건수를 반환합니다."""
+    shape = read_header(path)
+    dtype = record_dtype(shape)
+    n = (os.path.getsize(path) - HEADER.size) // dtype.itemsize
+    if n == 0:
+        return 0
+    records = np.memmap(path, dtype=dtype, mode="r+", offset=HEADER.size, shape=(n,))
+    mask = np.ones(n, dtype=bool)
+    if since is not None:
+        mask &= records["timestamp"] >= since
+    if until is not None:
+        mask &= records["timestamp"] < until
+    if node_id is not None:
+        mask &= records["node"] == str(node_id).encode()[:NODE_ID_BYTES]
+    records["label"][mask] = label
+    records.flush()
+    return int(mask.sum())
+
+
+class ReplaySource:
+    """녹화 파일을 SimulatedSource 대신 파이프라인에 공급합니다.
+
+    speed=1.0이면 실시간, N이면 N배속, None이면 대기 없이 최대 속도로 재생합니다.
+    같은 시각에 기록된 레코드를 한 묶음(틱)으로 돌려주며, 배열은 파일 위의 view입니다.
+    """
+    drop_frames = False  # 회귀 검증용이므로 파이프라인이 프레임을 버리지 않도록 함
+    paced = True  # 재생 속도는 speed로 정하므로 파이프라인의 획득 주기를 기다리지 않음
+
+    def __init__(self, path, speed=1.0, loop=False):
+        self.records = open_recording(path)
+        self.speed = speed
+        self.loop = loop
+        ts = self.records["timestamp"]
+        # 시각이 바뀌는 지점마다 틱 경계
+        self.bounds = np.concatenate([[0], np.flatnonzero(np.diff(ts) != 0) + 1, [len(ts)]]).astype(np.intp)
+        self.tick = 0
+        self.started_at = None
+        self.finished = len(ts) == 0
+        self.node_ids = [n.decode() for n in np.unique(self.records["node"])]  # 녹화에 등장하는 모든 노드
+        self.shape = tuple(self.records.dtype["pixels"].shape)
+
+    def __len__(self):
+        return len(self.bounds) - 1
+
+    def _wait(self, ts):
+        if self.speed is None:
+            return
+        if self.started_at is None:
+            self.started_at = time.monotonic()
+        target = (ts - self.records["timestamp"][0]) / self.speed
+        delay = target - (time.monotonic() - self.started_at)
+        if delay > 0:
+            time.sleep(delay)
+
+    def read(self):
+        if self.tick >= len(self):
+            if not self.loop or len(self) == 0:
+                self.finished = True
+                return {"node_ids": [], "pixels": self.records["pixels"][:0], "impact": self.records["impact"][:0],
+                        "timestamp": self.records["timestamp"][:0]}
+            self.tick = 0
+            self.started_at = None
+        start, end = self.bounds[self.tick], self.bounds[self.tick + 1]
+        self.tick += 1
+        chunk = self.records[start:end]
+        self._wait(chunk["timestamp"][0])
+        return {
+            "node_ids": [n.decode() for n in chunk["node"]],
+            "pixels": chunk["pixels"],
+            "impact": chunk["impact"],
+            "timestamp": chunk["timestamp"],
+            "labels": chunk["label"],
+        }
+
+    def frames(self, node_id=None):
+        """get_simulated_data()와 같은 형식으로 레코드를 하나씩 돌려줍니다."""
+        while True:
+            batch = self.read()
+            if not batch["node_ids"]:
+                return
+            for i, nid in enumerate(batch["node_ids"]):
+                if node_id is not None and nid != node_id:
+                    continue
+                pixels = batch["pixels"][i]
+                yield {
+                    "pixels": pixels,
+                    "is_detected": True if pixels.max() > 30 else False,
+                    "impact": float(batch["impact"][i]),
+                    "time": datetime.fromtimestamp(batch["timestamp"][i]).strftime("%H:%M:%S"),
+                }
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pipeline import SimulatedSource
+
+    n_nodes, ticks = 200, 500
+    source = SimulatedSource([f"NODE-{i:04d}" for i in range(n_nodes)], seed=0)
+    path = os.path.join(tempfile.mkdtemp(), "bench.swgrec")
+    recorder = FrameRecorder(path)
+
+    started = time.perf_counter()
+    for t in range(ticks):
+        batch = source.read()
+        recorder.append(batch["node_ids"], batch["pixels"], batch["impact"], np.full(n_nodes, 1000.0 + t * 0.4))
+    recorder.close()
+    write_s = time.perf_counter() - started
+
+    size = os.path.getsize(path)
+    replay = ReplaySource(path, speed=None)
+    started = time.perf_counter()
+    frames = 0
+    while True:
+        batch = replay.read()
+        if not batch["node_ids"]:
+            break
+        frames += len(batch["node_ids"])
+    read_s = time.perf_counter() - started
+
+    print(f"💾 기록: {n_nodes * ticks}프레임 {write_s:.2f}s ({n_nodes * ticks / write_s:,.0f} frames/s), "
+          f"{size / 1e6:.1f} MB ({record_dtype().itemsize} B/frame)")
+    print(f"⏩ 최대 속도 재생: {frames}프레임 {read_s:.2f}s ({frames / read_s:,.0f} frames/s, "
+          f"원래 {ticks * 0.4:.0f}s 분량 -> {ticks * 0.4 / read_s:,.0f}배속)")
@@ -0,0 +1,204 @@
+import struct
+import zlib
+import numpy as np
+
+
+def colormap_lut(name="magma", size=256):
+    """matplotlib 컬러맵을 (size, 3) uint8 룩업 테이블로 한 번만 계산해 둡니다."""
+    from matplotlib import colormaps
+
+    return (colormaps[name](np.linspace(0, 1, size))[:, :3] * 255).round().astype(np.uint8)
+
+
+def encode_png(rgb, level=1):
+    """(H, W, 3) uint8 배열을 PNG 바이트로 인코딩합니다 (zlib만 사용)."""
+    h, w, _ = rgb.shape
+    raw = np.empty((h, w * 3 + 1), dtype=np.uint8)
+    raw[:, 0] = 0  # 필터 없음
+    raw[:, 1:] = rgb.reshape(h, w * 3)
+
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    return b"".join([
+        b"\x89PNG\r\n\x1a\n",
+        chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 8, 2, 0, 0, 0)),
+        chunk(b"IDAT", zlib.compress(raw.tobytes(), level)),
+        chunk(b"IEND", b""),
+    ])
+
+
+class LutRenderer:
+    """matplotlib 없이 컬러맵 룩업 + PNG 인코딩으로 열화상을 그리는 빠른 경로입니다."""
+    def __init__(self, cmap="magma", levels=256):
+        self.levels = levels
+        self.lut = colormap_lut(cmap, levels)
+
+    def colorize(self, normalized):
+        """0~1로 정규화된 (H, W) 또는 (N, H, W) 배열을 RGB uint8로 변환합니다."""
+        idx = (np.clip(normalized, 0, 1) * (self.levels - 1) + 0.5).astype(np.intp)
+        return self.lut[idx]
+
+    def render(self, normalized):
+        return encode_png(self.colorize(normalized))
+
+
+class FigureRenderer:
+    """그림과 아티스트를 한 번만 만들고 매 프레임 데이터만 바꿔 그리는 matplotlib 렌더러입니다.
+
+    열화상 모드(AxesImage)와 아이콘 모드(격자/산점도/텍스트)를 같은 좌표계에 두고
+    모드에 따라 보이기만 전환합니다.
+    """
+    def __init__(self, shape=(8, 8), cmap="magma", figsize=(8, 6.5), max_targets=16):
+        # pyplot의 전역 Figure 목록에 등록하지 않아야 재실행마다 Figure가 쌓이지 않음
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        from matplotlib.patches import Rectangle
+
+        self.shape = shape
+        self.max_targets = max_targets
+        rows, cols = shape
+
+        self.fig = Figure(figsize=figsize)
+        FigureCanvasAgg(self.fig)
+        self.fig.patch.set_facecolor('#000000')
+        self.fig.subplots_adjust(0, 0, 1, 1)
+        self.ax = ax = self.fig.add_subplot()
+        ax.set_xlim(-0.5, cols - 0.5); ax.set_ylim(rows - 0.5, -0.5); ax.axis('off')
+
+        # 열화상 모드
+        self.image = ax.imshow(np.zeros(shape), cmap=cmap, aspect='auto', vmin=0, vmax=1,
+                               extent=(-0.5, cols - 0.5, rows - 0.5, -0.5))
+
+        # 아이콘 모드: 배경/격자는 고정, 대상 마커와 텍스트는 미리 만들어 재사용
+        self.background = ax.add_patch(Rectangle((-0.5, -0.5), cols, rows, color='#111111', zorder=0))
+        self.grid = [ax.axhline(y - 0.5, color='white', lw=0.5, alpha=0.1) for y in range(rows + 1)]
+        self.grid += [ax.axvline(x - 0.5, color='white', lw=0.5, alpha=0.1) for x in range(cols + 1)]
+
+        marker_scale = (8 / max(rows, cols)) ** 2  # 8x8 기준 마커 크기
+        empty = np.empty((0, 2))
+        self.halos = [
+            ax.scatter(empty[:, 0], empty[:, 1], s=8000 * marker_scale, alpha=0.1, marker='o'),
+            ax.scatter(empty[:, 0], empty[:, 1], s=4000 * marker_scale, alpha=0.3, marker='o'),
+        ]
+        self.core = ax.scatter(empty[:, 0], empty[:, 1], s=1200 * marker_scale, marker='o', edgecolors='white', linewidth=3)
+        self.chars = []
+        self.labels = []
+        for _ in range(max_targets):
+            self.chars.append(ax.text(0, 0, "", color='white', fontsize=28, ha='center', va='center',
+                                      fontweight='black', visible=False))
+            self.labels.append(ax.text(0, 0, "", fontsize=10, ha='center', fontweight='bold', visible=False,
+                                       bbox=dict(facecolor='black', alpha=0.7, boxstyle='round,pad=0.3')))
+        self.icon_artists = [self.background] + self.grid + self.halos + [self.core]
+
+    def _set_mode(self, icon_mode):
+        self.image.set_visible(not icon_mode)
+        for artist in self.icon_artists:
+            artist.set_visible(icon_mode)
+        if not icon_mode:
+            for text in self.chars + self.labels:
+                text.set_visible(False)
+
+    def render_heatmap(self, processed):
+        """업샘플링된 0~1 열화상을 그립니다."""
+        self._set_mode(False)
+        self.image.set_data(processed)
+        return self.fig
+
+    def render_icons(self, positions, display_char="?", main_color="#FFFFFF", label_text=""):
+        """positions: 대상별 평활화 좌표 (M, 2)[row, col]"""
+        self._set_mode(True)
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)[:self.max_targets]
+        offsets = positions[:, ::-1]  # (x=col, y=row)
+        for artist in self.halos + [self.core]:
+            artist.set_offsets(offsets)
+            artist.set_facecolor(main_color)
+
+        for i, (char, label) in enumerate(zip(self.chars, self.labels)):
+            if i < len(positions):
+                r, c = positions[i]
+                char.set_position((c, r)); char.set_text(display_char); char.set_visible(True)
+                label.set_position((c, r + 1.2)); label.set_text(f"[{label_text}]"); label.set_color(main_color)
+                label.get_bbox_patch().set_edgecolor(main_color)
+                label.set_visible(True)
+            else:
+                char.set_visible(False)
+                label.set_visible(False)
+        return self.fig
+
+    def to_png(self):
+        """Agg 캔버스를 다시 그린 뒤 버퍼를 바로 PNG로 인코딩합니다 (savefig 생략)."""
+        self.fig.canvas.draw()
+        return encode_png(np.asarray(self.fig.canvas.buffer_rgba())[..., :3])
+
+
+if __name__ == "__main__":
+    import io
+    import time
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from scipy.ndimage import zoom
+
+    rng = np.random.default_rng(0)
+    frames = [zoom(np.clip((rng.uniform(22, 36, (8, 8)) - 20) / 20, 0, 1), 8, order=3) for _ in range(30)]
+
+    def legacy(processed):
+        # 기존 main.py 방식: 매 프레임 새 Figure 생성 후 PNG로 변환
+        fig, ax = plt.subplots(figsize=(8, 6.5))
+        fig.patch.set_facecolor('#000000')
+        ax.imshow(processed, cmap='magma', aspect='auto', vmin=0, vmax=1)
+        ax.axis('off')
+        plt.subplots_adjust(0, 0, 1, 1)
+        buf = io.BytesIO()
+        fig.savefig(buf, format="png")
+        plt.close(fig)
+
+    def legacy_icons(processed):
+        fig, ax = plt.subplots(figsize=(8, 6.5))
+        fig.patch.set_facecolor('#000000')
+        ax.set_facecolor('#111111')
+        for x in range(9):
+            ax.axhline(x-0.5, color='white', lw=0.5, alpha=0.1)
+            ax.axvline(x-0.5, color='white', lw=0.5, alpha=0.1)
+        ax.scatter(4, 3, s=8000, c="#00F2FF", alpha=0.1, marker='o')
+        ax.scatter(4, 3, s=4000, c="#00F2FF", alpha=0.3, marker='o')
+        ax.scatter(4, 3, s=1200, c="#00F2FF", marker='o', edgecolors='white', linewidth=3)
+        ax.text(4, 3, "P", color='white', fontsize=28, ha='center', va='center', fontweight='black')
+        ax.text(4, 4.2, "[PERSON]", color="#00F2FF", fontsize=10, ha='center', fontweight='bold',
+                bbox=dict(facecolor='black', alpha=0.7, edgecolor="#00F2FF", boxstyle='round,pad=0.3'))
+        ax.set_xlim(-0.5, 7.5); ax.set_ylim(7.5, -0.5); ax.axis('off')
+        plt.subplots_adjust(0, 0, 1, 1)
+        buf = io.BytesIO()
+        fig.savefig(buf, format="png")
+        plt.close(fig)
+
+    figure = FigureRenderer()
+
+    def persistent(processed):
+        figure.render_heatmap(processed)
+        figure.to_png()
+
+    def persistent_icons(processed):
+        figure.render_icons([[3, 4]], "P", "#00F2FF", "PERSON")
+        figure.to_png()
+
+    lut = LutRenderer()
+
+    def fast(processed):
+        lut.render(processed)
+
+    benchmarks = [
+        ("열화상 / 기존 plt.subplots", legacy),
+        ("열화상 / 재사용 Figure", persistent),
+        ("열화상 / LUT + PNG", fast),
+        ("아이콘 / 기존 plt.subplots", legacy_icons),
+        ("아이콘 / 재사용 Figure", persistent_icons),
+    ]
+    for name, fn in benchmarks:
+        fn(frames[0])
+        started = time.perf_counter()
+        for processed in frames:
+            fn(processed)
+        fps = len(frames) / (time.perf_counter() - started)
+        print(f"🖼️ {name}: {fps:.1f} FPS")
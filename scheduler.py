@@ -0,0 +1,54 @@
+import numpy as np
+
+
+class ChangeDetector:
+    """노드별로 마지막으로 처리한 프레임과 비교해 거의 달라지지 않은 프레임을 골라냅니다.
+
+    비교 기준은 최고 온도, 평균 온도, 충격량, 감지 여부입니다 (분류 모델 입력과 같은 요약값).
+    기준 프레임은 변화가 감지된 노드만 갱신하므로 느린 변화도 누적되면 결국 잡힙니다.
+    """
+    def __init__(self, capacity, temp_threshold=0.5, impact_threshold=300.0):
+        self.temp_threshold = temp_threshold
+        self.impact_threshold = impact_threshold
+        self.max_temp = np.zeros(capacity)
+        self.mean_temp = np.zeros(capacity)
+        self.impact = np.zeros(capacity)
+        self.detected = np.zeros(capacity, dtype=bool)
+        self.seen = np.zeros(capacity, dtype=bool)
+
+    def update(self, rows, max_temp, mean_temp, impacts, is_detected):
+        """rows 노드 중 변화가 있는 노드의 bool 마스크를 반환하고 기준 프레임을 갱신합니다."""
+        changed = (
+            ~self.seen[rows]
+            | (is_detected != self.detected[rows])
+            | (np.abs(max_temp - self.max_temp[rows]) >= self.temp_threshold)
+            | (np.abs(mean_temp - self.mean_temp[rows]) >= self.temp_threshold)
+            | (np.abs(impacts - self.impact[rows]) >= self.impact_threshold)
+        )
+        r = rows[changed]
+        self.max_temp[r] = max_temp[changed]
+        self.mean_temp[r] = mean_temp[changed]
+        self.impact[r] = impacts[changed]
+        self.detected[r] = is_detected[changed]
+        self.seen[r] = True
+        return changed
+
+
+class AdaptiveRate:
+    """장면이 조용하면 획득 주기를 두 배씩 늘리고, 감지나 CAUTION/DANGER가 생기면 즉시 기본 주기로 되돌립니다."""
+    def __init__(self, active_period=0.4, idle_period=1.6, ramp_after=5):
+        self.active_period = active_period
+        self.idle_period = idle_period
+        self.ramp_after = ramp_after  # 조용한 틱이 이만큼 이어져야 느려지기 시작
+        self.period = active_period
+        self.quiet_ticks = 0
+
+    def update(self, active):
+        if active:
+            self.quiet_ticks = 0
+            self.period = self.active_period
+        else:
+            self.quiet_ticks += 1
+            if self.quiet_ticks >= self.ramp_after:
+                self.period = min(self.idle_period, self.period * 2)
+        return self.period
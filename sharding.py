@@ -0,0 +1,422 @@
+"""노드를 여러 프로세스에 나눠 처리하는 샤딩 파이프라인 (멀티코어)
+
+    [조정자] --공유 메모리 링 (프레임)--> [워커 k: 담당 노드의 DetectionPipeline] --공유 메모리 링 (상태)--> [조정자]
+                                                                        \\--이벤트 큐 (드묾)--> [조정자 EventStore]
+
+노드 i는 워커 i % n_workers가 맡고, 워커마다 자기 노드의 시간 창 버퍼, 변화 감지, 규칙 단계, 모델을 가집니다.
+프레임과 상태는 pickle 없이 공유 메모리에 복사만 하고, 드물게 생기는 이벤트만 multiprocessing 큐로 보냅니다.
+조정자는 모든 워커의 상태와 이벤트를 합쳐 DetectionPipeline과 같은 latest() / events_since()를 제공하고,
+ShardedDetectionPipeline은 이를 DetectionPipeline과 같은 start() / subscribe() / 스냅샷 인터페이스로 감쌉니다.
+main.py(노드 하나)는 쓰지 않으며, daemon.py --shards N으로 선택할 수 있습니다 (기본은 단일 프로세스).
+
+    python sharding.py --nodes 2000 --workers 1 2 4    # 워커 수별 처리량 벤치마크
+    python daemon.py --nodes 2000 --shards 4           # 샤딩 조정자로 데몬 실행
+
+워커 수에 따른 선형 확장은 아직 멀티코어 장비에서 확인하지 않았습니다. 코어가 하나인 환경에서는
+프레임/상태 복사와 프로세스 전환 비용 때문에 워커 1개도 단일 프로세스보다 느리므로, 실제 코어 수에서
+벤치마크로 이득을 확인한 뒤에만 --shards를 쓰세요.
+
+워커는 spawn 방식으로 시작하므로, ShardedPipeline을 쓰는 스크립트는 if __name__ == "__main__": 안에서 start()해야 합니다.
+"""
+import argparse
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from multiprocessing import shared_memory
+import numpy as np
+
+from event_store import EventStore
+from forest import load_model
+from model_registry import DEFAULT_MODEL_PATHS, ModelRegistry
+from pipeline import STATUS_LABELS, DetectionPipeline, SimulatedSource, risk_level
+
+RISK_CODES = {"SAFE": 0, "CAUTION": 1, "DANGER": 2}
+
+
+def frame_dtype(shape=(8, 8)):
+    """조정자 -> 워커: 워커 안의 노드 번호, 획득 시각, 충격량, 열화상 픽셀"""
+    return np.dtype([("row", "<i4"), ("timestamp", "<f8"), ("impact", "<f4"), ("pixels", "<f4", shape)])
+
+
+# 워커 -> 조정자: 노드 상태 (DetectionPipeline 스냅샷의 숫자 필드)
+RESULT_DTYPE = np.dtype([
+    ("row", "<i4"), ("seq", "<i8"), ("prediction", "i1"), ("risk", "u1"), ("detected", "?"),
+    ("confidence", "<f4"), ("avg_temp", "<f4"), ("impact", "<f4"), ("acquired_at", "<f8"), ("processed_at", "<f8"),
+])
+
+
+class ShmRing:
+    """단일 생산자 / 단일 소비자 공유 메모리 링 버퍼입니다.
+
+    슬롯마다 레코드 최대 capacity개를 담고, 빈 슬롯 / 찬 슬롯 수를 세마포어로 셉니다.
+    put()은 레코드 배열을 슬롯에 복사하고, get()은 슬롯 내용을 복사해 돌려준 뒤 바로 슬롯을 비웁니다.
+    다른 프로세스로 넘기면 (Process 인자) 같은 공유 메모리에 다시 연결됩니다.
+    """
+    def __init__(self, slots, capacity, dtype, ctx=mp):
+        self.slots = slots
+        self.capacity = capacity
+        self.dtype = np.dtype(dtype)
+        size = slots * 8 + slots * capacity * self.dtype.itemsize
+        self.shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self.free = ctx.Semaphore(slots)
+        self.filled = ctx.Semaphore(0)
+        self._attach()
+
+    def _attach(self):
+        self.counts = np.ndarray((self.slots,), dtype=np.int64, buffer=self.shm.buf)
+        self.records = np.ndarray((self.slots, self.capacity), dtype=self.dtype, buffer=self.shm.buf,
+                                  offset=self.slots * 8)
+        self.head = 0  # 생산자 쪽 위치
+        self.tail = 0  # 소비자 쪽 위치
+
+    def __getstate__(self):
+        return {"name": self.shm.name, "slots": self.slots, "capacity": self.capacity, "dtype": self.dtype,
+                "free": self.free, "filled": self.filled}
+
+    def __setstate__(self, state):
+        self.slots, self.capacity, self.dtype = state["slots"], state["capacity"], state["dtype"]
+        self.free, self.filled = state["free"], state["filled"]
+        self.shm = shared_memory.SharedMemory(name=state["name"])
+        self._attach()
+
+    def put(self, records, timeout=0):
+        """빈 슬롯이 없으면 timeout초까지 기다리고 (0: 기다리지 않음, None: 무한) False를 반환합니다."""
+        if timeout == 0:
+            acquired = self.free.acquire(block=False)
+        else:
+            acquired = self.free.acquire(timeout=timeout)
+        if not acquired:
+            return False
+        slot = self.head % self.slots
+        self.records[slot, :len(records)] = records
+        self.counts[slot] = len(records)
+        self.head += 1
+        self.filled.release()
+        return True
+
+    def get(self, timeout=None):
+        if not self.filled.acquire(timeout=timeout):
+            return None
+        slot = self.tail % self.slots
+        records = self.records[slot, :self.counts[slot]].copy()
+        self.tail += 1
+        self.free.release()
+        return records
+
+    def close(self):
+        self.counts = self.records = None  # 공유 메모리를 닫기 전에 view 해제
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+def _worker(node_ids, model_path, frames, results, events, stop, pipeline_kwargs):
+    """워커 프로세스: 담당 노드의 프레임을 받아 DetectionPipeline.process()로 처리합니다."""
+    registry = ModelRegistry(model_path, loader=load_model)
+    pipeline = DetectionPipeline(None, registry, capacity=max(len(node_ids), 1), **pipeline_kwargs)
+    out = np.empty(len(node_ids), dtype=RESULT_DTYPE)
+    event_seq = 0
+    try:
+        while not stop.is_set():
+            batch = frames.get(timeout=0.1)
+            if batch is None:
+                continue
+            rows = batch["row"]
+            names = [node_ids[r] for r in rows]
+            pipeline.process({"node_ids": names, "pixels": batch["pixels"], "impact": batch["impact"],
+                              "timestamp": batch["timestamp"]})
+
+            n = 0
+            for row, name in zip(rows.tolist(), names):
+                state = pipeline.snapshot.get(name)
+                if state is None:
+                    continue
+                out[n] = (row, state["seq"], state["prediction"], RISK_CODES[state["status_delta"]],
+                          state["is_detected"], state["confidence"], state["avg_temp"], state["impact"],
+                          state["acquired_at"], state["processed_at"])
+                n += 1
+            while not results.put(out[:n], timeout=0.1):
+                if stop.is_set():
+                    return
+
+            new_events = pipeline.events_since(event_seq)
+            if new_events:
+                event_seq = new_events[-1]["seq"]
+                events.put(new_events)
+    finally:
+        frames.close()
+        results.close()
+
+
+class ShardedPipeline:
+    """노드를 n_workers개 프로세스에 나눠 처리하고 결과를 합치는 조정자입니다."""
+    def __init__(self, node_ids, model_path, n_workers=None, shape=(8, 8), ring_slots=4, store=None,
+                 pipeline_kwargs=None):
+        self.node_ids = list(node_ids)
+        self.index = {node_id: i for i, node_id in enumerate(self.node_ids)}
+        self.model_path = model_path
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.shape = tuple(shape)
+        self.ring_slots = ring_slots
+        self.store = store if store is not None else EventStore(":memory:")
+        self.pipeline_kwargs = pipeline_kwargs or {}
+
+        n = len(self.node_ids)
+        self.shard_of = np.arange(n) % self.n_workers
+        self.local_row = np.arange(n) // self.n_workers
+        self.members = [np.flatnonzero(self.shard_of == k) for k in range(self.n_workers)]
+
+        # 합쳐진 최신 상태 (노드 순서)
+        self.state = np.zeros(n, dtype=RESULT_DTYPE)
+        self.state["seq"] = -1
+        self.pixels = np.zeros((n,) + self.shape, dtype=np.float32)
+        self.completed = 0  # 워커가 처리를 끝낸 노드 프레임 수
+        self.dropped_frames = 0
+        self.workers = []
+
+    def start(self):
+        ctx = mp.get_context("spawn")  # 부모(Streamlit 등)의 스레드 상태를 물려받지 않음
+        self._stop = ctx.Event()
+        self.events = ctx.Queue()
+        self.frame_rings, self.result_rings = [], []
+        dtype = frame_dtype(self.shape)
+        for k, members in enumerate(self.members):
+            frames = ShmRing(self.ring_slots, max(len(members), 1), dtype, ctx)
+            results = ShmRing(self.ring_slots * 2, max(len(members), 1), RESULT_DTYPE, ctx)
+            names = [self.node_ids[i] for i in members]
+            process = ctx.Process(target=_worker, name=f"swg-shard-{k}", daemon=True,
+                                  args=(names, self.model_path, frames, results, self.events, self._stop,
+                                        self.pipeline_kwargs))
+            process.start()
+            self.frame_rings.append(frames)
+            self.result_rings.append(results)
+            self.workers.append(process)
+        return self
+
+    def submit(self, batch, timeout=0):
+        """한 틱의 프레임 묶음을 담당 워커들의 링에 넣습니다.
+
+        워커가 밀려 링이 가득 차면 timeout초까지 기다리고, 그래도 안 되면 해당 샤드 몫을 버립니다
+        (DetectionPipeline과 같은 최신 프레임 우선 정책). timeout=None이면 버리지 않고 기다립니다.
+        기다리는 동안 결과 링을 collect()로 비워 주므로, 호출하는 쪽이 collect()를 부르지 않아도
+        (워커가 결과 링이 차서 멈춤 -> 프레임 링도 참) 교착되지 않습니다.
+        """
+        nodes = batch.get("nodes")
+        if nodes is None:
+            nodes = np.array([self.index[node_id] for node_id in batch["node_ids"]], dtype=np.intp)
+        shard = self.shard_of[nodes]
+        order = np.argsort(shard, kind="stable")
+        bounds = np.searchsorted(shard[order], np.arange(self.n_workers + 1))
+
+        records = np.empty(len(nodes), dtype=self.frame_rings[0].dtype)
+        records["row"] = self.local_row[nodes[order]]
+        records["timestamp"] = np.broadcast_to(batch["timestamp"], (len(nodes),))[order]
+        records["impact"] = np.asarray(batch["impact"])[order]
+        records["pixels"] = np.asarray(batch["pixels"])[order]
+        self.pixels[nodes] = batch["pixels"]
+        for k in range(self.n_workers):
+            part = records[bounds[k]:bounds[k + 1]]
+            if len(part) and not self._put(self.frame_rings[k], part, timeout):
+                self.dropped_frames += len(part)
+
+    def _put(self, ring, part, timeout):
+        if ring.put(part, 0):
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while deadline is None or time.monotonic() < deadline:
+            self.collect()
+            wait = 0.05 if deadline is None else min(0.05, max(0.0, deadline - time.monotonic()))
+            if ring.put(part, wait):
+                return True
+        return False
+
+    def collect(self, timeout=0):
+        """워커 결과와 이벤트를 합칩니다. 합친 노드 상태 수를 반환합니다."""
+        merged = 0
+        for k, ring in enumerate(self.result_rings):
+            while True:
+                results = ring.get(timeout=timeout)
+                if results is None:
+                    break
+                nodes = self.members[k][results["row"]]
+                self.state[nodes] = results
+                self.state["row"][nodes] = nodes
+                merged += len(results)
+        self.completed += merged
+        while True:
+            try:
+                events = self.events.get_nowait()
+            except queue.Empty:
+                break
+            for e in events:
+                self.store.append(e["노드"], e["시각"], e["이벤트"], e["위험도"], e["상세수치"], ts=e["ts"])
+        return merged
+
+    def latest(self, node_id):
+        """DetectionPipeline.latest()와 같은 형식의 노드 상태 (아직 없으면 None)."""
+        i = self.index[node_id]
+        s = self.state[i]
+        if s["seq"] < 0:
+            return None
+        prediction = int(s["prediction"])
+        return {
+            "seq": int(s["seq"]), "node": node_id, "pixels": self.pixels[i], "impact": float(s["impact"]),
+            "avg_temp": float(s["avg_temp"]), "vibration_rms": None, "is_detected": bool(s["detected"]),
+            "prediction": prediction, "confidence": float(s["confidence"]), "status": STATUS_LABELS[prediction],
+            "status_delta": risk_level(prediction), "time": datetime.fromtimestamp(s["processed_at"]).strftime("%H:%M:%S"),
+            "acquired_at": float(s["acquired_at"]), "processed_at": float(s["processed_at"]),
+        }
+
+    def events_since(self, seq):
+        return self.store.since(seq)
+
+    def stop(self):
+        self._stop.set()
+        for process in self.workers:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for ring in self.frame_rings + self.result_rings:
+            ring.close()
+            ring.unlink()
+        self.workers = []
+
+
+class ShardedDetectionPipeline(DetectionPipeline):
+    """ShardedPipeline을 DetectionPipeline과 같은 start() / subscribe() / snapshot / store로 감쌉니다.
+
+    획득/추론 스레드, 스냅샷 발행, 녹화는 DetectionPipeline 그대로이고, process()만 프레임 묶음을 워커들에
+    나눠 보내고 결과를 모아 스냅샷을 만듭니다 (시간 창 버퍼, 변화 감지, 규칙 단계, 모델은 워커마다).
+    노드 목록은 만들 때 정해지며, 목록에 없는 노드는 capacity를 넘는 노드처럼 거부합니다.
+    DANGER 알림은 워커가 기록한 이벤트를 조정자가 합친 뒤 여기서 alerts에 넣습니다.
+    """
+    def __init__(self, node_ids, model_path, n_workers, source, registry, shape=(8, 8), pipeline_kwargs=None,
+                 **kwargs):
+        node_ids = list(node_ids)
+        super().__init__(source, registry, capacity=len(node_ids), **kwargs)
+        self.node_ids = node_ids
+        self.node_index = {node_id: i for i, node_id in enumerate(node_ids)}  # 조정자의 노드 번호와 같음
+        self.coordinator = ShardedPipeline(node_ids, model_path, n_workers, shape=shape, store=self.store,
+                                           pipeline_kwargs=pipeline_kwargs)
+        self.published_seq = np.full(len(node_ids), -1, dtype=np.int64)
+        last = self.store.recent(limit=1)
+        self.alerted_seq = last[0]["seq"] if last else 0
+        self._coordinator_lock = threading.Lock()
+
+    def start(self):
+        with self._coordinator_lock:
+            if not self.coordinator.workers:
+                self.coordinator.start()
+        super().start()
+
+    def stop(self):
+        super().stop()
+        self.join()
+        with self._coordinator_lock:
+            if self.coordinator.workers:
+                self.coordinator.collect(timeout=0.1)  # 마지막 묶음의 이벤트
+                self._forward_alerts()
+                self.coordinator.stop()
+
+    def process(self, batch):
+        """프레임 묶음을 워커들에 나눠 보내고, 이 묶음의 결과가 모일 때까지 (최대 한 주기) 기다려 스냅샷을 갱신합니다."""
+        now = time.time()
+        coordinator = self.coordinator
+        dead = [p.name for p in coordinator.workers if not p.is_alive()]
+        if dead:
+            raise RuntimeError(f"샤드 워커가 종료되었습니다: {', '.join(dead)}")
+        rows = self._rows(batch["node_ids"])
+        if (rows < 0).any():
+            batch = self._select(batch, np.flatnonzero(rows >= 0))
+            rows = rows[rows >= 0]
+        if len(rows):
+            dropped = coordinator.dropped_frames
+            target = coordinator.completed + len(rows)
+            coordinator.submit({"nodes": rows, "pixels": batch["pixels"], "impact": batch["impact"],
+                                "timestamp": batch["timestamp"]}, timeout=self.period)
+            target -= coordinator.dropped_frames - dropped
+            deadline = time.monotonic() + max(self.period, 1.0)
+            while coordinator.completed < target and time.monotonic() < deadline and not self._stop.is_set():
+                coordinator.collect(timeout=0.05)
+        coordinator.collect()
+        self.frame_seq = coordinator.completed  # 워커가 처리한 노드 프레임 수 (변화가 없어 건너뛴 프레임 포함)
+        self._forward_alerts()
+
+        # 워커가 새로 처리한 노드만 스냅샷 항목을 바꿈 (늦게 도착한 이전 묶음의 결과 포함)
+        seqs = coordinator.state["seq"]
+        fresh = np.flatnonzero(seqs != self.published_seq)
+        self.published_seq[fresh] = seqs[fresh]
+        snapshot = dict(self.snapshot)
+        for i in fresh.tolist():
+            snapshot[self.node_ids[i]] = coordinator.latest(self.node_ids[i])
+
+        if not len(fresh) and now - self.published_at < self.heartbeat:
+            return
+        self.published_at = now
+        with self.changed:
+            self.snapshot = snapshot
+            self.version += 1
+            self.changed.notify_all()
+
+    def _forward_alerts(self):
+        if self.alerts is None:
+            return
+        for event in self.store.since(self.alerted_seq):
+            self.alerted_seq = event["seq"]
+            if event["위험도"] == "DANGER":
+                self.alerts.enqueue(event["노드"], event["이벤트"], "DANGER",
+                                    {"time": event["시각"], "detail": event["상세수치"]})
+
+
+def benchmark(n_nodes, workers_list, ticks, model_path, shape=(8, 8)):
+    """단일 프로세스 DetectionPipeline과 워커 수별 ShardedPipeline의 처리량(노드 프레임/s)을 비교합니다."""
+    node_ids = [f"NODE-{i:04d}" for i in range(n_nodes)]
+    source = SimulatedSource(node_ids, shape=shape, seed=0)
+    batches = [source.read() for _ in range(ticks)]
+    for batch in batches:
+        batch["nodes"] = np.arange(n_nodes)
+
+    pipeline = DetectionPipeline(None, ModelRegistry(model_path, loader=load_model), capacity=n_nodes)
+    pipeline.process(batches[0])  # 모델 로드 / 첫 호출 비용 제외
+    started = time.perf_counter()
+    for batch in batches:
+        pipeline.process(batch)
+    single = n_nodes * ticks / (time.perf_counter() - started)
+    rows = [("단일 프로세스", 1, single)]
+
+    for n_workers in workers_list:
+        sharded = ShardedPipeline(node_ids, model_path, n_workers, shape=shape).start()
+        sharded.submit(batches[0], timeout=None)  # 워커 시작 / 모델 로드 대기
+        while sharded.completed < n_nodes:
+            sharded.collect(timeout=0.05)
+        started = time.perf_counter()
+        target = sharded.completed + n_nodes * ticks
+        for batch in batches:
+            sharded.submit(batch, timeout=None)
+            sharded.collect()
+        while sharded.completed < target:
+            sharded.collect(timeout=0.05)
+        rows.append((f"샤딩 워커 {n_workers}개", n_workers, n_nodes * ticks / (time.perf_counter() - started)))
+        sharded.stop()
+
+    print(f"🧮 노드 {n_nodes}개 x {ticks}틱, CPU {os.cpu_count()}개")
+    print(f"{'구성':16s} {'노드 프레임/s':>14s} {'단일 대비':>9s} {'코어당 효율':>10s}")
+    for name, n_workers, fps in rows:
+        print(f"{name:16s} {fps:14,.0f} {fps / single:8.2f}x {fps / single / n_workers:10.0%}")
+    if (os.cpu_count() or 1) < max(workers_list):
+        print(f"⚠️ 워커 수가 CPU 수({os.cpu_count()})보다 많아 선형 확장을 기대할 수 없습니다")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="샤딩 파이프라인 처리량 벤치마크")
+    parser.add_argument("--nodes", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--ticks", type=int, default=30)
+    parser.add_argument("--model", help="경량 .npz 또는 joblib 피클 모델 (기본: 둘 중 마지막으로 학습한 파일)")
+    args = parser.parse_args()
+    benchmark(args.nodes, args.workers, args.ticks, args.model or DEFAULT_MODEL_PATHS)
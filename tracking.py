@@ -0,0 +1,119 @@
+import numpy as np
+
+DETECT_TEMP = 30.0  # main.py의 is_detected 기준과 동일
+
+# 8방향 연결, 노드(첫 번째 축) 사이로는 연결하지 않음
+_STRUCTURE = np.zeros((3, 3, 3), dtype=bool)
+_STRUCTURE[1] = True
+
+
+def detect_blobs(frames, threshold=DETECT_TEMP, min_pixels=1):
+    """열화상 (H, W) 또는 노드 묶음 (N, H, W)에서 임계 온도 이상인 영역을 찾습니다.
+
+    연결 요소마다 노드 번호, 온도 가중 중심(row, col), 픽셀 수, 최고 온도를 배열로 반환합니다.
+    해상도에 상관없이 동작하며 픽셀 단위 파이썬 루프가 없습니다.
+    """
+    frames = np.asarray(frames, dtype=float)
+    if frames.ndim == 2:
+        frames = frames[None]
+    from scipy import ndimage  # scipy는 아이콘 모드에서 처음 쓸 때 불러옴
+
+    labels, n = ndimage.label(frames > threshold, structure=_STRUCTURE)
+    if n == 0:
+        empty = np.zeros(0)
+        return {"node": empty.astype(np.intp), "row": empty, "col": empty, "size": empty.astype(np.intp), "peak": empty}
+
+    flat = labels.ravel()
+    idx = np.flatnonzero(flat)
+    lab = flat[idx]
+    node, r, c = np.unravel_index(idx, frames.shape)
+    weight = frames.ravel()[idx] - threshold  # 임계값을 넘은 만큼 가중
+
+    size = np.bincount(lab, minlength=n + 1)[1:]
+    wsum = np.bincount(lab, weight, minlength=n + 1)[1:]
+    row = np.bincount(lab, weight * r, minlength=n + 1)[1:] / wsum
+    col = np.bincount(lab, weight * c, minlength=n + 1)[1:] / wsum
+    peak = np.asarray(ndimage.maximum(frames, labels, np.arange(1, n + 1)))
+    blob_node = np.zeros(n + 1, dtype=np.intp)
+    blob_node[lab] = node
+
+    keep = size >= min_pixels
+    return {
+        "node": blob_node[1:][keep],
+        "row": row[keep],
+        "col": col[keep],
+        "size": size[keep],
+        "peak": peak[keep],
+    }
+
+
+class MultiTargetTracker:
+    """프레임 간 대상에 ID를 부여하고 링 버퍼 이동평균으로 좌표를 평활화합니다.
+
+    거리 행렬에 대한 최적 할당(헝가리안)으로 기존 트랙과 새 검출을 연결하며,
+    max_distance보다 멀면 새 트랙을 만들고 max_missed 프레임 동안 보이지 않으면 제거합니다.
+    """
+    def __init__(self, max_targets=16, window_size=5, max_distance=2.0, max_missed=3):
+        self.max_targets = max_targets
+        self.window_size = window_size
+        self.max_distance = max_distance
+        self.max_missed = max_missed
+
+        self.history = np.zeros((max_targets, window_size, 2))
+        self.sums = np.zeros((max_targets, 2))
+        self.head = np.zeros(max_targets, dtype=np.intp)
+        self.count = np.zeros(max_targets, dtype=np.intp)
+        self.missed = np.zeros(max_targets, dtype=np.intp)
+        self.ids = np.full(max_targets, -1, dtype=np.int64)
+        self.active = np.zeros(max_targets, dtype=bool)
+        self.next_id = 0
+
+    def positions(self):
+        return self.sums / np.maximum(self.count, 1)[:, None]
+
+    def update(self, points):
+        """검출 좌표 (K, 2)[row, col]를 받아 보이는 트랙의 (ID 배열, 평활화 좌표 (M, 2))를 반환합니다."""
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        slots = np.flatnonzero(self.active)
+        assigned = np.full(len(points), -1, dtype=np.intp)
+
+        if len(slots) and len(points):
+            from scipy.optimize import linear_sum_assignment
+
+            last = self.history[slots, (self.head[slots] - 1) % self.window_size]
+            dist = np.linalg.norm(last[:, None, :] - points[None, :, :], axis=2)
+            track_idx, point_idx = linear_sum_assignment(dist)
+            ok = dist[track_idx, point_idx] <= self.max_distance
+            assigned[point_idx[ok]] = slots[track_idx[ok]]
+
+        # 매칭되지 않은 검출은 빈 슬롯에 새 트랙으로 등록
+        new_points = np.flatnonzero(assigned < 0)
+        free = np.flatnonzero(~self.active)[:len(new_points)]
+        new_points = new_points[:len(free)]  # 슬롯이 부족하면 나머지는 버림
+        assigned[new_points] = free
+        self.active[free] = True
+        self.ids[free] = np.arange(self.next_id, self.next_id + len(free))
+        self.next_id += len(free)
+        self.history[free] = 0
+        self.sums[free] = 0
+        self.head[free] = 0
+        self.count[free] = 0
+
+        # 링 버퍼에 누적합 방식으로 추가
+        seen = assigned[assigned >= 0]
+        values = points[assigned >= 0]
+        pos = self.head[seen]
+        self.sums[seen] += values - self.history[seen, pos]
+        self.history[seen, pos] = values
+        self.head[seen] = (pos + 1) % self.window_size
+        self.count[seen] = np.minimum(self.count[seen] + 1, self.window_size)
+
+        # 이번 프레임에 보이지 않은 트랙은 miss 증가, 한도를 넘으면 제거
+        unseen = np.ones(self.max_targets, dtype=bool)
+        unseen[seen] = False
+        unseen &= self.active
+        self.missed[unseen] += 1
+        self.missed[seen] = 0
+        self.active[unseen & (self.missed > self.max_missed)] = False
+
+        return self.ids[seen], self.positions()[seen]
@@ -2,37 +2,89 @@ import numpy as np
 from collections import deque # ★ 이 줄이 꼭 있어야 합니다!
 
 class CoordinateSmoother:
+    """단일 대상용 좌표 평활화입니다. 여러 대상은 tracking.MultiTargetTracker를 사용합니다."""
     def __init__(self, window_size=5):
         self.window_size = window_size
-        self.history_x = []
-        self.history_y = []
+        self.history = np.zeros((window_size, 2))  # 링 버퍼
+        self.sums = np.zeros(2)
+        self.head = 0
+        self.count = 0
 
     def update(self, new_x, new_y):
         """새로운 좌표를 받아 평활화된(부드러운) 좌표를 반환합니다."""
-        self.history_x.append(new_x)
-        self.history_y.append(new_y)
+        self.sums += (new_x, new_y) - self.history[self.head]
+        self.history[self.head] = (new_x, new_y)
+        self.head = (self.head + 1) % self.window_size
+        self.count = min(self.count + 1, self.window_size)
 
-        if len(self.history_x) > self.window_size:
-            self.history_x.pop(0)
-            self.history_y.pop(0)
-
-        smooth_x = sum(self.history_x) / len(self.history_x)
-        smooth_y = sum(self.history_y) / len(self.history_y)
+        smooth_x, smooth_y = self.sums / self.count
         
         return smooth_x, smooth_y
 
+def min_max_normalize(matrix, min_temp=20.0, max_temp=40.0):
+    normalized = (matrix - min_temp) / (max_temp - min_temp)
+    return np.clip(normalized, 0, 1) # 0.0 ~ 1.0 사이로 값 고정
+
 def get_heat_center(pixels):
-    """8x8 열화상 데이터에서 가장 뜨거운 지점의 좌표를 찾습니다."""
+    """열화상 데이터(해상도 무관)에서 가장 뜨거운 지점의 좌표를 찾습니다."""
     idx = np.argmax(pixels)
-    r, c = divmod(idx, 8)
-    return r, c
+    r, c = np.unravel_index(idx, np.shape(pixels))
+    return int(r), int(c)
+
+class RunningMax:
+    """단조 감소 deque로 슬라이딩 윈도 최댓값을 분할상환 O(1)에 유지합니다."""
+    def __init__(self, size):
+        self.size = size
+        self.window = deque()  # (순번, 값), 값이 단조 감소
+        self.seq = 0
+
+    def __len__(self):
+        return min(self.seq, self.size)
+
+    def append(self, value):
+        window = self.window
+        while window and window[-1][1] <= value:
+            window.pop()
+        window.append((self.seq, value))
+        if window[0][0] <= self.seq - self.size:
+            window.popleft()
+        self.seq += 1
+
+    def max(self):
+        return self.window[0][1]
+
+
+class RunningMean:
+    """numpy 링 버퍼와 누적합으로 슬라이딩 윈도 평균을 O(1)에 유지합니다."""
+    def __init__(self, size):
+        self.size = size
+        self.values = np.zeros(size)
+        self.head = 0
+        self.count = 0
+        self.total = 0.0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, value):
+        self.total += value - self.values[self.head]
+        self.values[self.head] = value
+        self.head = (self.head + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+        elif self.head == 0:
+            self.total = float(self.values.sum())  # 한 바퀴마다 부동소수점 오차 초기화
+
+    def mean(self):
+        return self.total / self.count
+
 
 class MultiScaleBuffer:
     def __init__(self, short_term_size=10, long_term_size=60):
         # 단기 버퍼: 충격 감지용
-        self.short_term = deque(maxlen=short_term_size)
+        self.short_term = RunningMax(short_term_size)
         # 장기 버퍼: 배회 감지용
-        self.long_term = deque(maxlen=long_term_size)
+        self.long_term = RunningMean(long_term_size)
 
     def update(self, impact, is_detected):
         self.short_term.append(impact)
@@ -40,9 +92,78 @@ class MultiScaleBuffer:
 
     def get_features(self):
         # 단기 특징: 최근 가장 큰 충격량
-        short_term_impact = max(self.short_term) if self.short_term else 16384
+        short_term_impact = self.short_term.max() if len(self.short_term) else 16384
         
         # 장기 특징: 전체 시간 중 객체가 머문 비율 (0~1 사이 값)
-        loitering_score = sum(self.long_term) / len(self.long_term) if self.long_term else 0
+        loitering_score = self.long_term.mean() if len(self.long_term) else 0
         
-        return short_term_impact, loitering_score
\ No newline at end of file
+        return short_term_impact, loitering_score
+
+
+class MultiNodeBuffer:
+    """여러 노드의 MultiScaleBuffer를 (노드, 윈도) 배열로 묶어 한 번에 갱신합니다.
+
+    최댓값은 van Herk/Gil-Werman 블록 방식(현재 블록의 누적 최댓값 + 이전 블록의
+    접미 최댓값)으로 구해 노드당 분할상환 O(1)이며, 평균은 누적합으로 O(1)입니다.
+    """
+    def __init__(self, n_nodes, short_term_size=10, long_term_size=60, default_impact=16384):
+        self.n_nodes = n_nodes
+        self.short_size = short_term_size
+        self.long_size = long_term_size
+        self.default_impact = default_impact
+
+        # 단기 충격 최댓값
+        self.impacts = np.full((n_nodes, short_term_size), -np.inf)
+        self.suffix_max = np.full((n_nodes, short_term_size), -np.inf)
+        self.prefix_max = np.full(n_nodes, -np.inf)
+        self.short_pos = np.zeros(n_nodes, dtype=np.intp)
+        self.short_count = np.zeros(n_nodes, dtype=np.intp)
+
+        # 장기 체류 비율 (정수 합이라 오차 누적 없음)
+        self.detected = np.zeros((n_nodes, long_term_size), dtype=np.int8)
+        self.detected_sum = np.zeros(n_nodes, dtype=np.int64)
+        self.long_pos = np.zeros(n_nodes, dtype=np.intp)
+        self.long_count = np.zeros(n_nodes, dtype=np.intp)
+
+    def update(self, impacts, is_detected, nodes=None):
+        """nodes(인덱스 배열)에 해당하는 노드들에 한 프레임씩 추가합니다. None이면 전체 노드."""
+        nodes = np.arange(self.n_nodes) if nodes is None else np.asarray(nodes, dtype=np.intp)
+        impacts = np.asarray(impacts, dtype=float)
+        detected = np.asarray(is_detected).astype(np.int8)
+
+        # 단기: 블록의 첫 칸이면 누적 최댓값을 초기화
+        pos = self.short_pos[nodes]
+        self.impacts[nodes, pos] = impacts
+        self.prefix_max[nodes] = np.where(pos == 0, impacts, np.maximum(self.prefix_max[nodes], impacts))
+        pos += 1
+        full = pos == self.short_size
+        if full.any():
+            # 블록이 끝난 노드만 접미 최댓값을 다시 계산 (w 프레임마다 한 번 -> 분할상환 O(1))
+            done = nodes[full]
+            self.suffix_max[done] = np.maximum.accumulate(self.impacts[done, ::-1], axis=1)[:, ::-1]
+            pos[full] = 0
+        self.short_pos[nodes] = pos
+        self.short_count[nodes] = np.minimum(self.short_count[nodes] + 1, self.short_size)
+
+        # 장기: 빠져나가는 값을 빼고 들어오는 값을 더함
+        pos = self.long_pos[nodes]
+        self.detected_sum[nodes] += detected - self.detected[nodes, pos]
+        self.detected[nodes, pos] = detected
+        self.long_pos[nodes] = (pos + 1) % self.long_size
+        self.long_count[nodes] = np.minimum(self.long_count[nodes] + 1, self.long_size)
+
+    def get_features(self, nodes=None):
+        """(peak_impact, loitering_score) 배열 쌍을 반환합니다."""
+        nodes = np.arange(self.n_nodes) if nodes is None else np.asarray(nodes, dtype=np.intp)
+
+        # 윈도 = 이전 블록의 [pos, w) 구간 + 현재 블록의 [0, pos) 구간
+        pos = self.short_pos[nodes]
+        previous = np.where(pos == 0, -np.inf, self.suffix_max[nodes, pos])
+        current = np.where(pos == 0, -np.inf, self.prefix_max[nodes])
+        peak = np.maximum(previous, current)
+        peak = np.where(pos == 0, self.suffix_max[nodes, 0], peak)
+        peak = np.where(self.short_count[nodes] == 0, self.default_impact, peak)
+
+        count = self.long_count[nodes]
+        loitering = np.divide(self.detected_sum[nodes], count, out=np.zeros(len(nodes)), where=count > 0)
+        return peak, loitering
\ No newline at end of file
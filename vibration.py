@@ -0,0 +1,130 @@
+import numpy as np
+
+BASELINE = 16384  # 정지 상태의 ADC 중앙값 (기존 충격량 스케일과 동일)
+DEFAULT_BANDS = ((1, 20), (20, 100), (100, 400), (400, 1600))  # Hz
+
+
+class VibrationProcessor:
+    """kHz 단위로 들어오는 가속도 원시 샘플을 블록 단위로 요약하는 벡터화 처리기입니다.
+
+    process()에 (센서 수, 샘플 수) 묶음을 넣으면 block_size개씩 잘라 블록마다
+    최대 진폭, RMS, 주파수 대역 에너지를 한 번의 numpy/FFT 연산으로 계산하고,
+    tick()을 호출하면 그동안의 블록을 화면 주기 하나의 특징 벡터로 합쳐 돌려줍니다.
+    블록에 못 미친 나머지 샘플은 다음 process() 호출로 넘어갑니다.
+    """
+    def __init__(self, n_sensors, sample_rate=3200, block_size=256, bands=DEFAULT_BANDS, baseline=BASELINE):
+        self.n_sensors = n_sensors
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.baseline = baseline
+        self.bands = tuple(bands)
+
+        self.window = np.hanning(block_size).astype(np.float32)
+        freqs = np.fft.rfftfreq(block_size, 1 / sample_rate)
+        # (주파수 bin, 대역) 0/1 행렬: 파워 스펙트럼 @ band_matrix = 대역 에너지
+        self.band_matrix = np.stack([(freqs >= lo) & (freqs < hi) for lo, hi in self.bands], axis=1).astype(np.float32)
+        self.scale = 2.0 / (block_size * np.sum(self.window ** 2))
+
+        self.pending = np.empty((n_sensors, block_size), dtype=np.float32)  # 블록에 못 미친 샘플
+        self.fill = 0
+        self._reset_tick()
+
+    def _reset_tick(self):
+        self.tick_peak = np.zeros(self.n_sensors, dtype=np.float32)
+        self.tick_sq = np.zeros(self.n_sensors)
+        self.tick_band = np.zeros((self.n_sensors, len(self.bands)))
+        self.tick_blocks = 0
+
+    def process(self, samples):
+        """samples: (n_sensors, m) 원시 샘플. 완성된 블록 수를 반환합니다."""
+        samples = np.asarray(samples, dtype=np.float32)
+        B = self.block_size
+        m = samples.shape[1]
+        n_blocks = (self.fill + m) // B
+        if n_blocks == 0:
+            self.pending[:, self.fill:self.fill + m] = samples
+            self.fill += m
+            return 0
+
+        used = n_blocks * B - self.fill
+        if self.fill:
+            data = np.concatenate([self.pending[:, :self.fill], samples[:, :used]], axis=1)
+        else:
+            data = samples[:, :used]
+        self._summarize(data.reshape(self.n_sensors, n_blocks, B))
+
+        rest = m - used
+        self.pending[:, :rest] = samples[:, used:]
+        self.fill = rest
+        return n_blocks
+
+    def _summarize(self, blocks):
+        dev = blocks - np.float32(self.baseline)
+        peak = np.abs(dev).max(axis=2)                              # (센서, 블록)
+        sq = np.einsum("ijk,ijk->ij", dev, dev) / self.block_size   # 블록별 평균 제곱
+        spectrum = np.fft.rfft(dev * self.window, axis=2)
+        power = (spectrum.real ** 2 + spectrum.imag ** 2).astype(np.float32)
+        band = power @ self.band_matrix * self.scale                # (센서, 블록, 대역)
+
+        np.maximum(self.tick_peak, peak.max(axis=1), out=self.tick_peak)
+        self.tick_sq += sq.sum(axis=1)
+        self.tick_band += band.sum(axis=1)
+        self.tick_blocks += blocks.shape[1]
+
+    def tick(self):
+        """지난 tick() 이후 블록들을 센서별 특징 하나로 합쳐 반환하고 누적값을 비웁니다.
+
+        peak는 기준값 + 최대 편차라서 기존 충격량 임계값(IMPACT_MIN 등)과 같은 스케일입니다.
+        """
+        blocks = max(self.tick_blocks, 1)
+        features = {
+            "peak": self.baseline + self.tick_peak.astype(float),
+            "rms": np.sqrt(self.tick_sq / blocks),
+            "band_energy": self.tick_band / blocks,
+            "blocks": self.tick_blocks,
+        }
+        self._reset_tick()
+        return features
+
+
+def simulate_samples(rng, n_sensors, n_samples, noise=120.0, baseline=BASELINE):
+    """정지 상태 가속도 잡음 (센서 수, 샘플 수)."""
+    return rng.normal(baseline, noise, (n_sensors, n_samples)).astype(np.float32)
+
+
+def inject_burst(rng, samples, sensor, amplitude, sample_rate, duration=0.01, freq=180.0):
+    """센서 하나에 짧게 감쇠하는 충격 파형을 임의 위치에 더합니다 (amplitude: 기준값 대비 최대 편차)."""
+    n = max(4, int(duration * sample_rate))
+    start = rng.integers(0, max(1, samples.shape[1] - n))
+    t = np.arange(n) / sample_rate
+    wave = amplitude * np.exp(-t / (duration / 3)) * np.cos(2 * np.pi * freq * t)
+    samples[sensor, start:start + n] += wave[:samples.shape[1] - start]
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    rate, period = 3200, 0.4
+    per_tick = int(rate * period)
+    for n_sensors in (1, 100, 1000):
+        processor = VibrationProcessor(n_sensors, sample_rate=rate)
+        chunks = [simulate_samples(rng, n_sensors, per_tick) for _ in range(5)]
+        inject_burst(rng, chunks[0], 0, 12000, rate)  # 12 ms 미만의 짧은 충격
+
+        started = time.perf_counter()
+        for chunk in chunks:
+            processor.process(chunk)
+            features = processor.tick()
+        elapsed = (time.perf_counter() - started) / len(chunks)
+
+        realtime = elapsed / period
+        print(f"📈 {n_sensors:5d}센서 x {rate} Hz: 틱당 {elapsed * 1000:7.2f} ms "
+              f"(실시간 대비 CPU {realtime:.1%}, {n_sensors * per_tick / elapsed / 1e6:.1f} M samples/s)")
+
+    processor = VibrationProcessor(1, sample_rate=rate)
+    chunk = simulate_samples(rng, 1, per_tick)
+    inject_burst(rng, chunk, 0, 12000, rate)
+    once = chunk[0, rng.integers(per_tick)]  # 기존 방식: 루프마다 한 번만 샘플링
+    processor.process(chunk)
+    print(f"🔍 짧은 충격: 1회 샘플링 {once:.0f} / 블록 최대값 {processor.tick()['peak'][0]:.0f}")